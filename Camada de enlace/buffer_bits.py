@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: buffer_bits.py
+
+Tipo compacto de bits usado pela Camada de Enlace (Transmissor e Receptor).
+
+Um BufferBits guarda os bits empacotados (8 por byte, primeiro bit no MSB) em um
+numpy.ndarray uint8, junto com o deslocamento do primeiro bit e o número de bits.
+Custa 1 bit de memória por bit de dados, contra 8 bytes por bit de uma str de '0'/'1'.
+
+Funções incluídas:
+- BufferBits: fatiamento sem cópia, concatenação e conversão de/para bytes,
+  arrays de bits (np.packbits/np.unpackbits) e strings de '0'/'1'.
+- para_buffer / restaurar_tipo: caminho de compatibilidade usado pelas funções da
+  camada, que aceitam tanto str quanto BufferBits e devolvem o mesmo tipo recebido.
+"""
+
+import numpy as np
+
+# Número de bits '1' em cada valor de byte (0..255)
+_UNS_POR_BYTE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class BufferBits:
+    """
+    Sequência imutável de bits empacotados.
+
+    - dados: bytes/bytearray/memoryview ou array uint8 com os bits empacotados (não é copiado).
+    - tamanho: número de bits válidos (padrão: todos os bits de 'dados' a partir de 'inicio').
+    - inicio: posição, em bits, do primeiro bit válido dentro de 'dados'.
+    """
+
+    __slots__ = ("_dados", "_inicio", "_tamanho")
+
+    def __init__(self, dados=b"", tamanho: int | None = None, inicio: int = 0):
+        if isinstance(dados, (bytes, bytearray, memoryview)):
+            dados = np.frombuffer(dados, dtype=np.uint8)
+        else:
+            dados = np.asarray(dados, dtype=np.uint8).reshape(-1)
+
+        capacidade = dados.size * 8 - inicio
+        if tamanho is None:
+            tamanho = capacidade
+        if inicio < 0 or tamanho < 0 or tamanho > capacidade:
+            raise ValueError("Tamanho/início incompatíveis com os dados empacotados.")
+
+        self._dados = dados
+        self._inicio = inicio
+        self._tamanho = tamanho
+
+    # ---------------------------------------------------------------
+    # Construtores
+    # ---------------------------------------------------------------
+
+    @classmethod
+    def de_str(cls, bits_dados: str) -> "BufferBits":
+        """Cria o buffer a partir de uma string de '0'/'1'."""
+        try:
+            bits = np.frombuffer(bits_dados.encode('ascii'), dtype=np.uint8) - ord('0')
+        except UnicodeEncodeError:
+            raise ValueError("String de bits deve conter apenas '0' e '1'.") from None
+        if bits.size and bits.max() > 1:
+            raise ValueError("String de bits deve conter apenas '0' e '1'.")
+        return cls(np.packbits(bits), bits.size)
+
+    @classmethod
+    def de_bits(cls, bits) -> "BufferBits":
+        """Cria o buffer a partir de um array/lista de bits 0/1 (um bit por elemento)."""
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+        return cls(np.packbits(bits), bits.size)
+
+    @classmethod
+    def de_bytes(cls, dados, tamanho: int | None = None) -> "BufferBits":
+        """Usa diretamente (sem cópia) bytes já empacotados; 'tamanho' em bits."""
+        return cls(dados, tamanho)
+
+    @classmethod
+    def concatenar(cls, partes) -> "BufferBits":
+        """Concatena vários buffers (ou strings de bits) em um novo buffer."""
+        partes = [para_buffer(p) for p in partes]
+        if all(len(p) % 8 == 0 for p in partes[:-1]):
+            # Todas as junções caem em fronteira de byte: basta juntar os bytes
+            dados = np.concatenate([p.empacotado() for p in partes]) if partes else b""
+            return cls(dados, sum(len(p) for p in partes))
+        return cls.de_bits(np.concatenate([p.bits() for p in partes]))
+
+    # ---------------------------------------------------------------
+    # Conversões
+    # ---------------------------------------------------------------
+
+    def _bytes_cobertos(self) -> np.ndarray:
+        """Fatia (sem cópia) dos bytes que contêm os bits válidos."""
+        primeiro = self._inicio // 8
+        ultimo = (self._inicio + self._tamanho + 7) // 8
+        return self._dados[primeiro:ultimo]
+
+    def bits(self) -> np.ndarray:
+        """Array uint8 com um bit (0/1) por elemento."""
+        deslocamento = self._inicio % 8
+        bits = np.unpackbits(self._bytes_cobertos(), count=deslocamento + self._tamanho)
+        return bits[deslocamento:]
+
+    def empacotado(self) -> np.ndarray:
+        """
+        Bits empacotados a partir do MSB do primeiro byte, com zeros após o último bit.
+        Não copia quando o buffer já está alinhado em byte (caso comum).
+        """
+        cobertos = self._bytes_cobertos()
+        resto = self._tamanho % 8
+        if self._inicio % 8 == 0:
+            if resto == 0 or cobertos[-1] & (0xFF >> resto) == 0:
+                return cobertos
+            ajustado = cobertos.copy()
+            ajustado[-1] &= (0xFF << (8 - resto)) & 0xFF
+            return ajustado
+        return np.packbits(self.bits())
+
+    def empacotado_com_zeros_a_esquerda(self) -> np.ndarray:
+        """
+        Bytes dos dados completados com zeros À ESQUERDA até um múltiplo de 8 bits
+        (o alinhamento usado pelo enquadramento e pelo checksum do transmissor).
+        """
+        preenchimento = -self._tamanho % 8
+        if preenchimento == 0:
+            return self.empacotado()
+        return np.packbits(np.concatenate((np.zeros(preenchimento, dtype=np.uint8), self.bits())))
+
+    def para_bytes(self) -> bytes:
+        """Cópia dos bits empacotados como bytes (zeros após o último bit)."""
+        return self.empacotado().tobytes()
+
+    def para_str(self) -> str:
+        """String de '0'/'1' (caminho de compatibilidade)."""
+        return (self.bits() + ord('0')).tobytes().decode('ascii')
+
+    def para_int(self) -> int:
+        """Valor inteiro dos bits, com o primeiro bit como o mais significativo."""
+        if self._tamanho == 0:
+            return 0
+        return int.from_bytes(self.empacotado_com_zeros_a_esquerda().tobytes(), 'big')
+
+    def contar_uns(self) -> int:
+        """Número de bits '1'."""
+        return int(_UNS_POR_BYTE[self.empacotado()].sum(dtype=np.int64))
+
+    # ---------------------------------------------------------------
+    # Protocolo de sequência
+    # ---------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(self._tamanho)
+            if passo != 1:
+                return BufferBits.de_bits(self.bits()[indice])
+            # Fatia contínua: compartilha o mesmo array empacotado (sem cópia)
+            return BufferBits(self._dados, max(0, fim - inicio), self._inicio + inicio)
+
+        if indice < 0:
+            indice += self._tamanho
+        if not 0 <= indice < self._tamanho:
+            raise IndexError("Índice de bit fora do buffer.")
+        posicao = self._inicio + indice
+        return int(self._dados[posicao // 8] >> (7 - posicao % 8)) & 1
+
+    def __iter__(self):
+        return iter(self.bits().tolist())
+
+    def __add__(self, outro):
+        if isinstance(outro, (BufferBits, str)):
+            return BufferBits.concatenar((self, outro))
+        return NotImplemented
+
+    def __eq__(self, outro):
+        if isinstance(outro, str):
+            return self.para_str() == outro
+        if not isinstance(outro, BufferBits):
+            return NotImplemented
+        return len(self) == len(outro) and np.array_equal(self.empacotado(), outro.empacotado())
+
+    __hash__ = None
+
+    def __str__(self) -> str:
+        return self.para_str()
+
+    def __repr__(self) -> str:
+        if self._tamanho <= 64:
+            return f"BufferBits('{self.para_str()}')"
+        return f"BufferBits('{self[:64].para_str()}...', tamanho={self._tamanho})"
+
+
+# -------------------------------------------------------------------
+# Caminho de compatibilidade (str <-> BufferBits)
+# -------------------------------------------------------------------
+
+def para_buffer(bits_dados) -> BufferBits:
+    """
+    Converte a entrada de uma função da camada em BufferBits.
+    Aceita BufferBits, str de '0'/'1', bytes-like (bits empacotados) ou lista/array de bits 0/1.
+    """
+    if isinstance(bits_dados, BufferBits):
+        return bits_dados
+    if isinstance(bits_dados, str):
+        return BufferBits.de_str(bits_dados)
+    if isinstance(bits_dados, (bytes, bytearray, memoryview)):
+        return BufferBits.de_bytes(bits_dados)
+    return BufferBits.de_bits(bits_dados)
+
+
+def restaurar_tipo(buffer: BufferBits, modelo):
+    """
+    Devolve 'buffer' no mesmo tipo da entrada original 'modelo':
+    str -> str de '0'/'1', bytes-like -> bytes, caso contrário BufferBits.
+    """
+    if isinstance(modelo, str):
+        return buffer.para_str()
+    if isinstance(modelo, (bytes, bytearray, memoryview)):
+        return buffer.para_bytes()
+    return buffer
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: correcao_erros.py
+
+Núcleo de cálculo da Correção de Erros (Hamming), compartilhado pelo Transmissor e pelo Receptor.
+
+Funções incluídas:
+- Código de Hamming em blocos (7,4), (15,11), (31,26) e (63,57): matrizes geradora G e de
+  verificação H em numpy uint8; milhares de blocos são codificados/decodificados com um
+  único produto de matrizes e corrigidos por uma tabela de síndromes.
+- Modo legado de palavra única (um código de Hamming sobre a mensagem inteira), em O(n).
+
+Em ambos os modos os bits de paridade ficam nas posições potência de 2 (1, 2, 4, 8, ...,
+contadas a partir de 1). A coluna j de H é o número j em binário, então a síndrome de
+uma palavra é o XOR das posições dos seus bits '1' e, havendo um único erro, é a posição dele.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# n -> k dos códigos de Hamming suportados no modo em blocos
+CODIGOS_HAMMING = {7: 4, 15: 11, 31: 26, 63: 57}
+
+
+def _posicoes_de_paridade(n: int) -> np.ndarray:
+    """Máscara booleana (índices 0..n-1) das posições 1, 2, 4, 8, ... da palavra."""
+    posicoes = np.arange(1, n + 1)
+    return (posicoes & (posicoes - 1)) == 0
+
+
+@lru_cache(maxsize=None)
+def matrizes_hamming(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Matrizes do código de Hamming (n, k), somente leitura.
+    Retorna: (G, H, tabela_sindrome)
+    - G (k x n): palavra = dados @ G (mod 2).
+    - H (r x n): síndrome = palavra @ H.T (mod 2), com a linha i sendo o bit i da posição.
+    - tabela_sindrome (2^r): índice (0..n-1) do bit a inverter para cada síndrome; -1 = sem erro.
+    """
+    if n not in CODIGOS_HAMMING:
+        raise ValueError(f"Hamming em blocos suporta n em {sorted(CODIGOS_HAMMING)}, recebido {n}.")
+    k = CODIGOS_HAMMING[n]
+    r = n - k
+
+    posicoes = np.arange(1, n + 1)
+    H = ((posicoes[None, :] >> np.arange(r)[:, None]) & 1).astype(np.uint8)
+
+    paridade = _posicoes_de_paridade(n)
+    colunas_dados = np.flatnonzero(~paridade)
+    colunas_paridade = np.flatnonzero(paridade)
+    G = np.zeros((k, n), dtype=np.uint8)
+    G[np.arange(k), colunas_dados] = 1
+    # O bit de paridade na posição 2^i cobre os dados cuja posição tem o bit i ligado
+    G[:, colunas_paridade] = H[:, colunas_dados].T
+
+    tabela_sindrome = np.arange(-1, 2 ** r - 1, dtype=np.int64)
+
+    for matriz in (G, H, tabela_sindrome):
+        matriz.flags.writeable = False
+    return G, H, tabela_sindrome
+
+
+def _em_blocos(bits, tamanho: int) -> np.ndarray:
+    """(..., m) -> (..., m / tamanho, tamanho), completando com zeros à direita."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    falta = -bits.shape[-1] % tamanho
+    if falta:
+        bits = np.concatenate((bits, np.zeros(bits.shape[:-1] + (falta,), dtype=np.uint8)), axis=-1)
+    return bits.reshape(bits.shape[:-1] + (-1, tamanho))
+
+
+def codificar_hamming(bits, n: int = 7) -> np.ndarray:
+    """
+    Codifica bits 0/1 com Hamming (n, k) em blocos.
+    - bits: array (..., m); m é completado com zeros à direita até um múltiplo de k.
+    Retorna: array uint8 (..., blocos * n).
+    """
+    G, _, _ = matrizes_hamming(n)
+    blocos = _em_blocos(bits, G.shape[0])
+    # Soma de no máximo k <= 57 produtos: cabe em uint8
+    palavras = (blocos @ G) & 1
+    return palavras.reshape(palavras.shape[:-2] + (-1,))
+
+
+def decodificar_hamming(bits, n: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decodifica e corrige (1 erro por bloco) bits codificados com Hamming (n, k).
+    - bits: array (..., blocos * n); um bloco incompleto no final é descartado.
+    Retorna: (dados uint8 (..., blocos * k), posicao_erro por bloco (..., blocos))
+    posicao_erro = 0 se o bloco não tem erro; senão, a posição (1..n) corrigida.
+    """
+    G, H, tabela_sindrome = matrizes_hamming(n)
+    bits = np.asarray(bits, dtype=np.uint8)
+    blocos = bits.shape[-1] // n
+    palavras = bits[..., :blocos * n].reshape(bits.shape[:-1] + (blocos, n)).copy()
+
+    # Síndrome como inteiro: bits de (palavras @ H.T) ponderados por 1, 2, 4, ...
+    sindromes = ((palavras @ H.T) & 1).astype(np.int64) @ (1 << np.arange(H.shape[0]))
+    indices = tabela_sindrome[sindromes]
+
+    com_erro = np.nonzero(indices >= 0)
+    palavras[com_erro + (indices[com_erro],)] ^= 1
+
+    dados = palavras[..., ~_posicoes_de_paridade(n)]
+    return dados.reshape(dados.shape[:-2] + (-1,)), sindromes
+
+
+def codificar_hamming_palavra_unica(bits) -> np.ndarray:
+    """
+    Modo legado: um único código de Hamming sobre toda a mensagem de m bits,
+    com r bits de paridade (menor r com 2^r >= m + r + 1). Retorna m + r bits.
+    """
+    bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+    m = bits.size
+    r = 0
+    while 2 ** r < r + m + 1:
+        r += 1
+
+    paridade = _posicoes_de_paridade(m + r)
+    palavra = np.zeros(m + r, dtype=np.uint8)
+    palavra[~paridade] = bits
+
+    # Paridades escolhidas para que o XOR das posições dos '1's da palavra seja 0
+    sindrome = _sindrome_palavra_unica(palavra)
+    palavra[paridade] = (sindrome >> np.arange(r)) & 1
+    return palavra
+
+
+def _sindrome_palavra_unica(palavra: np.ndarray) -> int:
+    """XOR das posições (a partir de 1) dos bits '1' da palavra."""
+    posicoes = np.flatnonzero(palavra) + 1
+    return int(np.bitwise_xor.reduce(posicoes)) if posicoes.size else 0
+
+
+def decodificar_hamming_palavra_unica(bits) -> tuple[np.ndarray, int]:
+    """
+    Modo legado: verifica a palavra única e corrige 1 erro.
+    Retorna: (dados sem os bits de paridade, posicao_erro)
+    posicao_erro = 0 sem erro; pode ser maior que o tamanho da palavra (erro não corrigível).
+    """
+    palavra = np.array(bits, dtype=np.uint8).reshape(-1)
+    posicao_erro = _sindrome_palavra_unica(palavra)
+    if 0 < posicao_erro <= palavra.size:
+        palavra[posicao_erro - 1] ^= 1
+    return palavra[~_posicoes_de_paridade(palavra.size)], posicao_erro
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: deteccao_erros.py
+
+Núcleo de cálculo da Detecção de Erros, compartilhado pelo Transmissor e pelo Receptor.
+
+Funções incluídas:
+- CRC-32 (IEEE 802.3, polinômio 0x04C11DB7, sem reflexão, valor inicial 0 e sem XOR final):
+  tabela de 256 entradas byte a byte e caminho opcional slicing-by-8.
+- Objetos incrementais no estilo hashlib (update/digest/copy): Crc32, Checksum8 e EvenParity,
+  para calcular os códigos sobre quadros que chegam em pedaços (arquivo, socket, ...).
+
+O CRC é o resto da divisão polinomial de M(x) * x^32 por P(x), exatamente como a divisão
+bit a bit original; por isso zeros à esquerda não alteram o resultado e mensagens com
+número de bits não múltiplo de 8 podem ser completadas com zeros à esquerda.
+"""
+
+import struct
+
+import numpy as np
+
+from buffer_bits import BufferBits, para_buffer
+
+POLI_CRC32 = 0x04C11DB7
+_MASCARA_32 = 0xFFFFFFFF
+
+
+def _gerar_tabelas_crc32(num_tabelas: int = 8) -> list[list[int]]:
+    """
+    Gera as tabelas do CRC-32.
+    tabelas[0][b]: CRC do byte b (tabela clássica byte a byte).
+    tabelas[k][b]: efeito do byte b seguido de k bytes zero (usadas no slicing-by-8).
+    """
+    tabela = []
+    for byte in range(256):
+        crc = byte << 24
+        for _ in range(8):
+            if crc & 0x80000000:
+                crc = ((crc << 1) ^ POLI_CRC32) & _MASCARA_32
+            else:
+                crc = (crc << 1) & _MASCARA_32
+        tabela.append(crc)
+
+    tabelas = [tabela]
+    for _ in range(1, num_tabelas):
+        anterior = tabelas[-1]
+        tabelas.append([((c << 8) & _MASCARA_32) ^ tabela[c >> 24] for c in anterior])
+    return tabelas
+
+
+TABELAS_CRC32 = _gerar_tabelas_crc32()
+
+
+def crc32_bytes(dados, crc: int = 0, slicing_by_8: bool = True) -> int:
+    """
+    Atualiza o CRC-32 com os bytes de 'dados' (bytes, bytearray, memoryview ou array uint8).
+    - crc: valor acumulado de chamadas anteriores (0 para começar).
+    - slicing_by_8: processa 8 bytes por iteração com 8 tabelas; o restante
+      (ou tudo, se False) é processado byte a byte com a tabela de 256 entradas.
+    """
+    dados = memoryview(dados).cast('B')
+    t0 = TABELAS_CRC32[0]
+    inicio_resto = 0
+
+    if slicing_by_8:
+        t1, t2, t3, t4, t5, t6, t7 = TABELAS_CRC32[1:]
+        inicio_resto = len(dados) - len(dados) % 8
+        for alto, baixo in struct.iter_unpack('>II', dados[:inicio_resto]):
+            alto ^= crc
+            crc = (t7[alto >> 24] ^ t6[(alto >> 16) & 0xFF] ^ t5[(alto >> 8) & 0xFF] ^ t4[alto & 0xFF]
+                   ^ t3[baixo >> 24] ^ t2[(baixo >> 16) & 0xFF] ^ t1[(baixo >> 8) & 0xFF] ^ t0[baixo & 0xFF])
+
+    for byte in dados[inicio_resto:]:
+        crc = ((crc << 8) & _MASCARA_32) ^ t0[(crc >> 24) ^ byte]
+    return crc
+
+
+# -------------------------------------------------------------------
+# Objetos incrementais (estilo hashlib)
+# -------------------------------------------------------------------
+# Cada update(pedaco) aceita str de '0'/'1', BufferBits ou bytes-like (8 bits por byte);
+# os pedaços podem ter qualquer número de bits. O resultado é o mesmo de calcular o código
+# sobre a concatenação de todos os pedaços de uma só vez.
+
+class Crc32:
+    """
+    CRC-32 incremental, igual ao de crc32_bytes / enlace_transmissor.crc32.
+    Bits que ainda não completam um byte ficam pendentes até o próximo update ou o digest.
+    Verificação no receptor: alimentar o quadro inteiro (dados + CRC); válido se digest() == 4 bytes zero.
+    """
+
+    name = "crc32"
+    digest_size = 4
+
+    def __init__(self, dados=None, slicing_by_8: bool = True):
+        self._crc = 0
+        self._pendentes = BufferBits()
+        self._slicing_by_8 = slicing_by_8
+        if dados is not None:
+            self.update(dados)
+
+    def update(self, pedaco) -> None:
+        pedaco = para_buffer(pedaco)
+        if len(self._pendentes):
+            pedaco = self._pendentes + pedaco
+        completos = len(pedaco) // 8 * 8
+        if completos:
+            self._crc = crc32_bytes(pedaco[:completos].empacotado(), self._crc, self._slicing_by_8)
+        self._pendentes = pedaco[completos:]
+
+    def _valor(self) -> int:
+        # Bits pendentes (< 8) entram na divisão bit a bit, sem alterar o estado
+        crc = self._crc
+        for bit in self._pendentes:
+            topo = (crc >> 31) ^ bit
+            crc = (crc << 1) & _MASCARA_32
+            if topo:
+                crc ^= POLI_CRC32
+        return crc
+
+    def digest(self) -> bytes:
+        return self._valor().to_bytes(4, 'big')
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def digest_bits(self) -> BufferBits:
+        """Os 32 bits do CRC, prontos para anexar ao quadro."""
+        return BufferBits.de_bytes(self.digest())
+
+    def copy(self) -> "Crc32":
+        copia = Crc32(slicing_by_8=self._slicing_by_8)
+        copia._crc, copia._pendentes = self._crc, self._pendentes
+        return copia
+
+
+class Checksum8:
+    """
+    Checksum de 8 bits (complemento de um) incremental, igual ao de adicionar_checksum.
+
+    A soma em complemento de um dos bytes é congruente, módulo 255, ao valor inteiro da
+    mensagem (256 = 1 mod 255). Por isso basta acumular esse valor módulo 255, o que torna
+    o resultado independente de como a mensagem é cortada em pedaços e reproduz o padding
+    de zeros à esquerda do transmissor mesmo sem conhecer o tamanho total de antemão.
+    Verificação no receptor: alimentar dados + checksum; válido se digest() == b'\x00'.
+    """
+
+    name = "checksum8"
+    digest_size = 1
+
+    def __init__(self, dados=None):
+        self._resto = 0        # valor da mensagem módulo 255
+        self._algum_um = False
+        if dados is not None:
+            self.update(dados)
+
+    def update(self, pedaco) -> None:
+        pedaco = para_buffer(pedaco)
+        soma_pedaco = int(pedaco.empacotado_com_zeros_a_esquerda().sum(dtype=np.int64))
+        self._resto = (self._resto * pow(2, len(pedaco), 255) + soma_pedaco) % 255
+        self._algum_um = self._algum_um or soma_pedaco != 0
+
+    def soma(self) -> int:
+        """Soma em complemento de um (com o 'carry' já enrolado), entre 0 e 0xFF."""
+        if not self._algum_um:
+            return 0
+        return self._resto or 0xFF
+
+    def digest(self) -> bytes:
+        return bytes([(~self.soma()) & 0xFF])
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def digest_bits(self) -> BufferBits:
+        """Os 8 bits do checksum, prontos para anexar ao quadro."""
+        return BufferBits.de_bytes(self.digest())
+
+    def copy(self) -> "Checksum8":
+        copia = Checksum8()
+        copia._resto, copia._algum_um = self._resto, self._algum_um
+        return copia
+
+
+class EvenParity:
+    """
+    Paridade par incremental, igual à de adicionar_paridade_par.
+    Verificação no receptor: alimentar dados + bit de paridade; válido se digest() == b'\x00'.
+    """
+
+    name = "even_parity"
+    digest_size = 1
+
+    def __init__(self, dados=None):
+        self._paridade = 0
+        if dados is not None:
+            self.update(dados)
+
+    def update(self, pedaco) -> None:
+        self._paridade ^= para_buffer(pedaco).contar_uns() & 1
+
+    def digest(self) -> bytes:
+        return bytes([self._paridade])
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def digest_bits(self) -> BufferBits:
+        """O bit de paridade, pronto para anexar ao quadro."""
+        return BufferBits.de_bits([self._paridade])
+
+    def copy(self) -> "EvenParity":
+        copia = EvenParity()
+        copia._paridade = self._paridade
+        return copia
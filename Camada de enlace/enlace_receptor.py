@@ -8,252 +8,313 @@ para o simulador de redes.
 Funções incluídas:
 1.  Desenquadramento (De-framing):
     - desenquadrar_contagem_caracteres
-    - desenquadrar_bit_stuffing
+    - desenquadrar_bit_stuffing / desenquadrar_bit_stuffing_fluxo
     - desenquadrar_byte_stuffing
 2.  Detecção de Erros (Error Detection):
-    - verificar_paridade_par (Com correção de padding)
-    - verificar_checksum
-    - verificar_crc32
+    - verificar_paridade_par
+    - verificar_checksum / verificar_checksum_incremental
+    - verificar_crc32 / verificar_crc32_incremental
 3.  Correção de Erros (Error Correction):
-    - receptor_hamming
+    - receptor_hamming (palavra única ou em blocos)
 """
 
+import logging
+import re
+
+import numpy as np
+
+from buffer_bits import BufferBits, para_buffer, restaurar_tipo
+from correcao_erros import CODIGOS_HAMMING, decodificar_hamming, decodificar_hamming_palavra_unica
+from deteccao_erros import Checksum8, Crc32, crc32_bytes
+from insercao_bits import FLAG, RemocaoDeBits
+
+# Registro da camada: sem handler configurado nada é emitido, e mensagens abaixo do
+# nível ativo custam só a verificação do nível (argumentos formatados sob demanda).
+log = logging.getLogger("enlace.receptor")
+log.addHandler(logging.NullHandler())
+
 # -------------------------------------------------------------------
 # Seção 1: FUNÇÕES AUXILIARES
 # -------------------------------------------------------------------
+# Todas as funções públicas aceitam str de '0'/'1' ou BufferBits (bits empacotados)
+# e devolvem o mesmo tipo recebido.
 
-def _bits_para_lista_de_bytes(bits_dados: str) -> list[int]:
+def _bits_para_lista_de_bytes(bits_dados: str | BufferBits) -> np.ndarray:
     """
-    Converte string de bits em lista de bytes (inteiros).
+    Converte os bits em um array de bytes (uint8).
     Assume que o input já está alinhado ou o padding será tratado pelo chamador.
     """
-    lista_bytes = []
-    # Processa em blocos de 8 bits
-    for i in range(0, len(bits_dados), 8):
-        byte_str = bits_dados[i:i+8]
-        # Se sobrar um pedaço menor que 8 bits no final, processa também
-        if byte_str: 
-            lista_bytes.append(int(byte_str, 2))
+    buffer = para_buffer(bits_dados)
+    completos = len(buffer) // 8 * 8
+    lista_bytes = buffer[:completos].empacotado()
+    # Se sobrar um pedaço menor que 8 bits no final, processa também (valor dos bits restantes)
+    if completos < len(buffer):
+        lista_bytes = np.append(lista_bytes, np.uint8(buffer[completos:].para_int()))
     return lista_bytes
 
-def _lista_de_bytes_para_bits(lista_bytes: list[int]) -> str:
-    """Converte lista de bytes (inteiros) em string de bits."""
-    return ''.join(format(byte, '08b') for byte in lista_bytes)
-
-def _e_potencia_de_2(n: int) -> bool:
-    """Verifica se um número é potência de 2."""
-    return (n > 0) and (n & (n - 1) == 0)
+def _lista_de_bytes_para_bits(lista_bytes) -> BufferBits:
+    """Converte lista/array de bytes (inteiros) em BufferBits."""
+    return BufferBits.de_bytes(np.asarray(lista_bytes, dtype=np.uint8))
 
 
 # -------------------------------------------------------------------
 # Seção 2: DESENQUADRAMENTO (DE-FRAMING)
 # -------------------------------------------------------------------
 
-def desenquadrar_contagem_caracteres(quadro_bits: str) -> str:
+def desenquadrar_contagem_caracteres(quadro_bits: str | BufferBits,
+                                     tamanho_bits: int | None = None) -> str | BufferBits:
     """
     Desenquadra dados usando Contagem de Caracteres.
     Lê o primeiro byte (cabeçalho) para saber o tamanho e extrai os dados.
+    O cabeçalho conta bytes: o TX completa os dados com zeros à esquerda até um múltiplo de 8.
+    Com tamanho_bits (o comprimento dos dados antes do alinhamento, quando conhecido), esse
+    padding é removido; sem ele, os dados voltam alinhados em bytes.
     Retorna: Apenas os dados (sem o cabeçalho).
     """
-    print("[RX-Desenquadramento] Contagem de Caracteres")
+    log.debug("[RX-Desenquadramento] Contagem de Caracteres")
     
     if len(quadro_bits) < 8:
         raise ValueError("Quadro muito curto para conter cabeçalho.")
 
+    quadro = para_buffer(quadro_bits)
+
     # 1. Ler o cabeçalho (primeiros 8 bits)
-    tamanho_em_bytes = int(quadro_bits[0:8], 2)
+    tamanho_em_bytes = quadro[0:8].para_int()
     
     tamanho_esperado_bits = tamanho_em_bytes * 8
     
     inicio_dados = 8
     fim_dados = 8 + tamanho_esperado_bits
     
-    if len(quadro_bits) < fim_dados:
-        print(f"[AVISO] Quadro recebido menor que o esperado ({len(quadro_bits)} < {fim_dados}).")
+    if len(quadro) < fim_dados:
+        log.warning("Quadro recebido menor que o esperado (%d < %d).", len(quadro), fim_dados)
     
-    dados = quadro_bits[inicio_dados:fim_dados]
-    return dados
+    # Fatia sem cópia do quadro empacotado
+    dados = quadro[inicio_dados:fim_dados]
+    if tamanho_bits is not None and len(dados) > tamanho_bits:
+        dados = dados[len(dados) - tamanho_bits:]
+    return restaurar_tipo(dados, quadro_bits)
 
 
 # --- Constantes para Byte Stuffing ---
 FLAG_BYTE_INT = 0x7E  # 126
 ESC_BYTE_INT  = 0x7D  # 125
+FLAG_BYTE = bytes([FLAG_BYTE_INT])
+ESC_BYTE = bytes([ESC_BYTE_INT])
+# ESC seguido do byte literal (opcional: um ESC no final do quadro não tem par)
+_PADRAO_ESCAPE = re.compile(re.escape(ESC_BYTE) + b"(.?)", re.DOTALL)
 
-def desenquadrar_byte_stuffing(quadro_bits: str) -> str:
+def desenquadrar_byte_stuffing(quadro_bits: str | BufferBits | bytes) -> str | BufferBits | bytes:
     """
     Desenquadra dados usando Byte Stuffing.
     Remove flags de início/fim e trata os caracteres de escape (ESC).
+
+    Sem nenhum ESC no quadro, os dados são apenas o miolo entre as flags. Caso contrário,
+    uma única passada de re.split (em C) separa o quadro nos pares ESC + byte literal.
     """
-    print("[RX-Desenquadramento] Byte Stuffing")
+    log.debug("[RX-Desenquadramento] Byte Stuffing")
     
-    lista_bytes = _bits_para_lista_de_bytes(quadro_bits)
+    quadro = _bits_para_lista_de_bytes(quadro_bits).tobytes()
     
     # Validação básica de Flags
-    if len(lista_bytes) < 2:
-        return "" 
+    if len(quadro) < 2:
+        return restaurar_tipo(BufferBits(), quadro_bits)
         
-    if lista_bytes[0] == FLAG_BYTE_INT and lista_bytes[-1] == FLAG_BYTE_INT:
+    if quadro[0] == FLAG_BYTE_INT and quadro[-1] == FLAG_BYTE_INT:
         # Remove as flags das pontas
-        meio = lista_bytes[1:-1]
+        meio = quadro[1:-1]
+    else:
+        log.warning("Flags de início/fim não encontradas ou incorretas.")
+        meio = quadro
+
+    escape_no_final = False
+    if ESC_BYTE not in meio:
+        # Caso comum: nada a remover
+        trechos_sem_escape = [meio]
+        dados_desenquadrados = meio
     else:
-        print("[AVISO] Flags de início/fim não encontradas ou incorretas.")
-        meio = lista_bytes
+        # Posições pares: trechos sem escape; ímpares: o byte literal após cada ESC
+        # (vazio para um ESC no final do quadro, que é descartado)
+        partes = _PADRAO_ESCAPE.split(meio)
+        trechos_sem_escape = partes[::2]
+        dados_desenquadrados = b"".join(partes)
+        escape_no_final = partes[-2] == b""
 
-    dados_desenquadrados = []
-    i = 0
-    while i < len(meio):
-        byte_atual = meio[i]
-        
-        if byte_atual == ESC_BYTE_INT:
-            # Encontrou ESC: O próximo byte é um dado literal
-            i += 1
-            if i < len(meio):
-                dados_desenquadrados.append(meio[i])
-            else:
-                print("[ERRO] Caractere de escape no final do quadro.")
-        elif byte_atual == FLAG_BYTE_INT:
-            print("[AVISO] Flag encontrada no meio dos dados sem escape.")
-            dados_desenquadrados.append(byte_atual)
-        else:
-            # Byte normal
-            dados_desenquadrados.append(byte_atual)
-        i += 1
+    flags_sem_escape = sum(trecho.count(FLAG_BYTE) for trecho in trechos_sem_escape)
+    if flags_sem_escape:
+        log.warning("Flag encontrada no meio dos dados sem escape (%d vezes).", flags_sem_escape,
+                    extra={"flags_sem_escape": flags_sem_escape})
+    if escape_no_final:
+        log.error("Caractere de escape no final do quadro.")
 
-    return _lista_de_bytes_para_bits(dados_desenquadrados)
+    return restaurar_tipo(BufferBits.de_bytes(dados_desenquadrados), quadro_bits)
 
 
 # --- Constante para Bit Stuffing ---
 FLAG_BITS = '01111110'
 
-def desenquadrar_bit_stuffing(quadro_bits: str) -> str:
+def desenquadrar_bit_stuffing(quadro_bits: str | BufferBits) -> str | BufferBits:
     """
     Desenquadra dados usando Bit Stuffing.
-    Remove o '0' inserido após cinco '1's consecutivos.
+    Remove o '0' inserido após cinco '1's consecutivos (motor vetorizado de insercao_bits).
     """
-    print("[RX-Desenquadramento] Bit Stuffing")
+    log.debug("[RX-Desenquadramento] Bit Stuffing")
     
     # Remove flags se estiverem presentes nas extremidades
-    dados_processar = quadro_bits
-    if dados_processar.startswith(FLAG_BITS):
-        dados_processar = dados_processar[len(FLAG_BITS):]
-    if dados_processar.endswith(FLAG_BITS):
-        dados_processar = dados_processar[:-len(FLAG_BITS)]
-        
-    dados_saida = ""
-    contagem_uns = 0
-    i = 0
-    
-    while i < len(dados_processar):
-        bit = dados_processar[i]
+    dados_processar = para_buffer(quadro_bits).bits()
+    if np.array_equal(dados_processar[:len(FLAG)], FLAG):
+        dados_processar = dados_processar[len(FLAG):]
+    if np.array_equal(dados_processar[-len(FLAG):], FLAG):
+        dados_processar = dados_processar[:-len(FLAG)]
         
-        if bit == '1':
-            contagem_uns += 1
-            dados_saida += '1'
-            i += 1
-        else: # bit == '0'
-            if contagem_uns == 5:
-                # Este '0' foi inserido pelo stuffing. Deve ser removido.
-                contagem_uns = 0
-                i += 1 
-            else:
-                # É um '0' normal
-                contagem_uns = 0
-                dados_saida += '0'
-                i += 1
+    dados_saida = RemocaoDeBits().processar(dados_processar)
                 
-    return dados_saida
+    return restaurar_tipo(BufferBits.de_bits(dados_saida), quadro_bits)
+
+
+def desenquadrar_bit_stuffing_fluxo(partes):
+    """
+    Versão em fluxo de desenquadrar_bit_stuffing: recebe um iterável de pedaços (str,
+    BufferBits ou bytes) do quadro e gera BufferBits com os dados sem stuffing.
+    A FLAG inicial é removida assim que os 8 primeiros bits chegam; os 8 últimos bits
+    ficam retidos até o fim do fluxo para remover a FLAG final, como no quadro inteiro.
+    """
+    log.debug("[RX-Desenquadramento] Bit Stuffing (fluxo)")
+    remocao = RemocaoDeBits()
+    pendentes = np.empty(0, dtype=np.uint8)
+    inicio_verificado = False
+
+    for parte in partes:
+        pendentes = np.concatenate((pendentes, para_buffer(parte).bits()))
+        if not inicio_verificado:
+            if len(pendentes) < len(FLAG):
+                continue
+            if np.array_equal(pendentes[:len(FLAG)], FLAG):
+                pendentes = pendentes[len(FLAG):]
+            inicio_verificado = True
+        if len(pendentes) > len(FLAG):
+            prontos, pendentes = pendentes[:-len(FLAG)], pendentes[-len(FLAG):]
+            yield BufferBits.de_bits(remocao.processar(prontos))
+
+    if np.array_equal(pendentes, FLAG):
+        pendentes = pendentes[:0]
+    yield BufferBits.de_bits(remocao.processar(pendentes))
 
 
 # -------------------------------------------------------------------
 # Seção 3: DETECÇÃO DE ERROS (ERROR DETECTION)
 # -------------------------------------------------------------------
 
-def verificar_paridade_par(bits_recebidos: str) -> tuple[bool, str]:
+def verificar_paridade_par(bits_recebidos: str | BufferBits) -> tuple[bool, str | BufferBits]:
     """
     Verifica a paridade par.
     Retorna: (True se válido/False se inválido, dados_sem_o_bit_paridade)
-    
-    Nota: Esta função remove o padding de alinhamento indesejado no início, 
-    que foi inserido pelo TX para garantir que a Contagem de Caracteres funcione.
+
+    Nota: o padding de alinhamento da Contagem de Caracteres não é removido aqui (ver
+    desenquadrar_contagem_caracteres(..., tamanho_bits)): zeros à esquerda são dados.
     """
-    print("[RX-Detecção] Verificando Paridade Par...")
+    log.debug("[RX-Detecção] Verificando Paridade Par...")
     
-    if not bits_recebidos:
-        return False, ""
+    if not len(bits_recebidos):
+        return False, restaurar_tipo(BufferBits(), bits_recebidos)
+
+    buffer = para_buffer(bits_recebidos)
 
     # 1. Verificação da Paridade (em todos os bits recebidos)
-    paridade = 0
-    for bit in bits_recebidos:
-        paridade ^= int(bit)
-        
-    valido = paridade == 0
+    valido = buffer.contar_uns() % 2 == 0
     
     # 2. Remoção do Bit de Paridade (último bit)
-    dados_com_padding = bits_recebidos[:-1]
-    
+    dados_finais = buffer[:-1]
     
     if not valido:
-        print("[ERRO] Falha na verificação de paridade.")
+        log.info("Falha na verificação de paridade.")
     
-    return valido, dados_finais
+    return valido, restaurar_tipo(dados_finais, bits_recebidos)
 
 
-def verificar_checksum(bits_com_checksum: str) -> tuple[bool, str]:
+def verificar_checksum(bits_com_checksum: str | BufferBits) -> tuple[bool, str | BufferBits]:
     """
     Verifica o Checksum em blocos de 8 bits.
     A soma de todos os blocos (dados + checksum) deve resultar em 0xFF.
     Retorna: (True se válido/False se inválido, dados_sem_o_checksum)
     """
-    print("[RX-Detecção] Verificando Checksum 8-bit...")
+    log.debug("[RX-Detecção] Verificando Checksum 8-bit...")
 
     if len(bits_com_checksum) % 8 != 0 or len(bits_com_checksum) < 16:
-        print("[ERRO] Quadro incompleto ou desalinhado para verificação de Checksum.")
+        log.error("Quadro incompleto ou desalinhado para verificação de Checksum.")
         return False, bits_com_checksum
 
-    soma = 0
-    # 1. Soma TODOS os blocos, INCLUINDO o checksum (último bloco)
-    for i in range(0, len(bits_com_checksum), 8):
-        bloco = bits_com_checksum[i:i+8]
-        soma += int(bloco, 2)
-        
-    # 2. Trata o "carry" (enrola o estouro)
-    while (soma >> 8) > 0:
-        soma = (soma & 0xFF) + (soma >> 8)
+    buffer = para_buffer(bits_com_checksum)
+
+    # 1. Soma TODOS os blocos, INCLUINDO o checksum (último bloco), em complemento de um
+    # 2. Trata o "carry" (enrola o estouro) - ver deteccao_erros.Checksum8
+    soma = Checksum8(buffer).soma()
         
-    dados_originais = bits_com_checksum[:-8] # Remove os 8 bits de checksum
+    dados_originais = restaurar_tipo(buffer[:-8], bits_com_checksum) # Remove os 8 bits de checksum
     
     # 3. Verificação: Se a soma final (complemento de 1) for 0xFF (todos os bits '1'), está correto.
     if soma == 0xFF:
         return True, dados_originais
     else:
-        print(f"[ERRO] Falha na verificação de Checksum. Soma final: {format(soma, '08b')}")
+        log.info("Falha na verificação de Checksum. Soma final: 0x%02X", soma, extra={"soma": soma})
         return False, dados_originais
 
 
+def verificar_checksum_incremental(partes) -> bool:
+    """
+    Verifica o Checksum de um quadro (dados + checksum) recebido em pedaços (iterável de str,
+    BufferBits ou bytes): a soma em complemento de um de tudo deve resultar em 0xFF.
+    Não separa os dados; use verificar_checksum quando precisar deles de volta.
+    """
+    log.debug("[RX-Detecção] Verificando Checksum 8-bit (incremental)...")
+    checksum = Checksum8()
+    for parte in partes:
+        checksum.update(parte)
+    valido = checksum.soma() == 0xFF
+    if not valido:
+        log.info("Falha na verificação de Checksum. Soma final: 0x%02X", checksum.soma(),
+                 extra={"soma": checksum.soma()})
+    return valido
+
+
 POLI_CRC32 = 0x104C11DB7
 
-def verificar_crc32(bits_recebidos: str) -> bool:
+def verificar_crc32(bits_recebidos: str | BufferBits, slicing_by_8: bool = True) -> bool:
     """
     Verifica se o CRC-32 é válido.
     Recebe a mensagem completa (Dados + Padding + CRC).
     Retorna True se o resto da divisão for 0.
+    
+    Como x^32 e POLI_CRC32 são primos entre si, o resto de M(x) é 0 exatamente quando
+    o CRC (resto de M(x) * x^32) calculado pela tabela sobre o quadro inteiro é 0.
     """
-    print("[RX-Detecção] Verificando CRC-32...")
+    log.debug("[RX-Detecção] Verificando CRC-32...")
+    if not len(bits_recebidos):
+        return False
     try:
-        dados_int = int(bits_recebidos, 2)
+        quadro = para_buffer(bits_recebidos)
     except ValueError:
         return False
         
-    msb_index = dados_int.bit_length() - 1
-    
-    for i in range(msb_index, 31, -1):
-        if (dados_int >> i) & 1:
-            # Alinha o MSB do polinômio (bit 32) com o bit atual (i)
-            dados_int ^= POLI_CRC32 << (i - 32)
-            
-    return dados_int == 0
+    return crc32_bytes(quadro.empacotado_com_zeros_a_esquerda(), slicing_by_8=slicing_by_8) == 0
+
+def verificar_crc32_incremental(partes) -> bool:
+    """
+    Verifica o CRC-32 de um quadro recebido em pedaços (iterável de str, BufferBits ou bytes),
+    sem precisar montar o quadro inteiro. Mesmo resultado de verificar_crc32 sobre a concatenação.
+    """
+    log.debug("[RX-Detecção] Verificando CRC-32 (incremental)...")
+    crc = Crc32()
+    vazio = True
+    try:
+        for parte in partes:
+            crc.update(parte)
+            vazio = vazio and not len(parte)
+    except ValueError:
+        return False
+    return not vazio and crc.digest() == bytes(4)
 
-def remover_crc_e_padding(bits_recebidos: str, pad_len: int = 0) -> str:
+def remover_crc_e_padding(bits_recebidos: str | BufferBits, pad_len: int = 0) -> str | BufferBits:
     """
     Função utilitária para remover o CRC (32 bits) e o Padding (opcional).
     Deve ser chamada apenas se o CRC for validado.
@@ -273,61 +334,41 @@ def remover_crc_e_padding(bits_recebidos: str, pad_len: int = 0) -> str:
 # Seção 4: CORREÇÃO DE ERROS (ERROR CORRECTION)
 # -------------------------------------------------------------------
 
-def receptor_hamming(bits_recebidos: str) -> tuple[str, int]:
+def receptor_hamming(bits_recebidos: str | BufferBits, n: int | None = None):
     """
     Verifica e corrige 1 bit de erro usando Hamming.
     Retorna: (dados_corrigidos_sem_bits_controle, posicao_erro)
     
-    posicao_erro = 0 se não houver erro.
-    Se houver erro, corrige internamente antes de retornar.
+    - n=None (modo legado, palavra única): posicao_erro é um int; 0 se não houver erro.
+      Se houver erro, corrige internamente antes de retornar.
+    - n em 7, 15, 31, 63 (em blocos): posicao_erro é um array com a posição (1..n)
+      corrigida em cada bloco, 0 nos blocos sem erro. Os dados incluem os zeros que
+      o transmissor usou para completar o último bloco.
     """
-    print("[RX-Correção] Hamming: Verificando...")
-    
-    # Adiciona um placeholder no índice 0 para facilitar a matemática (1-based)
-    codigo_recebido = [''] + list(bits_recebidos)
-    n = len(bits_recebidos)
-    
-    # Calcula a Síndrome (posição do erro)
-    posicao_erro = 0
-    
-    # Descobre quantos bits de paridade 'r' existem no quadro
-    num_r = n.bit_length() 
-    
-    # Verifica paridade para cada bit de controle (potências de 2: 1, 2, 4, 8...)
-    for i in range(num_r):
-        pos_paridade = 2**i
-        if pos_paridade > n:
-            break
-            
-        xor_soma = 0
-        # Verifica os bits cobertos por esta paridade
-        for j in range(1, n + 1):
-            # Se o bit 'j' é coberto pela paridade 'i' (bitwise AND)
-            if (j >> i) & 1:
-                if codigo_recebido[j] != '':
-                    xor_soma ^= int(codigo_recebido[j])
-        
-        # Se a soma for ímpar (1), adiciona o peso desta paridade à síndrome
-        if xor_soma != 0:
-            posicao_erro += pos_paridade
+    bits = para_buffer(bits_recebidos).bits()
+
+    if n is not None:
+        log.debug("[RX-Correção] Hamming(%d,%s) em blocos: Verificando...", n, CODIGOS_HAMMING.get(n))
+        dados, posicoes_erro = decodificar_hamming(bits, n)
+        corrigidos = np.count_nonzero(posicoes_erro)
+        if corrigidos:
+            log.info("ERRO DETECTADO em %d de %d blocos. Corrigidos.", corrigidos, posicoes_erro.size,
+                     extra={"blocos_corrigidos": corrigidos})
+        else:
+            log.debug("[RX-Correção] Nenhum erro detectado.")
+        return restaurar_tipo(BufferBits.de_bits(dados), bits_recebidos), posicoes_erro
+
+    log.debug("[RX-Correção] Hamming: Verificando...")
+    dados, posicao_erro = decodificar_hamming_palavra_unica(bits)
             
-    # Correção
+    # Síndrome = XOR das posições dos bits '1' (posição do erro, se houver um)
     if posicao_erro != 0:
-        if posicao_erro <= n:
-            print(f"[RX-Correção] ERRO DETECTADO na posição {posicao_erro}. Corrigindo...")
-            # Inverte o bit
-            bit_atual = codigo_recebido[posicao_erro]
-            codigo_recebido[posicao_erro] = '0' if bit_atual == '1' else '1'
+        if posicao_erro <= bits.size:
+            log.info("ERRO DETECTADO na posição %d. Corrigindo...", posicao_erro, extra={"posicao_erro": posicao_erro})
         else:
-            print(f"[RX-Correção] Erro detectado na posição {posicao_erro} (fora do quadro). Impossível corrigir.")
+            log.warning("Erro detectado na posição %d (fora do quadro). Impossível corrigir.", posicao_erro,
+                        extra={"posicao_erro": posicao_erro})
     else:
-        print("[RX-Correção] Nenhum erro detectado.")
-
-    # Extração dos dados (Remove bits de paridade)
-    dados_originais = ''
-    for i in range(1, n + 1):
-        # Se 'i' NÃO é potência de 2, é bit de dados
-        if not _e_potencia_de_2(i):
-            dados_originais += codigo_recebido[i]
-            
-    return dados_originais, posicao_erro
+        log.debug("[RX-Correção] Nenhum erro detectado.")
+
+    return restaurar_tipo(BufferBits.de_bits(dados), bits_recebidos), posicao_erro
@@ -6,55 +6,54 @@ Módulo que contém todas as funções da Camada de Enlace (Lado do Transmissor)
 para a simulação de redes.
 
 Funções incluídas:
-- Enquadramento: Contagem de Caracteres, Bit Stuffing, Byte Stuffing.
+- Enquadramento: Contagem de Caracteres, Bit Stuffing (também em fluxo), Byte Stuffing (sobre bytes).
 - Detecção de Erros: Paridade Par, Checksum, CRC32.
-- Correção de Erros: Hamming.
+- Correção de Erros: Hamming (palavra única ou em blocos).
 """
 
+import logging
+
+import numpy as np
+
+from buffer_bits import BufferBits, para_buffer, restaurar_tipo
+from correcao_erros import CODIGOS_HAMMING, codificar_hamming, codificar_hamming_palavra_unica
+from deteccao_erros import Checksum8, EvenParity, crc32_bytes
+from insercao_bits import FLAG, InsercaoDeBits
+
+# Registro da camada (ver enlace_receptor.log): silencioso até ser configurado.
+log = logging.getLogger("enlace.transmissor")
+log.addHandler(logging.NullHandler())
+
 # -------------------------------------------------------------------
 # Seção 1: FUNÇÕES AUXILIARES INTERNAS
 # -------------------------------------------------------------------
+# Todas as funções públicas aceitam str de '0'/'1' ou BufferBits (bits empacotados)
+# e devolvem o mesmo tipo recebido.
 
-def _bits_para_lista_de_bytes(bits_dados: str) -> list[int]:
+def _bits_para_lista_de_bytes(bits_dados: str | BufferBits) -> np.ndarray:
     """
-    Função auxiliar interna para converter string de bits em lista de bytes (inteiros).
+    Função auxiliar interna para converter os bits em um array de bytes (uint8).
     Adiciona padding de '0' à ESQUERDA se o comprimento total não for múltiplo de 8.
     """
-    if len(bits_dados) % 8 != 0:
-        padding = 8 - (len(bits_dados) % 8)
-        bits_dados = '0' * padding + bits_dados
-    
-    lista_bytes = []
-    for i in range(0, len(bits_dados), 8):
-        byte_str = bits_dados[i:i+8]
-        lista_bytes.append(int(byte_str, 2))
-    return lista_bytes
-
-def _lista_de_bytes_para_bits(lista_bytes: list[int]) -> str:
-    """Função auxiliar interna para converter lista de bytes (inteiros) em string de bits."""
-    return ''.join(format(byte, '08b') for byte in lista_bytes)
+    return para_buffer(bits_dados).empacotado_com_zeros_a_esquerda()
 
-def _e_potencia_de_2(n: int) -> bool:
-    """Função auxiliar interna para verificar se um número é potência de 2."""
-    if n == 1:
-        return True
-    elif n < 2:
-        return False
-    return (n > 0) and (n & (n - 1) == 0)
+def _lista_de_bytes_para_bits(lista_bytes) -> BufferBits:
+    """Função auxiliar interna para converter lista/array de bytes (inteiros) em BufferBits."""
+    return BufferBits.de_bytes(np.asarray(lista_bytes, dtype=np.uint8))
 
 
 # -------------------------------------------------------------------
 # Seção 2: ENQUADRAMENTO (FRAMING)
 # -------------------------------------------------------------------
 
-def enquadrar_contagem_caracteres(bits_dados: str) -> str:
+def enquadrar_contagem_caracteres(bits_dados: str | BufferBits) -> str | BufferBits:
     """
     Enquadra os dados usando o método de Contagem de Caracteres.
     [HEADER (1 byte)] + [DADOS (N bytes)]
     
     A função auxiliar '_bits_para_lista_de_bytes' garante o alinhamento de bytes.
     """
-    print(f"[TX-Enquadramento] Contagem de Caracteres")
+    log.debug("[TX-Enquadramento] Contagem de Caracteres")
     
     lista_bytes_dados = _bits_para_lista_de_bytes(bits_dados)
     num_bytes = len(lista_bytes_dados)
@@ -62,91 +61,87 @@ def enquadrar_contagem_caracteres(bits_dados: str) -> str:
     if num_bytes > 255:
         raise ValueError("Quadro excede 255 bytes para Contagem de Caracteres.")
         
-    cabecalho = format(num_bytes, '08b')
-    dados_formatados = _lista_de_bytes_para_bits(lista_bytes_dados)
+    quadro = np.concatenate(([num_bytes], lista_bytes_dados)).astype(np.uint8)
     
-    return cabecalho + dados_formatados
+    return restaurar_tipo(_lista_de_bytes_para_bits(quadro), bits_dados)
 
 
 # --- Constantes para Byte Stuffing ---
 FLAG_BYTE_INT = 0x7E  # 126 (binário: 01111110)
 ESC_BYTE_INT  = 0x7D  # 125 (binário: 01111101)
+FLAG_BYTE = bytes([FLAG_BYTE_INT])
+ESC_BYTE = bytes([ESC_BYTE_INT])
 
-def enquadrar_byte_stuffing(bits_dados: str) -> str:
+def enquadrar_byte_stuffing(bits_dados: str | BufferBits | bytes) -> str | BufferBits | bytes:
     """
     Enquadra dados usando a técnica de Inserção de Bytes (Byte Stuffing).
     Escapa bytes FLAG ou ESC que aparecem nos dados.
     [FLAG] + [DADOS_COM_STUFFING] + [FLAG]
+
+    O escape é feito sobre bytes com bytes.replace (em C): primeiro ESC -> ESC ESC e só
+    depois FLAG -> ESC FLAG, para que os ESC inseridos não sejam escapados de novo.
     """
-    print("[TX-Enquadramento] Byte Stuffing")
-    lista_bytes_dados = _bits_para_lista_de_bytes(bits_dados)
-    
-    bytes_stuffed = []
-    
+    log.debug("[TX-Enquadramento] Byte Stuffing")
+    dados = _bits_para_lista_de_bytes(bits_dados).tobytes()
+
     # Adiciona ESC antes de FLAG ou ESC nos dados
-    for byte in lista_bytes_dados:
-        if byte == FLAG_BYTE_INT:
-            bytes_stuffed.extend([ESC_BYTE_INT, FLAG_BYTE_INT])
-        elif byte == ESC_BYTE_INT:
-            bytes_stuffed.extend([ESC_BYTE_INT, ESC_BYTE_INT])
-        else:
-            bytes_stuffed.append(byte)
-            
+    bytes_stuffed = dados.replace(ESC_BYTE, ESC_BYTE + ESC_BYTE).replace(FLAG_BYTE, ESC_BYTE + FLAG_BYTE)
+
     # Adiciona as flags delimitadoras
-    quadro_final_bytes = [FLAG_BYTE_INT] + bytes_stuffed + [FLAG_BYTE_INT]
-    
-    return _lista_de_bytes_para_bits(quadro_final_bytes)
+    quadro_final_bytes = b"".join((FLAG_BYTE, bytes_stuffed, FLAG_BYTE))
+
+    return restaurar_tipo(BufferBits.de_bytes(quadro_final_bytes), bits_dados)
 
 
 # --- Constante para Bit Stuffing ---
 FLAG_BITS = '01111110'
 
-def enquadrar_bit_stuffing(bits_dados: str) -> str:
+def enquadrar_bit_stuffing(bits_dados: str | BufferBits) -> str | BufferBits:
     """
     Enquadra dados usando a técnica de Inserção de Bits (Bit Stuffing).
-    Insere um '0' após cinco '1's consecutivos.
+    Insere um '0' após cinco '1's consecutivos (motor vetorizado de insercao_bits).
     [FLAG] + [DADOS_COM_STUFFING] + [FLAG]
     """
-    print("[TX-Enquadramento] Bit Stuffing")
-    dados_stuffed = ''
-    contagem_uns = 0
-    
-    for bit in bits_dados:
-        if bit == '1':
-            dados_stuffed += '1'
-            contagem_uns += 1
-        else: # bit == '0'
-            dados_stuffed += '0'
-            contagem_uns = 0
+    log.debug("[TX-Enquadramento] Bit Stuffing")
+    dados_stuffed = InsercaoDeBits().processar(para_buffer(bits_dados).bits())
             
-        # Insere o bit de stuffing
-        if contagem_uns == 5:
-            dados_stuffed += '0'
-            contagem_uns = 0
-            
-    return FLAG_BITS + dados_stuffed + FLAG_BITS
+    quadro = BufferBits.de_bits(np.concatenate((FLAG, dados_stuffed, FLAG)))
+    return restaurar_tipo(quadro, bits_dados)
+
+
+def enquadrar_bit_stuffing_fluxo(partes):
+    """
+    Versão em fluxo de enquadrar_bit_stuffing: recebe um iterável de pedaços (str,
+    BufferBits ou bytes) e gera BufferBits: FLAG, cada pedaço com stuffing, FLAG.
+    A contagem de '1's atravessa as fronteiras entre pedaços, então a concatenação
+    do que é gerado é idêntica ao enquadramento do quadro inteiro.
+    """
+    log.debug("[TX-Enquadramento] Bit Stuffing (fluxo)")
+    insercao = InsercaoDeBits()
+    yield BufferBits.de_bits(FLAG)
+    for parte in partes:
+        yield BufferBits.de_bits(insercao.processar(para_buffer(parte).bits()))
+    yield BufferBits.de_bits(FLAG)
 
 
 # -------------------------------------------------------------------
 # Seção 3: DETECÇÃO DE ERROS (ERROR DETECTION)
 # -------------------------------------------------------------------
 
-def adicionar_paridade_par(bits_dados: str) -> str:
+def adicionar_paridade_par(bits_dados: str | BufferBits) -> str | BufferBits:
     """
     Calcula a paridade par para a string de bits e a anexa no final.
     O bit de paridade é 0 se o número de '1's for par, 1 caso contrário.
     [DADOS] + [BIT_PARIDADE]
     """
 
-    print(f"[TX-Detecção] Paridade Par: Aplicando...")
-    paridade = 0
-    for bit in bits_dados:
-        paridade ^= int(bit)
+    log.debug("[TX-Detecção] Paridade Par: Aplicando...")
+    buffer = para_buffer(bits_dados)
 
-    return bits_dados + str(paridade)
+    return restaurar_tipo(buffer + EvenParity(buffer).digest_bits(), bits_dados)
 
 
-def adicionar_checksum(bits_dados: str) -> str:
+def adicionar_checksum(bits_dados: str | BufferBits) -> str | BufferBits:
     """
     Calcula o Checksum (Soma de Verificação) em blocos de 8 bits
     usando aritmética de complemento de um (one's complement) e anexa ao final.
@@ -154,114 +149,62 @@ def adicionar_checksum(bits_dados: str) -> str:
     
     Usa _bits_para_lista_de_bytes para o alinhamento inicial.
     """
-    print(f"[TX-Detecção] Checksum 8-bit: Calculando...")
+    log.debug("[TX-Detecção] Checksum 8-bit: Calculando...")
     
     # 1. Alinha os dados para blocos de 8 bits usando a função auxiliar
-    # (Adiciona padding '0' à esquerda e retorna lista de inteiros)
+    # (Adiciona padding '0' à esquerda e retorna os bytes como uint8)
     lista_bytes_dados = _bits_para_lista_de_bytes(bits_dados)
         
-    soma = 0
-    
-    # 2. Soma os blocos de 8 bits (como inteiros)
-    for byte in lista_bytes_dados:
-        soma += byte
-        
-    # 3. Trata o "carry" (enrola o estouro - característica do complemento de 1)
-    while (soma >> 8) > 0:
-        soma = (soma & 0xFF) + (soma >> 8)
-        
-    # 4. O checksum é o complemento de 1 da soma final
-    checksum = (~soma) & 0xFF
+    # 2. Soma os blocos de 8 bits em complemento de um (com o "carry" enrolado)
+    #    e toma o complemento de 1 da soma final (ver deteccao_erros.Checksum8)
+    checksum = Checksum8(lista_bytes_dados.tobytes()).digest()[0]
     
-    checksum_bits = format(checksum, '08b')
+    # Dados (com padding) seguidos do byte de checksum
+    quadro = np.append(lista_bytes_dados, np.uint8(checksum))
     
-    # Converte os dados (com padding) de volta para string de bits para concatenação
-    dados_formatados = _lista_de_bytes_para_bits(lista_bytes_dados)
-    
-    return dados_formatados + checksum_bits
+    return restaurar_tipo(_lista_de_bytes_para_bits(quadro), bits_dados)
 
 
 POLI = 0x104C11DB7
 
-def crc32(bits_str: str) -> tuple[str, int]:
+def crc32(bits_str: str | BufferBits, slicing_by_8: bool = True) -> tuple[str | BufferBits, int]:
     """
     Aplica padding específico (<64 bits) e calcula o CRC-32 (IEEE 802.3).
-    O cálculo usa divisão bitwise/aritmética.
+    O cálculo usa tabela byte a byte (opcionalmente slicing-by-8) sobre os bytes
+    empacotados; o resultado é o mesmo da divisão polinomial bit a bit por POLI.
     Retorna: (mensagem_final_com_crc, tamanho_do_padding)
     """
-    pad_len = max(0, 64 - len(bits_str))
-    padding = "".join(str(i % 2) for i in range(pad_len))
-    dados_padded = bits_str + padding
-    
-    # Prepara dados para divisão: converte para inteiro e adiciona 32 zeros
-    data_int = int(dados_padded, 2) << 32
+    buffer = para_buffer(bits_str)
+    pad_len = max(0, 64 - len(buffer))
+    padding = BufferBits.de_bits(np.arange(pad_len) % 2)
+    dados_padded = buffer + padding
     
-    # 2. Loop de divisão polinomial
-    highest_bit = data_int.bit_length() - 1 if data_int != 0 else 0
-    
-    for i in range(highest_bit, 31, -1):
-        if (data_int >> i) & 1:
-            data_int ^= POLI << (i - 32)
-
-    # O resto são os 32 bits menos significativos (o CRC)
-    crc_val = data_int & 0xFFFFFFFF
+    # Zeros à esquerda não alteram o resto da divisão: alinha em bytes e usa a tabela
+    crc_val = crc32_bytes(dados_padded.empacotado_com_zeros_a_esquerda(), slicing_by_8=slicing_by_8)
     
-    crc_str = format(crc_val, '032b')
+    crc_bits = BufferBits.de_bytes(crc_val.to_bytes(4, 'big'))
     
-    return dados_padded + crc_str, pad_len
+    return restaurar_tipo(dados_padded + crc_bits, bits_str), pad_len
 
 
 # -------------------------------------------------------------------
 # Seção 4: CORREÇÃO DE ERROS (ERROR CORRECTION)
 # -------------------------------------------------------------------
 
-def transmissor_hamming(bits_dados: str) -> str:
+def transmissor_hamming(bits_dados: str | BufferBits, n: int | None = None) -> str | BufferBits:
     """
     Codifica os dados com bits de Hamming, inserindo bits de paridade
     nas posições que são potências de 2.
-    """
-    print(f"[TX-Correção] Hamming: Codificando...")
-    msg = '$' + bits_dados 
-    aux = ''
-    bits_verif = {}
-    cont = 0
-
-    m = len(bits_dados)
-    r = 0
-    # Calcula o número de bits de paridade 'r' necessários
-    while (2**r < r + m + 1): 
-        r += 1 
-
-    # 1. Cria a lista com posições dos bits de verificação ('b')
-    for i in range (1, m + r + 1):
-        if _e_potencia_de_2(i):
-            aux += 'b'
-            bits_verif[i] = '0'
-        else:
-            aux += msg[cont+1]
-            cont += 1
-
-    aux = '$' + aux
-
-    # 2. Pega os bits para calcular os bits verificadores
-    for i in range (1, len(aux)):
-        if aux[i] == 'b':
-            bits_a_somar = ''
-            pulo = i
-            while (pulo < len(aux)):
-                bits_a_somar += aux[pulo:pulo+i]
-                pulo += i + i
-            bits_verif[i] = bits_a_somar[1:] 
-
-    # 3. Calculando a paridade (XOR)
-    lista = list(aux)
-    for key, value in bits_verif.items():
-        res = int(value[0])
-        for bit in value[1:]:
-            res ^= int(bit)
-        bits_verif[key] = str(res)
-        lista[key] = str(res)
-    
-    aux = ''.join(lista)
-
-    return aux[1:]
+    - n=None: modo legado, um único código sobre a mensagem inteira (corrige 1 erro no total).
+    - n em 7, 15, 31, 63: Hamming (n, k) em blocos, corrige 1 erro por bloco; a mensagem
+      é completada com zeros à direita até um múltiplo de k.
+    """
+    bits = para_buffer(bits_dados).bits()
+    if n is None:
+        log.debug("[TX-Correção] Hamming: Codificando...")
+        codificado = codificar_hamming_palavra_unica(bits)
+    else:
+        log.debug("[TX-Correção] Hamming(%d,%s) em blocos: Codificando...", n, CODIGOS_HAMMING.get(n))
+        codificado = codificar_hamming(bits, n)
+
+    return restaurar_tipo(BufferBits.de_bits(codificado), bits_dados)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: insercao_bits.py
+
+Motor de Inserção de Bits (Bit Stuffing) em tempo linear, compartilhado pelo
+Transmissor e pelo Receptor.
+
+Os bits são tratados como arrays numpy uint8 (um bit 0/1 por elemento) e todas as
+decisões são vetorizadas. Cada objeto é uma máquina de estados que guarda a contagem
+de '1's consecutivos entre chamadas, de modo que um quadro pode ser processado em
+pedaços (fluxo) com resultado idêntico ao processamento do quadro inteiro.
+
+Funções incluídas:
+- inserir_bits / remover_bits: passo vetorizado sobre um pedaço, com a contagem de entrada.
+- InsercaoDeBits / RemocaoDeBits: máquinas de estado incrementais.
+"""
+
+import numpy as np
+
+FLAG = np.array([0, 1, 1, 1, 1, 1, 1, 0], dtype=np.uint8)  # 01111110
+MAX_UNS = 5
+
+# Pedaços maiores são processados em blocos, limitando a memória temporária (índices int64)
+_TAMANHO_BLOCO = 1 << 22
+
+
+def _corridas_de_uns(bits: np.ndarray, contagem_uns: int):
+    """
+    Localiza as corridas de '1's do pedaço.
+    Retorna (inicios, fins, comprimentos_efetivos, deslocamentos): 'fins' é exclusivo e,
+    se a primeira corrida começa no índice 0, ela continua a corrida do pedaço anterior:
+    seu deslocamento e seu comprimento efetivo incluem contagem_uns.
+    """
+    borda = np.diff((bits != 0).view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    inicios = np.flatnonzero(borda == 1)
+    fins = np.flatnonzero(borda == -1)
+    deslocamentos = np.zeros_like(inicios)
+    if inicios.size and inicios[0] == 0:
+        deslocamentos[0] = contagem_uns
+    return inicios, fins, fins - inicios + deslocamentos, deslocamentos
+
+
+def inserir_bits(bits: np.ndarray, contagem_uns: int = 0) -> tuple[np.ndarray, int]:
+    """
+    Insere um '0' após cada sequência de cinco '1's consecutivos.
+    - contagem_uns: '1's consecutivos que terminaram o pedaço anterior (0 a 4).
+    Retorna: (bits_com_stuffing, contagem_uns ao final do pedaço)
+
+    Dentro de uma corrida de '1's, o zero é inserido após o 5º, 10º, 15º... '1'
+    (o zero inserido zera a contagem): uma corrida de comprimento efetivo L recebe L // 5 zeros.
+    """
+    n = bits.size
+    if n == 0:
+        return bits.copy(), contagem_uns
+
+    inicios, fins, efetivos, deslocamentos = _corridas_de_uns(bits, contagem_uns)
+    por_corrida = efetivos // MAX_UNS
+    total = int(por_corrida.sum())
+
+    # k-ésimo zero da corrida r entra logo após o '1' de posição 5k na corrida
+    corrida = np.repeat(np.arange(por_corrida.size), por_corrida)
+    k = np.arange(1, total + 1) - np.repeat(np.cumsum(por_corrida) - por_corrida, por_corrida)
+    apos = inicios[corrida] + MAX_UNS * k - deslocamentos[corrida]
+    saida = np.insert(bits, apos, 0)
+
+    nova_contagem = int(efetivos[-1] % MAX_UNS) if bits[-1] else 0
+    return saida, nova_contagem
+
+
+def remover_bits(bits: np.ndarray, contagem_uns: int = 0) -> tuple[np.ndarray, int]:
+    """
+    Remove o '0' que vem logo após exatamente cinco '1's consecutivos.
+    - contagem_uns: '1's consecutivos que terminaram o pedaço anterior.
+    Retorna: (bits_sem_stuffing, contagem_uns ao final do pedaço)
+
+    Todo '0' (removido ou não) zera a contagem, então o '0' removido é o que termina
+    uma corrida de comprimento efetivo exatamente 5.
+    """
+    n = bits.size
+    if n == 0:
+        return bits.copy(), contagem_uns
+
+    inicios, fins, efetivos, _ = _corridas_de_uns(bits, contagem_uns)
+    remover = fins[(efetivos == MAX_UNS) & (fins < n)]
+    if bits[0] == 0 and contagem_uns == MAX_UNS:
+        # A corrida do pedaço anterior terminou exatamente na fronteira
+        remover = np.concatenate(([0], remover))
+    saida = np.delete(bits, remover)
+
+    if bits[-1]:
+        nova_contagem = int(efetivos[-1])
+    else:
+        nova_contagem = 0
+    return saida, nova_contagem
+
+
+def _em_blocos(passo, bits, contagem_uns):
+    partes = []
+    for inicio in range(0, max(bits.size, 1), _TAMANHO_BLOCO):
+        parte, contagem_uns = passo(bits[inicio:inicio + _TAMANHO_BLOCO], contagem_uns)
+        partes.append(parte)
+    saida = partes[0] if len(partes) == 1 else np.concatenate(partes)
+    return saida, contagem_uns
+
+
+class InsercaoDeBits:
+    """
+    Bit stuffing incremental: processar(pedaco) devolve os bits do pedaço com stuffing,
+    levando a contagem de '1's consecutivos para o próximo pedaço.
+    """
+
+    def __init__(self):
+        self.contagem_uns = 0
+
+    def processar(self, bits) -> np.ndarray:
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+        saida, self.contagem_uns = _em_blocos(inserir_bits, bits, self.contagem_uns)
+        return saida
+
+
+class RemocaoDeBits:
+    """
+    Remoção de bit stuffing incremental: processar(pedaco) devolve os bits do pedaço sem
+    os '0's inseridos, levando a contagem de '1's consecutivos para o próximo pedaço.
+    """
+
+    def __init__(self):
+        self.contagem_uns = 0
+
+    def processar(self, bits) -> np.ndarray:
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+        saida, self.contagem_uns = _em_blocos(remover_bits, bits, self.contagem_uns)
+        return saida
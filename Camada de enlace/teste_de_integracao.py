@@ -3,9 +3,17 @@
 Testes de Integração para as Camadas de Enlace (Transmissor <-> Receptor).
 Verifica a recuperação da mensagem original em diferentes cenários de protocolo.
 """
+import io
+import random
 import unittest
+from contextlib import redirect_stdout
+import numpy as np
 import enlace_transmissor as tx
 import enlace_receptor as rx
+from buffer_bits import BufferBits
+from correcao_erros import codificar_hamming, decodificar_hamming
+from deteccao_erros import Checksum8, Crc32, EvenParity
+from insercao_bits import InsercaoDeBits, RemocaoDeBits
 
 # -------------------------------------------------------------------
 # FUNÇÕES AUXILIARES DE TESTE
@@ -15,6 +23,14 @@ def get_dados_basicos(texto: str = "Trabalho") -> str:
     """Converte texto para string de bits (8 bits por caractere)."""
     return ''.join(f'{byte:08b}' for byte in texto.encode('utf-8'))
 
+def crc32_divisao_bitwise(bits_str: str) -> int:
+    """Referência: CRC-32 pela divisão polinomial bit a bit original (O(n^2))."""
+    data_int = int(bits_str, 2) << 32 if bits_str else 0
+    for i in range(data_int.bit_length() - 1, 31, -1):
+        if (data_int >> i) & 1:
+            data_int ^= tx.POLI << (i - 32)
+    return data_int & 0xFFFFFFFF
+
 class TestIntegracaoCamadaEnlace(unittest.TestCase):
 
     def setUp(self):
@@ -47,7 +63,7 @@ class TestIntegracaoCamadaEnlace(unittest.TestCase):
 
         # --- LADO RX ---
         print("\n--- PASSO RX 1: Desenquadramento (Contagem) ---")
-        dados_pos_desenq = rx.desenquadrar_contagem_caracteres(quadro_recebido)
+        dados_pos_desenq = rx.desenquadrar_contagem_caracteres(quadro_recebido, len(bits_com_controle))
         print(f"RX Saída Desenq.: {dados_pos_desenq}")
         
         print("\n--- PASSO RX 2: Verificação de Erro (Paridade) ---")
@@ -239,5 +255,206 @@ class TestIntegracaoCamadaEnlace(unittest.TestCase):
         self.assertNotEqual(dados_finais, dados_entrada, "Os dados recuperados não deveriam ser iguais ao original (após erro).")
 
 
+class TestBufferBits(unittest.TestCase):
+
+    def setUp(self):
+        self.DADOS_ORIGINAIS = get_dados_basicos("Info")
+        self.BUFFER = BufferBits.de_str(self.DADOS_ORIGINAIS)
+
+    def test_conversoes_ida_e_volta(self):
+        self.assertEqual(self.BUFFER.para_str(), self.DADOS_ORIGINAIS)
+        self.assertEqual(self.BUFFER.para_bytes(), b"Info")
+        bits = np.unpackbits(np.frombuffer(b"Info", dtype=np.uint8))
+        self.assertEqual(BufferBits.de_bits(bits), self.BUFFER)
+        self.assertEqual(len(self.BUFFER), 32)
+
+    def test_fatia_sem_copia(self):
+        fatia = self.BUFFER[8:24]
+        self.assertTrue(np.shares_memory(fatia.empacotado(), self.BUFFER.empacotado()))
+        self.assertEqual(fatia.para_bytes(), b"nf")
+        self.assertEqual(self.BUFFER[3:13], self.DADOS_ORIGINAIS[3:13])
+        self.assertEqual(self.BUFFER[-1], int(self.DADOS_ORIGINAIS[-1]))
+
+    def test_concatenacao_desalinhada(self):
+        juntos = self.BUFFER[:5] + "101" + self.BUFFER[5:]
+        self.assertEqual(juntos, self.DADOS_ORIGINAIS[:5] + "101" + self.DADOS_ORIGINAIS[5:])
+
+    def test_bits_invalidos(self):
+        with self.assertRaises(ValueError):
+            BufferBits.de_str("0102")
+
+    def test_integracao_com_buffer_empacotado(self):
+        # Mesmo Cenário 4 (Contagem + Checksum), agora sem strings no caminho
+        quadro = tx.enquadrar_contagem_caracteres(tx.adicionar_checksum(self.BUFFER))
+        self.assertIsInstance(quadro, BufferBits)
+        valido, dados = rx.verificar_checksum(rx.desenquadrar_contagem_caracteres(quadro))
+        self.assertTrue(valido)
+        self.assertIsInstance(dados, BufferBits)
+        self.assertEqual(dados, self.BUFFER)
+
+    def test_paridade_preserva_zeros_a_esquerda(self):
+        for dados in ("0000000101", "0000000001", "0" * 9):
+            valido, recebidos = rx.verificar_paridade_par(tx.adicionar_paridade_par(dados))
+            self.assertTrue(valido)
+            self.assertEqual(recebidos, dados)
+            # Na Contagem de Caracteres, quem remove o alinhamento é o desenquadramento
+            com_paridade = tx.adicionar_paridade_par(dados)
+            quadro = tx.enquadrar_contagem_caracteres(com_paridade)
+            desenquadrado = rx.desenquadrar_contagem_caracteres(quadro, len(com_paridade))
+            self.assertEqual(rx.verificar_paridade_par(desenquadrado), (True, dados))
+
+
+class TestCrc32Tabela(unittest.TestCase):
+
+    def test_igual_a_divisao_bitwise_em_entradas_aleatorias(self):
+        gerador = random.Random(32)
+        for _ in range(200):
+            bits = ''.join(gerador.choice('01') for _ in range(gerador.randrange(0, 700)))
+            for slicing_by_8 in (True, False):
+                mensagem, pad_len = tx.crc32(bits, slicing_by_8=slicing_by_8)
+                self.assertEqual(pad_len, max(0, 64 - len(bits)))
+                dados_padded = mensagem[:-32]
+                self.assertEqual(int(mensagem[-32:], 2), crc32_divisao_bitwise(dados_padded))
+                self.assertTrue(rx.verificar_crc32(mensagem, slicing_by_8=slicing_by_8))
+
+    def test_detecta_erro_de_um_bit(self):
+        mensagem, _ = tx.crc32(BufferBits(np.arange(256, dtype=np.uint8)))
+        bits = mensagem.bits()
+        bits[1000] ^= 1
+        self.assertFalse(rx.verificar_crc32(BufferBits.de_bits(bits)))
+
+
+class TestDeteccaoIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.DADOS = get_dados_basicos("Trabalho de Redes") + "101"  # não alinhado em bytes
+        self.PEDACOS = [self.DADOS[:3], self.DADOS[3:50], "", self.DADOS[50:]]
+
+    def test_pedacos_igual_a_quadro_inteiro(self):
+        mensagem, _ = tx.crc32(self.DADOS)
+        crc, checksum, paridade = Crc32(), Checksum8(), EvenParity()
+        for pedaco in self.PEDACOS:
+            for objeto in (crc, checksum, paridade):
+                objeto.update(pedaco)
+        self.assertEqual(crc.digest_bits(), mensagem[-32:])
+        self.assertEqual(checksum.digest_bits(), tx.adicionar_checksum(self.DADOS)[-8:])
+        self.assertEqual(paridade.digest_bits(), tx.adicionar_paridade_par(self.DADOS)[-1:])
+
+    def test_copy_e_independente(self):
+        crc = Crc32(self.PEDACOS[0])
+        copia = crc.copy()
+        crc.update(self.PEDACOS[1])
+        self.assertEqual(copia.hexdigest(), Crc32(self.PEDACOS[0]).hexdigest())
+        self.assertNotEqual(copia.hexdigest(), crc.hexdigest())
+
+    def test_receptor_valida_em_pedacos(self):
+        mensagem, _ = tx.crc32(self.DADOS)
+        self.assertTrue(rx.verificar_crc32_incremental([mensagem[:10], mensagem[10:]]))
+        corrompida = mensagem[:10] + ('0' if mensagem[10] == '1' else '1') + mensagem[11:]
+        self.assertFalse(rx.verificar_crc32_incremental([corrompida[:10], corrompida[10:]]))
+
+        quadro = tx.adicionar_checksum(self.DADOS)
+        self.assertTrue(rx.verificar_checksum_incremental([quadro[:13], quadro[13:]]))
+
+
+class TestBitStuffingFluxo(unittest.TestCase):
+
+    def setUp(self):
+        gerador = random.Random(3)
+        # Dados com muitas corridas longas de '1's
+        self.DADOS = ''.join(gerador.choice(["1", "1", "1", "0"]) for _ in range(500))
+        self.CORTES = sorted(gerador.sample(range(1, 500), 12))
+
+    def _pedacos(self, bits):
+        limites = [0] + [c for c in self.CORTES if c < len(bits)] + [len(bits)]
+        return [bits[a:b] for a, b in zip(limites, limites[1:])]
+
+    def test_fluxo_igual_a_quadro_inteiro(self):
+        quadro = tx.enquadrar_bit_stuffing(self.DADOS)
+        fluxo = BufferBits.concatenar(list(tx.enquadrar_bit_stuffing_fluxo(self._pedacos(self.DADOS))))
+        self.assertEqual(fluxo, quadro)
+
+        recuperado = BufferBits.concatenar(list(rx.desenquadrar_bit_stuffing_fluxo(self._pedacos(quadro))))
+        self.assertEqual(recuperado, self.DADOS)
+
+    def test_contagem_atravessa_a_fronteira_dos_pedacos(self):
+        # Cinco '1's terminam o primeiro pedaço: o '0' inserido/removido é o 1º bit do seguinte
+        insercao = InsercaoDeBits()
+        self.assertEqual(insercao.processar([1, 1, 1, 1, 1]).tolist(), [1, 1, 1, 1, 1, 0])
+        self.assertEqual(insercao.contagem_uns, 0)
+
+        remocao = RemocaoDeBits()
+        self.assertEqual(remocao.processar([0, 1, 1, 1, 1, 1]).tolist(), [0, 1, 1, 1, 1, 1])
+        self.assertEqual(remocao.processar([0, 1]).tolist(), [1])
+        self.assertEqual(remocao.contagem_uns, 1)
+
+
+class TestByteStuffingBytes(unittest.TestCase):
+
+    def setUp(self):
+        self.DADOS = b"A\x7eB\x7d\x7d\x7eC"
+
+    def test_escapes_sobre_bytes(self):
+        quadro = tx.enquadrar_byte_stuffing(self.DADOS)
+        self.assertEqual(quadro, b"\x7eA\x7d\x7eB\x7d\x7d\x7d\x7d\x7d\x7eC\x7e")
+        self.assertEqual(rx.desenquadrar_byte_stuffing(memoryview(quadro)), self.DADOS)
+
+    def test_mesmo_quadro_para_bits_e_bytes(self):
+        bits = str(BufferBits.de_bytes(self.DADOS))
+        self.assertEqual(tx.enquadrar_byte_stuffing(bits), str(BufferBits.de_bytes(tx.enquadrar_byte_stuffing(self.DADOS))))
+        self.assertEqual(rx.desenquadrar_byte_stuffing(tx.enquadrar_byte_stuffing(bits)), bits)
+
+
+class TestHammingBlocos(unittest.TestCase):
+
+    def setUp(self):
+        self.GERADOR = np.random.default_rng(21)
+
+    def test_um_erro_por_bloco_e_corrigido(self):
+        for n, k in ((7, 4), (15, 11), (31, 26), (63, 57)):
+            dados = self.GERADOR.integers(0, 2, (2, 50 * k), dtype=np.uint8)
+            palavras = codificar_hamming(dados, n).reshape(2, 50, n)
+            posicoes = self.GERADOR.integers(0, n + 1, (2, 50))  # 0 = bloco sem erro
+            quadro, bloco = np.nonzero(posicoes)
+            palavras[quadro, bloco, posicoes[quadro, bloco] - 1] ^= 1
+
+            recuperados, posicoes_erro = decodificar_hamming(palavras.reshape(2, -1), n)
+            np.testing.assert_array_equal(recuperados, dados)
+            np.testing.assert_array_equal(posicoes_erro, posicoes)
+
+    def test_bloco_igual_a_palavra_unica(self):
+        self.assertEqual(tx.transmissor_hamming("1101", n=7), tx.transmissor_hamming("1101"))
+
+    def test_integracao_com_erros_em_varios_blocos(self):
+        dados = get_dados_basicos("Hamming")  # 56 bits = 14 blocos (7,4)
+        codificado = tx.transmissor_hamming(dados, n=7)
+        # Inverte o 4º bit de cada bloco
+        corrompido = ''.join(str(int(c) ^ (i % 7 == 3)) for i, c in enumerate(codificado))
+        recuperados, posicoes_erro = rx.receptor_hamming(corrompido, n=7)
+        self.assertEqual(recuperados, dados)
+        self.assertTrue(np.all(posicoes_erro == 4))
+
+
+class TestRegistroEnlace(unittest.TestCase):
+
+    def setUp(self):
+        self.DADOS = get_dados_basicos("Log")
+
+    def test_funcoes_nao_imprimem(self):
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            rx.desenquadrar_byte_stuffing(tx.enquadrar_byte_stuffing(self.DADOS))
+            rx.verificar_checksum(tx.adicionar_checksum(self.DADOS))
+            rx.receptor_hamming(tx.transmissor_hamming(self.DADOS))
+        self.assertEqual(saida.getvalue(), "")
+
+    def test_erro_corrigido_e_registrado_com_a_posicao(self):
+        codificado = tx.transmissor_hamming(self.DADOS)
+        corrompido = codificado[:2] + ('0' if codificado[2] == '1' else '1') + codificado[3:]
+        with self.assertLogs("enlace.receptor", "INFO") as registros:
+            rx.receptor_hamming(corrompido)
+        self.assertEqual(registros.records[0].posicao_erro, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Area de trabalho (workspace) da Camada Fisica
+
+Buffers de rascunho reaproveitados entre chamadas dos moduladores, demoduladores e do canal:
+niveis por bit, indices de simbolo, saidas dos correlatores, distancias e decisoes. Junto com
+o parametro out= (o array de saida), um laco TX/RX em regime permanente nao aloca nenhum
+array do tamanho do quadro:
+
+    ws = Workspace()
+    sinal = bits_rx = None
+    for bits in quadros:
+        sinal = QPSK_modulation(1, 2, bits, 8, out=sinal, workspace=ws)
+        canal.awgn(sinal, ebn0_db=6, samples_per_symbol=8, bits_per_symbol=2, rng=rng, out=sinal, workspace=ws)
+        bits_rx = QPSK_demodulation(sinal, 2, 8, out=bits_rx, workspace=ws)
+
+(na primeira volta out=None aloca a saida; nas seguintes o mesmo array e reescrito.)
+Um Workspace nao e thread-safe: use um por thread/laco.
+"""
+
+import numpy as np
+
+
+class Workspace:
+    """
+    Buffers nomeados que so crescem: array(nome, shape, dtype) devolve uma visao com o formato
+    pedido, reaproveitando a memoria do pedido anterior com o mesmo nome e dtype.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def array(self, nome, shape, dtype=np.float64):
+        """Buffer de rascunho (conteudo indefinido) com o formato e o tipo pedidos."""
+        dtype = np.dtype(dtype)
+        shape = tuple(shape)
+        size = int(np.prod(shape, dtype=np.int64))
+        buffer = self._buffers.get((nome, dtype))
+        if buffer is None or buffer.size < size:
+            buffer = self._buffers[(nome, dtype)] = np.empty(size, dtype=dtype)
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for b in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def rascunho(workspace, nome, shape, dtype=np.float64):
+    """Buffer temporario: do workspace, quando houver, ou um array novo."""
+    if workspace is None:
+        return np.empty(shape, dtype=dtype)
+    return workspace.array(nome, shape, dtype)
+
+
+def saida(out, shape, dtype):
+    """
+    Array de saida de uma funcao: 'out' (validado) ou um array novo de formato shape.
+    O dtype de out pode diferir de dtype, desde que o resultado caiba nele sem mudar de tipo
+    (casting 'same_kind': float64 -> float32 vale, float -> int ou complex -> float nao).
+    """
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if not isinstance(out, np.ndarray):
+        raise ValueError(f"out deve ser um numpy.ndarray (recebido {type(out).__name__})")
+    if not np.can_cast(dtype, out.dtype, casting='same_kind'):
+        raise ValueError(f"out de dtype {out.dtype} nao comporta o resultado ({np.dtype(dtype)})")
+    if out.shape != tuple(shape) or not out.flags.c_contiguous or not out.flags.writeable:
+        raise ValueError(f"out deve ser um array contiguo e gravavel de formato {tuple(shape)} "
+                         f"(recebido {out.shape})")
+    return out
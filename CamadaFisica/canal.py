@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Canal de comunicacao
+
+Ruido AWGN sobre as amostras geradas pelos moduladores e canal binario simetrico (BSC)
+sobre bits, desempacotados (um bit por elemento) ou empacotados (8 bits por byte).
+"""
+
+import numpy as np
+
+from area_de_trabalho import rascunho, saida
+
+#Todas as funcoes aceitam um vetor 1-D (n_amostras,) ou um lote (..., n_amostras): o ultimo eixo
+#e o quadro. O parametro rng aceita uma semente (int), um np.random.Generator ou None, e deve ser
+#reaproveitado entre chamadas para obter realizacoes independentes e reproduziveis.
+#workspace (area_de_trabalho.Workspace) guarda os buffers de rascunho (energia, ruido, sorteios)
+#entre chamadas; com out= apontando para o proprio sinal, o canal nao aloca arrays do tamanho do quadro.
+
+def _gerador(rng):
+    """Devolve um np.random.Generator a partir de uma semente, de um Generator ou de None."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+#**********************************************************AWGN*****************************************************
+
+def signal_power(signal, workspace=None):
+    """
+    Potencia media por amostra de cada quadro: mean(|s|^2) no ultimo eixo.
+    Retorna (..., 1), pronto para broadcast contra o sinal.
+    """
+    signal = np.asarray(signal)
+    if np.iscomplexobj(signal):
+        energia = rascunho(workspace, "energia", signal.shape, signal.real.dtype)
+        np.square(signal.real, out=energia)
+        quadratura = rascunho(workspace, "energia_q", signal.shape, signal.real.dtype)
+        energia += np.square(signal.imag, out=quadratura)
+    else:
+        dtype = np.result_type(signal.dtype, np.float32)
+        energia = np.square(signal, dtype=dtype, out=rascunho(workspace, "energia", signal.shape, dtype))
+    return energia.mean(axis=-1, keepdims=True, dtype=np.float64)
+
+def noise_std(power, snr_db=None, ebn0_db=None, samples_per_symbol=100, bits_per_symbol=1,
+              complex_signal=False):
+    """
+    Desvio padrao do ruido por componente real, calibrado por SNR ou por Eb/N0 (apenas um deles).
+    - SNR: potencia do ruido = power / 10^(snr_db/10).
+    - Eb/N0: Eb = power * samples_per_symbol / bits_per_symbol (energia por bit em amostras)
+      e sigma^2 = N0/2 por componente real.
+    Num sinal complexo (banda base) a potencia do ruido se divide entre I e Q.
+    snr_db/ebn0_db podem ser arrays (ex.: (n_quadros, 1)) para um valor por quadro do lote.
+    """
+    if (snr_db is None) == (ebn0_db is None):
+        raise ValueError("Informe exatamente um entre snr_db e ebn0_db")
+    power = np.asarray(power, dtype=np.float64)
+
+    if snr_db is not None:
+        variance = power / 10.0**(np.asarray(snr_db, dtype=np.float64) / 10)
+        if complex_signal:
+            variance = variance / 2
+    else:
+        Eb = power * samples_per_symbol / bits_per_symbol
+        N0 = Eb / 10.0**(np.asarray(ebn0_db, dtype=np.float64) / 10)
+        variance = N0 / 2
+    return np.sqrt(variance)
+
+def awgn(signal, snr_db=None, ebn0_db=None, samples_per_symbol=100, bits_per_symbol=1,
+         rng=None, out=None, dtype=None, power=None, workspace=None):
+    """
+    Soma ruido branco gaussiano ao sinal (real ou complexo), calibrado por SNR ou Eb/N0.
+    - power: potencia do sinal; por padrao e medida em cada quadro (signal_power).
+    - out: array de saida contiguo, do formato do sinal e de dtype float (complexo para sinais
+      complexos); pode ser o proprio sinal, para operar in-place.
+    - dtype: tipo da saida (ex.: np.float32); por padrao o do out, ou float32 para
+      sinais float32 e float64 para os demais.
+    Retorna: sinal com ruido, com o mesmo formato do sinal.
+    """
+    signal = np.asarray(signal)
+    rng = _gerador(rng)
+    is_complex = np.iscomplexobj(signal)
+
+    if out is not None:
+        #o ruido e gerado em ponto flutuante: out inteiro (ou real com sinal complexo) e recusado
+        dtype = saida(out, signal.shape, np.result_type(signal.dtype, np.float32)).dtype
+    elif dtype is None:
+        dtype = np.result_type(signal.dtype, np.float32)
+    dtype = np.dtype(dtype)
+    real_dtype = np.empty(0, dtype=dtype).real.dtype
+
+    if power is None:
+        power = signal_power(signal, workspace)
+    sigma = noise_std(power, snr_db, ebn0_db, samples_per_symbol, bits_per_symbol, is_complex)
+    sigma = sigma.astype(real_dtype)
+
+    #O ruido e gerado direto no buffer de saida quando ele nao se sobrepoe ao sinal
+    if out is None:
+        out = np.empty(signal.shape, dtype=dtype)
+        noise = out
+    elif np.shares_memory(out, signal):
+        noise = rascunho(workspace, "ruido", signal.shape, dtype)
+    else:
+        noise = out
+
+    if is_complex:
+        noise_view = noise.view(real_dtype)  # (..., 2*n): I e Q intercalados
+        rng.standard_normal(dtype=real_dtype, out=noise_view)
+        noise_view *= sigma
+    else:
+        rng.standard_normal(dtype=real_dtype, out=noise)
+        noise *= sigma
+
+    np.add(signal, noise, out=out, casting='same_kind')
+    return out
+
+#**********************************************************BSC******************************************************
+
+def bsc(bits, p, rng=None, out=None, workspace=None):
+    """
+    Canal binario simetrico sobre bits desempacotados (0/1 por elemento, uint8):
+    cada bit e invertido com probabilidade p (escalar ou array com broadcast, ex.: (n_quadros, 1)).
+    - out: array de saida contiguo, do formato de bits (pode ser o proprio bits).
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    out = saida(out, bits.shape, np.uint8)
+    rng = _gerador(rng)
+    draws = rng.random(bits.shape, dtype=np.float32, out=rascunho(workspace, "sorteios", bits.shape, np.float32))
+    flips = np.less(draws, np.asarray(p, dtype=np.float32), out=rascunho(workspace, "inversoes", bits.shape, bool))
+    return np.bitwise_xor(bits, flips, out=out, casting='unsafe')
+
+#Abaixo desta probabilidade as posicoes dos erros sao sorteadas diretamente (poucos erros),
+#em vez de sortear um numero aleatorio por bit
+_BSC_P_ESPARSO = 1 / 64
+
+def bsc_packed(data, p, n_bits=None, rng=None, out=None):
+    """
+    Canal binario simetrico sobre bits empacotados (uint8, 8 bits por byte, primeiro bit no MSB).
+    - data: bytes-like ou array uint8 (..., n_bytes); cada linha e um quadro.
+    - n_bits: bits validos no inicio de cada quadro (padrao: todos); os bits de
+      preenchimento do ultimo byte nunca sao invertidos.
+    - p: probabilidade de inversao (escalar).
+    - out: array uint8 de saida contiguo, do formato de data (pode ser o proprio data, para
+      operar in-place).
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(data, dtype=np.uint8)
+    data = np.asarray(data, dtype=np.uint8)
+    if np.ndim(p):
+        raise ValueError("bsc_packed aceita apenas p escalar (use bsc para p por quadro)")
+    p = float(p)
+    rng = _gerador(rng)
+
+    row_bytes = data.shape[-1] if data.ndim else 1
+    rows = data.size // row_bytes if row_bytes else 0
+    if n_bits is None:
+        n_bits = row_bytes * 8
+    if not 0 <= n_bits <= row_bytes * 8:
+        raise ValueError("n_bits maior que o numero de bits de cada quadro")
+
+    if out is None:
+        out = data.copy()
+    else:
+        #reshape de um out nao contiguo seria uma copia e as inversoes se perderiam
+        out = saida(out, data.shape, np.uint8)
+        if out is not data:
+            np.copyto(out, data)
+    flat = out.reshape(-1)
+    total = rows * n_bits
+
+    if p < _BSC_P_ESPARSO:
+        #Poucos erros: numero de erros ~ Binomial(total, p) e posicoes distintas sorteadas
+        n_errors = rng.binomial(total, p)
+        positions = rng.choice(total, size=n_errors, replace=False)
+        row, bit = np.divmod(positions, n_bits)
+        np.bitwise_xor.at(flat, row * row_bytes + (bit >> 3), (0x80 >> (bit & 7)).astype(np.uint8))
+    else:
+        mask = rng.random((rows, n_bits), dtype=np.float32) < p
+        packed = np.packbits(mask, axis=-1)
+        flat.reshape(rows, row_bytes)[:, :packed.shape[-1]] ^= packed
+    return out
@@ -9,18 +9,59 @@ Modulacao digital
 
 import numpy as np
 import math
+import warnings
+from functools import lru_cache
 
-#***********************************************DIGITAL MODULATION*******************************************
-def NRZ_polar_modulation(A, bit_stream):
-    signal = np.zeros(len(bit_stream) * 100)
-
-    for i, bit in enumerate(bit_stream):
-        level = A if bit == 1 else -A
-        signal[i*100:(i+1)*100] = level  # 100 examples of the same value
+from area_de_trabalho import rascunho, saida
 
-    return signal
+#***********************************************DIGITAL MODULATION*******************************************
+#Todas as funcoes de modulacao aceitam um vetor 1-D de bits (n_bits,) ou um lote 2-D
+#(n_quadros, n_bits) e retornam, respectivamente, (n_amostras,) ou (n_quadros, n_amostras).
+#samples_per_symbol (padrao 100) deve ser o mesmo no modulador e no demodulador; com 1 amostra
+#por simbolo (NRZ, bipolar) o sinal e o proprio vetor de niveis, sem expansao nem integracao.
+#
+#out: array de saida (contiguo, do formato retornado) reescrito no lugar de um array novo.
+#workspace: area_de_trabalho.Workspace com os buffers de rascunho (niveis, medias, ...); com os
+#dois, as chamadas nao alocam arrays do tamanho do quadro.
+
+def _repetir_niveis(levels, samples_per_symbol, out=None):
+    """
+    Expande cada nivel (um por bit, no ultimo eixo) em samples_per_symbol amostras.
+    (..., n_bits) -> (..., n_bits * samples_per_symbol)
+    """
+    if samples_per_symbol == 1 and out is None:
+        return levels
+    s = saida(out, levels.shape[:-1] + (levels.shape[-1] * samples_per_symbol,), levels.dtype)
+    s.reshape(levels.shape + (samples_per_symbol,))[...] = levels[..., np.newaxis]
+    return s
 
-def manchester_modulation(A, bit_stream, samples_per_symbol=100):
+def _amostras_por_bit(samples_per_symbol, samples_per_bit):
+    """Resolve o nome antigo samples_per_bit (obsoleto) das funcoes bipolares."""
+    if samples_per_bit is None:
+        return 100 if samples_per_symbol is None else samples_per_symbol
+    if samples_per_symbol is not None:
+        raise TypeError("use samples_per_symbol ou samples_per_bit (obsoleto), nao os dois")
+    warnings.warn("samples_per_bit esta obsoleto; use samples_per_symbol", DeprecationWarning, stacklevel=3)
+    return samples_per_bit
+
+def _niveis_antipodais(A, bits, workspace, nome="niveis"):
+    """+A para bit 1 e -A para os demais, em float (rascunho do workspace)."""
+    levels = rascunho(workspace, nome, bits.shape)
+    np.equal(bits, 1, out=levels)
+    levels *= 2 * A
+    levels -= A
+    return levels
+
+def NRZ_polar_modulation(A, bit_stream, samples_per_symbol=100, out=None, workspace=None):
+    bits = np.asarray(bit_stream)
+    # sem workspace os niveis sao um array novo e podem ser devolvidos diretamente (1 amostra/simbolo)
+    levels = _niveis_antipodais(A, bits, workspace)
+
+    if workspace is not None and out is None and samples_per_symbol == 1:
+        return levels.copy()
+    return _repetir_niveis(levels, samples_per_symbol, out)  # samples_per_symbol examples of the same value
+
+def manchester_modulation(A, bit_stream, samples_per_symbol=100, out=None, workspace=None):
     """
     Modula uma sequência de bits usando Manchester.
     Convenção: bit 1 -> [ +A (primeira metade) , -A (segunda metade) ]
@@ -30,128 +71,124 @@ def manchester_modulation(A, bit_stream, samples_per_symbol=100):
     """
     if samples_per_symbol % 2 != 0:
         raise ValueError("samples_per_symbol deve ser par para Manchester")
-    num_bits = len(bit_stream)
-    s = np.zeros(num_bits * samples_per_symbol)
+    bits = np.asarray(bit_stream)
     half = samples_per_symbol // 2
 
-    for i, b in enumerate(bit_stream):
-        start = i * samples_per_symbol
-        if b == 1:
-            s[start : start + half] = A           # primeira metade +A
-            s[start + half : start + samples_per_symbol] = -A  # segunda metade -A
-        else:
-            s[start : start + half] = -A
-            s[start + half : start + samples_per_symbol] = A
+    # nivel da primeira metade de cada simbolo; a segunda metade e o seu oposto
+    first = _niveis_antipodais(A, bits, workspace)[..., np.newaxis]
+    s = saida(out, bits.shape[:-1] + (bits.shape[-1] * samples_per_symbol,), float)
+    blocks = s.reshape(bits.shape + (samples_per_symbol,))
+    blocks[..., :half] = first
+    np.negative(first, out=blocks[..., half:])
 
     return s
 
-def bipolar_modulation(A,bits, samples_per_bit=100):
+def bipolar_modulation(A,bits, samples_per_symbol=None, out=None, workspace=None, *, samples_per_bit=None):
     """
-    Modulação Bipolar AMI com 100 amostras por bit.
+    Modulação Bipolar AMI com samples_per_symbol amostras por bit (padrão 100).
+    samples_per_bit: nome antigo de samples_per_symbol (obsoleto, ainda aceito).
     
     Escolher amplitudes maiores aumenta resistencia a ruidos maiores na demodulacao como esta implementada.
-    """
-    signal = []
-    last_pulse = -1  # para que o primeiro 1 seja +1
 
-    for b in bits:
-        if b == 0:
-            level = 0
-        else:
-            last_pulse = -last_pulse  # alterna entre +1 e -1
-            level = last_pulse
+    A polaridade de cada pulso vem da contagem acumulada de uns: o 1o, 3o, 5o... '1'
+    de cada quadro sai com +A e o 2o, 4o... com -A.
+    """
+    samples_per_symbol = _amostras_por_bit(samples_per_symbol, samples_per_bit)
+    bits = np.asarray(bits)
+    ones = rascunho(workspace, "uns", bits.shape, bool)
+    np.not_equal(bits, 0, out=ones)
+    levels = rascunho(workspace, "contagem", bits.shape, np.int64)
+    np.cumsum(ones, axis=-1, dtype=np.int64, out=levels)
+    # contagem impar -> +1, par -> -1; zero onde nao ha '1'
+    np.bitwise_and(levels, 1, out=levels)
+    np.left_shift(levels, 1, out=levels)
+    levels -= 1
+    levels *= ones  # +1, -1 ou 0 (int64)
+
+    # o tipo de 'levels * A' e o do resultado antigo (int para A inteiro)
+    s = saida(out, bits.shape[:-1] + (bits.shape[-1] * samples_per_symbol,), np.result_type(levels.dtype, A))
+    np.multiply(levels[..., np.newaxis], A, out=s.reshape(bits.shape + (samples_per_symbol,)), casting="unsafe")
+    return s
 
-        # Repete o valor 'level' por 100 amostras
-        signal.extend([level * A] * samples_per_bit)
 
-    return np.array(signal)
+#***********************************************DIGITAL DEMODULATION******************************************
+#Integrate-and-dump: o sinal e remodelado para (..., num_simbolos, samples_per_symbol) e todas as decisoes
+#saem de um unico produto matriz-vetor ou reducao. Amostras que nao completam um simbolo sao descartadas.
+#Todas as funcoes retornam um numpy.array uint8 de bits, com o mesmo numero de dimensoes da entrada
+#(ou gravam em out=, com esse formato).
 
+def _blocos_de_simbolos(signal, samples_per_symbol):
+    """
+    Visao (sem copia) do sinal como (..., num_simbolos, samples_per_symbol).
+    """
+    signal = np.asarray(signal)
+    num_symbols = signal.shape[-1] // samples_per_symbol
+    used = signal[..., :num_symbols * samples_per_symbol]
+    return used.reshape(signal.shape[:-1] + (num_symbols, samples_per_symbol))
 
-#***********************************************DIGITAL DEMODULATION******************************************
-def NRZ_polar_demodulation(signal):
+def _integrar(signal, samples_per_symbol, reference=None, workspace=None):
+    """
+    Integra cada simbolo: media das amostras (reference=None) ou correlacao
+    com a forma de onda de referencia (produto matriz-vetor).
+    """
+    if samples_per_symbol == 1 and reference is None:
+        return np.asarray(signal)  # cada amostra ja e um simbolo
+    blocks = _blocos_de_simbolos(signal, samples_per_symbol)
+    if reference is None:
+        dtype = blocks.dtype if blocks.dtype.kind in "fc" else np.float64  # o tipo de blocks.mean()
+        return np.mean(blocks, axis=-1, out=rascunho(workspace, "integral", blocks.shape[:-1], dtype))
+    result = rascunho(workspace, "integral", blocks.shape[:-1], np.result_type(blocks.dtype, reference.dtype))
+    return np.matmul(blocks, reference, out=result)
+
+def _decisoes(shape, out):
+    return saida(out, shape, np.uint8)
+
+def NRZ_polar_demodulation(signal, samples_per_symbol=100, out=None, workspace=None):
     """
     Demodulação NRZ-Polar por limiar (threshold)
     """
-    num_bits = len(signal) // 100
-    bit_stream = []
-
-    for i in range(num_bits):
-        segment = signal[i*100:(i+1)*100]
-        avg = np.mean(segment)
+    avg = _integrar(signal, samples_per_symbol, workspace=workspace)
 
-        bit = 1 if avg >= 0 else 0
-        bit_stream.append(bit)
+    return np.greater_equal(avg, 0, out=_decisoes(avg.shape, out))
 
-    return bit_stream
+@lru_cache(maxsize=16)
+def _referencia_manchester(samples_per_symbol, A_ref):
+    """Forma de referencia do bit 1, [+A_ref ... +A_ref, -A_ref ... -A_ref] (somente leitura, em cache)."""
+    half = samples_per_symbol // 2
+    ref1 = np.concatenate((np.ones(half)*A_ref, np.ones(half)*(-A_ref)))
+    ref1.setflags(write=False)
+    return ref1
 
-def manchester_demodulation_correlator(received_signal, samples_per_symbol=100, A_ref=1.0):
+def manchester_demodulation_correlator(received_signal, samples_per_symbol=100, A_ref=1.0, out=None,
+                                       workspace=None):
     """
     Demodula usando correlação com formas de onda de referência Manchester.
     Gera duas formas de referência (para bit=1 e bit=0) e calcula correlação.
     Escolhe o bit que dá correlação maior.
     - A_ref: amplitude de referência das formas (não precisa ser igual ao A do TX, apenas escala)
+
+    Como ref0 = -ref1, corr1 > corr0 equivale a corr1 > 0: basta uma correlação por símbolo.
     """
     if samples_per_symbol % 2 != 0:
         raise ValueError("samples_per_symbol deve ser par para Manchester")
 
     N = samples_per_symbol
-    half = N // 2
     # forma referência para bit=1: [+1 ... +1, -1 ... -1] (amplitude A_ref)
-    ref1 = np.concatenate((np.ones(half)*A_ref, np.ones(half)*(-A_ref)))
-    # forma referência para bit=0: [-1 ... -1, +1 ... +1]
-    ref0 = np.concatenate((np.ones(half)*(-A_ref), np.ones(half)*(A_ref)))
-
-    num_bits = len(received_signal) // N
-    bits = []
-    for k in range(num_bits):
-        block = received_signal[k*N : (k+1)*N]
-        corr1 = np.dot(block, ref1)  # correlação com ref1
-        corr0 = np.dot(block, ref0)  # correlação com ref0
-        bit = 1 if corr1 > corr0 else 0
-        bits.append(bit)
-    return bits
-
-def bipolar_demodulation(A,signal, samples_per_bit=100):
-    """
-    Demodulação AMI: integra 100 amostras por bit e detecta 0 ou 1.
+    ref1 = _referencia_manchester(N, A_ref)
+
+    corr1 = _integrar(received_signal, N, ref1, workspace)  # correlação com ref1
+    return np.greater(corr1, 0, out=_decisoes(corr1.shape, out))  # corr1 > corr0 = -corr1
+
+def bipolar_demodulation(A,signal, samples_per_symbol=None, out=None, workspace=None, *, samples_per_bit=None):
+    """
+    Demodulação AMI: integra samples_per_symbol amostras por bit e detecta 0 ou 1.
+    samples_per_bit: nome antigo de samples_per_symbol (obsoleto, ainda aceito).
     
     usar mesma amplitude, ou similar a usada na modulacao (pode estimar na recepcao do sinal)
     """
-    num_bits = len(signal) // samples_per_bit
-    bits = []
-
-    for i in range(num_bits):
-        segment = signal[i*samples_per_bit:(i+1)*samples_per_bit]
-        avg = np.mean(segment)
-
-        if abs(avg) < 0.3 * A:  # tolerância para ruído
-            bits.append(0)
-        else:
-            bits.append(1)
-
-    return bits
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+    samples_per_symbol = _amostras_por_bit(samples_per_symbol, samples_per_bit)
+    avg = _integrar(signal, samples_per_symbol, workspace=workspace)
+    magnitude = np.abs(avg, out=rascunho(workspace, "magnitude", avg.shape, np.result_type(avg.dtype, np.float64)))
 
+    # tolerância para ruído
+    return np.greater_equal(magnitude, 0.3 * A, out=_decisoes(avg.shape, out))
@@ -8,105 +8,194 @@ MODULACAO POR PORTADORA
 """
 import numpy as np
 import math
+from functools import lru_cache
+
+from area_de_trabalho import rascunho, saida
 
 #modulation functions
 
 #remember to add noise here on the function (final shape)
 #all functions should be on 
 
-def ASK_modulation(A,f,bit_stream):
-    sig_size = len(bit_stream)
-    signal = np.zeros(sig_size*100)
-    
-    for i in range(0,sig_size):
-        if(bit_stream[i] == 1):
-            for j in range(0,100):
-                signal[(i)*100+j] = A *  math.sin(2*math.pi*f*j/100)
-        else:
-            for j in range(0,100):
-                signal[(i)*100+j] = 0
-    
+#*************************************Buffers (out= e workspace=)***************************************************
+#Os moduladores e demoduladores de fluxo/lote aceitam out= (array de saida contiguo, com o formato que seria
+#retornado) e workspace= (area_de_trabalho.Workspace com os rascunhos: indices, simbolos, correlacoes,
+#distancias). Com os dois, um laco em regime permanente nao aloca arrays do tamanho do quadro; o resultado
+#e identico ao das chamadas sem eles.
+
+#*************************************Amostragem*********************************************************************
+#As frequencias sao dadas em ciclos por simbolo e cada simbolo tem samples_per_symbol amostras (padrao 100, o
+#mesmo no modulador e no demodulador). Pelo criterio de Nyquist a portadora precisa ficar abaixo de metade da
+#taxa de amostragem e ser positiva: 0 < f < samples_per_symbol / 2. A verificacao fica nos geradores de formas de onda em cache,
+#entao so roda uma vez por (f, samples_per_symbol).
+
+def check_nyquist(f, samples_per_symbol):
+    """Levanta ValueError se a portadora f (ciclos/simbolo) nao puder ser representada com samples_per_symbol amostras."""
+    if samples_per_symbol < 1 or samples_per_symbol != int(samples_per_symbol):
+        raise ValueError(f"samples_per_symbol deve ser um inteiro positivo (recebido {samples_per_symbol})")
+    if not f > 0:
+        raise ValueError(f"Portadora deve ser positiva (recebido f={f} ciclos/símbolo)")
+    if not f < samples_per_symbol / 2:
+        raise ValueError(f"Portadora de {f} ciclos/símbolo exige mais de {2 * f:g} amostras por símbolo "
+                         f"(Nyquist); recebido samples_per_symbol={samples_per_symbol}")
+
+#*************************************Template bank (ASK/FSK/PSK)*************************************************
+#Cada esquema binario so emite duas formas de onda por simbolo. Elas sao calculadas uma unica vez por
+#(A, f, samples_per_symbol) e o sinal e montado indexando o banco (2, samples_per_symbol) com os bits.
+
+@lru_cache(maxsize=64)
+def _senoide(A, f, samples_per_symbol, phase=0.0):
+    """
+    Forma de onda de um simbolo: A*sin(2*pi*f*j/N + phase), j = 0..N-1.
+    Usa math.sin amostra a amostra (apenas N chamadas por entrada do cache) para
+    reproduzir exatamente as amostras geradas historicamente pelos moduladores.
+    O array retornado e somente leitura, pois e compartilhado pelo cache.
+    """
+    check_nyquist(f, samples_per_symbol)
+    wave = np.array([A * math.sin(2*math.pi*f*j/samples_per_symbol + phase)
+                     for j in range(samples_per_symbol)])
+    wave.setflags(write=False)
+    return wave
+
+def _banco(wave0, wave1):
+    """Empilha as formas de onda do bit 0 e do bit 1 em um banco (2, N) somente leitura."""
+    bank = np.stack((wave0, wave1))
+    bank.setflags(write=False)
+    return bank
+
+@lru_cache(maxsize=64)
+def _ask_bank(A, f, samples_per_symbol):
+    return _banco(np.zeros(samples_per_symbol), _senoide(A, f, samples_per_symbol))
+
+@lru_cache(maxsize=64)
+def _fsk_bank(A, f1, f2, samples_per_symbol):
+    return _banco(_senoide(A, f2, samples_per_symbol), _senoide(A, f1, samples_per_symbol))
+
+@lru_cache(maxsize=64)
+def _psk_bank(A, f, samples_per_symbol):
+    return _banco(_senoide(A, f, samples_per_symbol, math.pi), _senoide(A, f, samples_per_symbol))
+
+def _modular_com_banco(bank, bit_stream, out=None, workspace=None):
+    """
+    Monta o sinal escolhendo, para cada bit, a linha do banco (bit == 1 -> linha 1,
+    qualquer outro valor -> linha 0). Aceita bits 1-D ou lotes 2-D (n_quadros, n_bits).
+    """
+    bits = np.asarray(bit_stream)
+    index = rascunho(workspace, "indice_bit", bits.shape, np.intp)
+    np.equal(bits, 1, out=index)
+    signal = saida(out, bits.shape[:-1] + (bits.shape[-1] * bank.shape[-1],), bank.dtype)
+    np.take(bank, index, axis=0, out=signal.reshape(bits.shape + bank.shape[-1:]), mode='clip')  # (..., n_bits, N)
     return signal
+
+
+def ASK_modulation(A,f,bit_stream, samples_per_symbol=100, out=None, workspace=None):
+    return _modular_com_banco(_ask_bank(A, f, samples_per_symbol), bit_stream, out, workspace)
                 
 
-def FSK_modulation(A,f1,f2,bit_stream):
-    sig_size = len(bit_stream)
-    signal = np.zeros(sig_size*100)
-    
-    for i in range(0,sig_size):
-        if(bit_stream[i] == 1):
-            for j in range(0,100):
-                signal[(i)*100+j] = A *  math.sin(2*math.pi*f1*j/100)
-        else:
-            for j in range(0,100):
-                signal[(i)*100+j] = A *  math.sin(2*math.pi*f2*j/100)
-    
-    return signal
+def FSK_modulation(A,f1,f2,bit_stream, samples_per_symbol=100, out=None, workspace=None):
+    return _modular_com_banco(_fsk_bank(A, f1, f2, samples_per_symbol), bit_stream, out, workspace)
                 
-def PSK_modulation(A,f,bit_stream):
-    sig_size = len(bit_stream)
-    signal = np.zeros(sig_size*100)
-    
-    for i in range(0,sig_size):
-        if(bit_stream[i] == 1):
-            for j in range(0,100):
-                signal[i*100+j] = A*math.sin(2*math.pi*f*j/100)
-        else:
-            for j in range(0,100):
-                signal[i*100+j] = A*math.sin(2*math.pi*f*j/100 + math.pi)
-    
+def PSK_modulation(A,f,bit_stream, samples_per_symbol=100, out=None, workspace=None):
+    return _modular_com_banco(_psk_bank(A, f, samples_per_symbol), bit_stream, out, workspace)
+
+#*************************************Constellation mapper (QPSK/16-QAM)*****************************************
+#bits -> indice do simbolo (MSB primeiro) -> (I, Q) por tabelas de consulta; a portadora de cada simbolo
+#e montada por broadcasting sobre as portadoras cos/sin em cache.
+
+@lru_cache(maxsize=64)
+def _portadoras(f, samples_per_symbol):
+    """
+    Portadoras de um simbolo, (2, N) somente leitura: linha 0 = cos(2*pi*f*t), linha 1 = sin(2*pi*f*t),
+    com t = j/N. Calculadas com math.cos/math.sin, como nos moduladores originais.
+    """
+    check_nyquist(f, samples_per_symbol)
+    carriers = np.array([[math.cos(2*math.pi*f*(j/samples_per_symbol)) for j in range(samples_per_symbol)],
+                         [math.sin(2*math.pi*f*(j/samples_per_symbol)) for j in range(samples_per_symbol)]])
+    carriers.setflags(write=False)
+    return carriers
+
+def _bits_para_indices(bits, bits_per_symbol, workspace=None):
+    """
+    Agrupa os bits (ultimo eixo) de bits_per_symbol em bits_per_symbol e converte cada grupo
+    no indice inteiro do simbolo, com o primeiro bit como o mais significativo.
+    """
+    groups = bits.reshape(bits.shape[:-1] + (bits.shape[-1] // bits_per_symbol, bits_per_symbol))
+    index = rascunho(workspace, "indice_simbolo", groups.shape[:-1], np.intp)
+    np.copyto(index, groups[..., 0], casting='unsafe')
+    for j in range(1, bits_per_symbol):
+        np.left_shift(index, 1, out=index)
+        np.bitwise_or(index, groups[..., j], out=index, casting='unsafe')
+    return index
+
+def _indices_para_bits(index, bits_per_symbol, out=None):
+    """
+    Inverso de _bits_para_indices: (..., num_simbolos) -> (..., num_simbolos * bits_per_symbol) uint8.
+    'index' e consumido (usado como rascunho).
+    """
+    bits = saida(out, index.shape[:-1] + (index.shape[-1] * bits_per_symbol,), np.uint8)
+    groups = bits.reshape(index.shape + (bits_per_symbol,))
+    for j in range(bits_per_symbol - 1, -1, -1):
+        np.bitwise_and(index, 1, out=groups[..., j], casting='unsafe')
+        np.right_shift(index, 1, out=index)
+    return bits
+
+def _modular_iq(I, Q, carriers, out=None, workspace=None):
+    """s = I*cos + Q*sin para cada simbolo: (..., num_simbolos) -> (..., num_simbolos * N)."""
+    cos_carrier, sin_carrier = carriers
+    N = carriers.shape[-1]
+    signal = saida(out, I.shape[:-1] + (I.shape[-1] * N,), np.result_type(I.dtype, carriers.dtype))
+    blocks = signal.reshape(I.shape + (N,))
+    np.multiply(I[..., np.newaxis], cos_carrier, out=blocks)
+    quadrature = rascunho(workspace, "quadratura", blocks.shape, blocks.dtype)
+    np.multiply(Q[..., np.newaxis], sin_carrier, out=quadrature)
+    np.add(blocks, quadrature, out=blocks)
     return signal
 
-def QPSK_modulation(A, f, bit_stream, samples_per_symbol=100):
+# Gray mapping QPSK: indice 2*b0 + b1 -> (I, Q)
+# (0,0) -> (+1, +1)
+# (0,1) -> (-1, +1)
+# (1,0) -> (+1, -1)
+# (1,1) -> (-1, -1)
+QPSK_IQ = np.array([
+    [ 1.0,  1.0],
+    [-1.0,  1.0],
+    [ 1.0, -1.0],
+    [-1.0, -1.0],
+])
+
+@lru_cache(maxsize=16)
+def _constelacao_qpsk(A):
+    """QPSK_IQ como pontos complexos I + jQ escalados por A / sqrt(2) (somente leitura, em cache)."""
+    IQ = QPSK_IQ * (A / math.sqrt(2.0))
+    points = IQ[:, 0] + 1j * IQ[:, 1]
+    points.setflags(write=False)
+    return points
+
+def _decidir_qpsk(I, Q, out=None):
+    """Sinal de I e de Q de cada estimativa -> bits (inverso de QPSK_IQ)."""
+    # inverse of mapping (QPSK_IQ): b0 = Q negativo, b1 = I negativo
+    bits = saida(out, I.shape[:-1] + (I.shape[-1] * 2,), np.uint8)
+    groups = bits.reshape(I.shape + (2,))
+    np.less_equal(Q, 0, out=groups[..., 0])
+    np.less_equal(I, 0, out=groups[..., 1])
+    return bits
+
+def QPSK_modulation(A, f, bit_stream, samples_per_symbol=100, out=None, workspace=None):
     """
     QPSK modulator:
       - bit_stream: list/array of 0/1 bits (length even; if odd, will be padded with 0)
       - A: amplitude scale
       - f: carrier frequency (in cycles per symbol)
       - samples_per_symbol: how many samples represent one QPSK symbol (default 100)
-    Returns: 1D numpy array of samples (float)
-    """
-    bits = list(bit_stream)
-    # pad if needed
-    if len(bits) % 2 != 0:
-        bits.append(0)
-
-    # Gray mapping: (b_i, b_q) -> (I, Q)
-    # (0,0) -> (+1, +1)
-    # (0,1) -> (-1, +1)
-    # (1,1) -> (-1, -1)
-    # (1,0) -> (+1, -1)
-    mapping = {
-        (0,0): (1.0,  1.0),
-        (0,1): (-1.0, 1.0),
-        (1,1): (-1.0,-1.0),
-        (1,0): (1.0, -1.0)
-    }
-
-    num_symbols = len(bits) // 2
-    sig = np.zeros(num_symbols * samples_per_symbol)
-
-    # time vector for one symbol (normalized 0..1)
-    t = np.arange(samples_per_symbol) / samples_per_symbol
-    cos_carrier = np.cos(2 * np.pi * f * t)
-    sin_carrier = np.sin(2 * np.pi * f * t)
-
-    # Optionally normalize I/Q so average symbol power = A^2
-    # Here I and Q values are +/-1; combined power per symbol = 2.
-    # We'll scale final I/Q by A / sqrt(2) so average power ~ A^2.
-    scale = A / math.sqrt(2.0)
-
-    for k in range(num_symbols):
-        b0 = bits[2*k]     # I-bit
-        b1 = bits[2*k + 1] # Q-bit
-        I_sym, Q_sym = mapping[(b0, b1)]
-        I_sym *= scale
-        Q_sym *= scale
-        start = k * samples_per_symbol
-        # s(t) = I*cos - Q*sin
-        sig[start:start + samples_per_symbol] = I_sym * cos_carrier - Q_sym * sin_carrier
-
-    return sig
+    Returns: 1D numpy array of samples (float); a 2-D batch (n_frames, n_bits) gives (n_frames, n_samples)
+    """
+    # Bits are padded with 0 if needed. I and Q values are +/-1 (power 2 per symbol),
+    # scaled by A / sqrt(2) so the average power is A^2.
+    z = _simbolos_rascunho(_constelacao_qpsk(A), bit_stream, workspace)
+
+    # s(t) = I*cos - Q*sin
+    np.conjugate(z, out=z)
+    return _modular_iq(z.real, z.imag, _portadoras(f, samples_per_symbol), out, workspace)
 
 # Gray table 16-QAM
 gray_map = {
@@ -134,166 +223,356 @@ inv_gray = {tuple(v): k for k,v in gray_map.items()}
 def bits_to_IQ(bits):
     return inv_gray[tuple(bits)]
 
-def QAM16_modulation(f, bit_stream):
-    assert len(bit_stream) % 4 == 0, "16QAM usa 4 bits por símbolo"
+# Tabelas derivadas de gray_map (mesmo mapeamento, acesso vetorizado):
+#   QAM16_IQ[indice]        -> (I, Q) do simbolo cujos 4 bits formam 'indice'
+#   QAM16_INDEX[iI, iQ]     -> indice do simbolo nos niveis QAM16_LEVELS[iI], QAM16_LEVELS[iQ]
+QAM16_LEVELS = np.array([-3, -1, 1, 3])
+QAM16_IQ = np.array([bits_to_IQ([(i >> shift) & 1 for shift in (3, 2, 1, 0)]) for i in range(16)], dtype=float)
+QAM16_INDEX = np.array([[int(''.join(map(str, gray_map[(I, Q)])), 2) for Q in QAM16_LEVELS]
+                        for I in QAM16_LEVELS])
+_QAM16_POINTS = QAM16_IQ[:, 0] + 1j * QAM16_IQ[:, 1]
 
-    num_symbols = len(bit_stream)//4
-    signal = np.zeros(num_symbols*100)
+def QAM16_modulation(f, bit_stream, samples_per_symbol=100, out=None, workspace=None):
+    bits = np.asarray(bit_stream)
+    assert bits.shape[-1] % 4 == 0, "16QAM usa 4 bits por símbolo"
 
-    for i in range(num_symbols):
-        bits = bit_stream[i*4:(i+1)*4]
-        I, Q = bits_to_IQ(bits)
+    IQ = _simbolos_rascunho(_QAM16_POINTS, bits, workspace)
 
-        for j in range(100):
-            t = j/100
-            signal[i*100+j] = I*math.cos(2*math.pi*f*t) + Q*math.sin(2*math.pi*f*t)
-
-    return signal
+    return _modular_iq(IQ.real, IQ.imag, _portadoras(f, samples_per_symbol), out, workspace)
 
 #********************************Demodulation functions (should resist noise)**********************************
+#As versoes *_stream recebem o sinal inteiro (1-D ou lote 2-D), remodelam para (..., num_simbolos, N)
+#e decidem todos os bits de uma vez contra as referencias do banco de formas de onda (em cache).
+#Retornam um numpy.array uint8 de bits; amostras que nao completam um simbolo sao descartadas.
+
+def _blocos_de_simbolos(signal, samples_per_symbol):
+    """
+    Visao (sem copia) do sinal como (..., num_simbolos, samples_per_symbol).
+    """
+    signal = np.asarray(signal)
+    num_symbols = signal.shape[-1] // samples_per_symbol
+    used = signal[..., :num_symbols * samples_per_symbol]
+    return used.reshape(signal.shape[:-1] + (num_symbols, samples_per_symbol))
+
+def _correlacionar(blocks, references, workspace=None):
+    """blocks @ references (uma ou mais formas de onda de referencia) no rascunho 'correlacao'."""
+    shape = blocks.shape[:-1] + references.shape[1:]
+    corr = rascunho(workspace, "correlacao", shape, np.result_type(blocks.dtype, references.dtype))
+    return np.matmul(blocks, references, out=corr)
+
+def ASK_demodulation_stream(A, signal, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Detector de energia: bit 1 quando o valor RMS do simbolo passa de A/4.
+    """
+    blocks = _blocos_de_simbolos(signal, samples_per_symbol)
+    energy = rascunho(workspace, "energia", blocks.shape[:-1], np.result_type(blocks.dtype, np.float64))
+    np.einsum('...ij,...ij->...i', blocks, blocks, out=energy)
+    energy /= samples_per_symbol
+    np.sqrt(energy, out=energy)
+
+    return np.greater(energy, A/4, out=saida(out, energy.shape, np.uint8))
+
+def FSK_demodulation_stream(A, f1, f2, signal, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Correlaciona cada simbolo com as duas senoides do banco FSK em um unico produto
+    matricial; bit 1 quando a correlacao com f1 e maior que a correlacao com f2.
+    """
+    blocks = _blocos_de_simbolos(signal, samples_per_symbol)
+    corr = _correlacionar(blocks, _fsk_bank(A, f1, f2, samples_per_symbol).T, workspace)  # (..., num_simbolos, 2): [f2, f1]
+
+    return np.greater(corr[..., 1], corr[..., 0], out=saida(out, corr.shape[:-1], np.uint8))
+
+def PSK_demodulation_stream(A, f, signal, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Correlaciona cada simbolo com sin(2*pi*f*t); bit 1 quando a correlacao e positiva.
+    A amplitude nao altera a decisao e so e recebida por simetria com as demais funcoes.
+    """
+    blocks = _blocos_de_simbolos(signal, samples_per_symbol)
+    corr = _correlacionar(blocks, _senoide(1.0, f, samples_per_symbol)[:, np.newaxis], workspace)[..., 0]
+
+    return np.greater(corr, 0, out=saida(out, corr.shape, np.uint8))
 
 #receiveis a signal sequence that corresponds to one symbol. to online decifration
 def ASK_demodulation(A,signal):
-    sig_size = len(signal)
-    
-    quadratic_sum = 0
-    for i in range(0,sig_size):
-        quadratic_sum += signal[i]**2
-        
-    if math.sqrt(quadratic_sum/sig_size) > A/4:
-        bit = 1
-    else:
-        bit = 0
-    
-    return bit
+    return int(ASK_demodulation_stream(A, signal, len(signal))[0])
 
 
 #receiveis a signal sequence that corresponds to one symbol. to online decifration
-def FSK_demodulation(A,f1,f2,signal):
-    samples_per_bit = 100
-    signal1 = np.zeros(samples_per_bit)
-    signal2 = np.zeros(samples_per_bit)
-    
-    corf1 = 0
-    corf2 = 0
-    for i in range(samples_per_bit):
-        signal1[i] = A *  math.sin(2*math.pi*f1*i/samples_per_bit)
-        signal2[i] = A *  math.sin(2*math.pi*f2*i/samples_per_bit)
-        
-        corf1 += signal1[i] * signal[i]
-        corf2 += signal2[i] * signal[i]
-    
-    if corf1 > corf2:
-        bit = 1
-    else:
-        bit = 0
-        
-    return bit 
+def FSK_demodulation(A,f1,f2,signal, samples_per_symbol=100):
+    return int(FSK_demodulation_stream(A, f1, f2, signal[:samples_per_symbol], samples_per_symbol)[0])
         
 def PSK_demodulation(A,f,signal):
-    sig_size = len(signal)
-    
-    t = np.arange(sig_size)/sig_size
-    reference = np.sin(2*np.pi*f*t)
-    
-    corr = np.sum(np.array(signal)*reference)
-    
-    if corr > 0:
-        bit = 1 
-    else:
-        bit = 0
-    
-    return bit
+    return int(PSK_demodulation_stream(A, f, signal, len(signal))[0])
 
     
-def QPSK_demodulation(rx_signal, f, samples_per_symbol=100):
+def _correlacionar_iq(signal, f, samples_per_symbol, workspace=None):
+    """
+    Correlaciona cada simbolo com cos e sin da portadora em um unico produto matricial.
+    Retorna (..., num_simbolos, 2): [..., 0] = sum(x*cos), [..., 1] = sum(x*sin).
+    """
+    blocks = _blocos_de_simbolos(signal, samples_per_symbol)
+    return _correlacionar(blocks, _portadoras(f, samples_per_symbol).T, workspace)
+
+def _nivel_mais_proximo(values, levels, workspace=None, nome="indice_nivel"):
+    """Indice do nivel mais proximo de cada valor (argmin vetorizado; empate -> primeiro nivel)."""
+    distance = rascunho(workspace, "distancia", values.shape + levels.shape,
+                        np.result_type(values.dtype, levels.dtype))
+    np.subtract(values[..., np.newaxis], levels, out=distance)
+    np.abs(distance, out=distance)
+    return np.argmin(distance, axis=-1, out=rascunho(workspace, nome, values.shape, np.intp))
+
+def QPSK_demodulation(rx_signal, f, samples_per_symbol=100, out=None, workspace=None):
     """
     QPSK demodulator (coherent correlator):
-      - rx_signal: received samples (numpy array)
+      - rx_signal: received samples (numpy array, 1-D or a 2-D batch of frames)
       - f: carrier frequency (same units as modulator's f)
       - samples_per_symbol: samples per symbol (must match modulator)
-    Returns: list of recovered bits [b0,b1,b0,b1,...]
+    Returns: uint8 numpy array of recovered bits [b0,b1,b0,b1,...]
     """
-    N = samples_per_symbol
-    num_symbols = len(rx_signal) // N
-
-    t = np.arange(N) / N
-    cos_carrier = np.cos(2 * np.pi * f * t)
-    sin_carrier = np.sin(2 * np.pi * f * t)
-
-    bits_out = []
-
-    for k in range(num_symbols):
-        block = rx_signal[k*N : (k+1)*N]
-
-        # Correlate with cos to get I*energy (approx)
-        I_corr = np.dot(block, cos_carrier)
-
-        # Because transmitter used "- Q*sin", correlate with -sin to get Q positive when Q_sym>0:
-        Q_corr = -np.dot(block, sin_carrier)
-
-        # Decide sign -> map back to bits using same mapping used in modulation
-        # We didn't normalize by energy because we only need sign, not magnitude.
-        I_pos = 1 if I_corr > 0 else -1
-        Q_pos = 1 if Q_corr > 0 else -1
-
-        # inverse of mapping:
-        # (I,Q) -> bits:
-        # (+1, +1) -> (0,0)
-        # (-1, +1) -> (0,1)
-        # (-1, -1) -> (1,1)
-        # (+1, -1) -> (1,0)
-        if (I_pos, Q_pos) == (1, 1):
-            bits_out.extend([0, 0])
-        elif (I_pos, Q_pos) == (-1, 1):
-            bits_out.extend([0, 1])
-        elif (I_pos, Q_pos) == (-1, -1):
-            bits_out.extend([1, 1])
-        elif (I_pos, Q_pos) == (1, -1):
-            bits_out.extend([1, 0])
-        else:
-            # fallback - shouldn't happen
-            bits_out.extend([0,0])
-
-    return bits_out
-
-def QAM16_demodulation(signal, f):
-
-    num_symbols = len(signal)//100
-    bit_stream = []
-
-    # Níveis possíveis
-    levels = np.array([-3, -1, 1, 3])
-
-    for i in range(num_symbols):
+    corr = _correlacionar_iq(rx_signal, f, samples_per_symbol, workspace)
 
-        # correlação
-        I_hat = 0
-        Q_hat = 0
+    # Correlate with cos to get I*energy (approx)
+    # Because transmitter used "- Q*sin", correlate with -sin to get Q positive when Q_sym>0.
+    # We didn't normalize by energy because we only need sign, not magnitude.
+    np.negative(corr[..., 1], out=corr[..., 1])
+    return _decidir_qpsk(corr[..., 0], corr[..., 1], out)
 
-        for j in range(100):
-            t = j/100
-            sample = signal[i*100+j]
-
-            I_hat += sample * math.cos(2*math.pi*f*t)
-            Q_hat += sample * math.sin(2*math.pi*f*t)
-        
-        I_hat = I_hat/50
-        Q_hat = Q_hat/50
-        print(I_hat)
-        print(Q_hat)
-        # Decide para qual nível está mais próximo
-        I_dec = levels[np.argmin(abs(levels - I_hat))]
-        Q_dec = levels[np.argmin(abs(levels - Q_hat))]
-
-        # Convert back to bits
-        bits = gray_map[(I_dec, Q_dec)]
-        bit_stream += bits
+def QAM16_demodulation(signal, f, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Correlaciona cada simbolo com cos/sin (normalizado por N/2), decide o nivel
+    mais proximo em I e em Q e converte de volta para bits pela tabela de Gray.
+    Retorna um numpy.array uint8 de bits.
+    """
+    corr = _correlacionar_iq(signal, f, samples_per_symbol, workspace)
+    corr /= samples_per_symbol / 2
+    I_index = _nivel_mais_proximo(corr[..., 0], QAM16_LEVELS, workspace, "indice_I")
+    Q_index = _nivel_mais_proximo(corr[..., 1], QAM16_LEVELS, workspace, "indice_Q")
+
+    # QAM16_INDEX[I_index, Q_index]
+    I_index *= len(QAM16_LEVELS)
+    I_index += Q_index
+    np.take(QAM16_INDEX.reshape(-1), I_index, out=Q_index, mode='clip')
+    return _indices_para_bits(Q_index, 4, out)
+
+#*************************************Generic M-QAM / M-PSK engine*************************************************
+#Constelacoes com codigo de Gray geradas por parametro (8-PSK, 8-QAM, 64-QAM, 256-QAM, ...). Os sinais usam
+#a mesma convencao da 16-QAM (s = I*cos + Q*sin) e o mesmo receptor correlator (_correlacionar_iq / (N/2)).
+#
+#QAM: k = log2(M) bits por simbolo; os ceil(k/2) primeiros bits escolhem o nivel de I e os floor(k/2) ultimos
+#o nivel de Q, cada eixo com Gray refletido sobre os niveis -(L-1), ..., -1, 1, ..., L-1. Para k par e uma
+#constelacao quadrada (M = 16 reproduz gray_map); para k impar, retangular (8-QAM = 4 x 2 niveis).
+#PSK: o simbolo cujo rotulo de Gray e gray(i) fica na fase 2*pi*i/M.
+
+def _bits_por_simbolo(M):
+    k = int(M).bit_length() - 1
+    if M < 2 or (1 << k) != M:
+        raise ValueError(f"M deve ser uma potência de 2 (recebido {M})")
+    return k
+
+def _gray(i):
+    return i ^ (i >> 1)
+
+def _completar_simbolos(bit_stream, bits_per_symbol):
+    """Completa com zeros (no ultimo eixo) ate um numero inteiro de simbolos, como na QPSK."""
+    bits = np.asarray(bit_stream)
+    missing = -bits.shape[-1] % bits_per_symbol
+    if missing:
+        pad = np.zeros(bits.shape[:-1] + (missing,), dtype=bits.dtype)
+        bits = np.concatenate((bits, pad), axis=-1)
+    return bits
+
+@lru_cache(maxsize=16)
+def _eixos_qam(M):
+    """
+    Parametros por eixo da M-QAM: (bits_I, bits_Q, niveis_I, niveis_Q, gray_I, gray_Q), onde
+    gray_X[i] e o rotulo de Gray do i-esimo nivel do eixo X.
+    """
+    k = _bits_por_simbolo(M)
+    if k < 2:
+        raise ValueError("M-QAM precisa de pelo menos 2 bits por símbolo (M >= 4)")
+    bits_I, bits_Q = (k + 1) // 2, k // 2
+    axes = []
+    for bits in (bits_I, bits_Q):
+        L = 1 << bits
+        index = np.arange(L)
+        levels = (2 * index - (L - 1)).astype(float)
+        levels.setflags(write=False)
+        gray = _gray(index)
+        gray.setflags(write=False)
+        axes.append((levels, gray))
+    (levels_I, gray_I), (levels_Q, gray_Q) = axes
+    return bits_I, bits_Q, levels_I, levels_Q, gray_I, gray_Q
+
+@lru_cache(maxsize=16)
+def QAM_constellation(M):
+    """
+    Constelacao M-QAM com codigo de Gray: array complexo (M,) somente leitura, indexado pelo
+    inteiro formado pelos k bits do simbolo (primeiro bit = mais significativo).
+    """
+    bits_I, bits_Q, levels_I, levels_Q, gray_I, gray_Q = _eixos_qam(M)
+    points = np.empty(M, dtype=complex)
+    index = (gray_I[:, np.newaxis] << bits_Q) | gray_Q[np.newaxis, :]
+    points[index] = levels_I[:, np.newaxis] + 1j * levels_Q[np.newaxis, :]
+    points.setflags(write=False)
+    return points
+
+@lru_cache(maxsize=16)
+def PSK_constellation(M, A=1.0):
+    """
+    Constelacao M-PSK com codigo de Gray: array complexo (M,) somente leitura, indexado pelo
+    inteiro formado pelos k bits do simbolo. O ponto de rotulo gray(i) tem fase 2*pi*i/M.
+    """
+    _bits_por_simbolo(M)
+    i = np.arange(M)
+    points = np.empty(M, dtype=complex)
+    points[_gray(i)] = A * np.exp(2j * np.pi * i / M)
+    points.setflags(write=False)
+    return points
+
+def _mapear_constelacao(points, bit_stream, out=None, workspace=None):
+    """Bits -> pontos da constelacao (bits que nao completam um simbolo sao completados com zeros)."""
+    k = _bits_por_simbolo(len(points))
+    index = _bits_para_indices(_completar_simbolos(bit_stream, k), k, workspace)
+    return np.take(points, index, out=saida(out, index.shape, points.dtype), mode='clip')
+
+def _simbolos_rascunho(points, bit_stream, workspace):
+    """_mapear_constelacao no rascunho 'simbolos' (entrada dos moduladores com portadora)."""
+    bits = np.asarray(bit_stream)
+    k = _bits_por_simbolo(len(points))
+    shape = bits.shape[:-1] + (-(-bits.shape[-1] // k),)
+    return _mapear_constelacao(points, bits, rascunho(workspace, "simbolos", shape, points.dtype), workspace)
+
+def _modular_constelacao(points, f, bit_stream, samples_per_symbol, out=None, workspace=None):
+    symbols = _simbolos_rascunho(points, bit_stream, workspace)
+    return _modular_iq(symbols.real, symbols.imag, _portadoras(f, samples_per_symbol), out, workspace)
+
+def _decidir_qam(I, Q, M, out=None, workspace=None):
+    """Nivel mais proximo em cada eixo (equivale ao ponto mais proximo da grade retangular) -> bits."""
+    bits_I, bits_Q, levels_I, levels_Q, gray_I, gray_Q = _eixos_qam(M)
+    I_index = _nivel_mais_proximo(I, levels_I, workspace, "indice_I")
+    Q_index = _nivel_mais_proximo(Q, levels_Q, workspace, "indice_Q")
+
+    # (gray_I[I_index] << bits_Q) | gray_Q[Q_index]; np.take copiaria os indices se out fosse o proprio array
+    index = rascunho(workspace, "indice_gray", I.shape, np.intp)
+    np.take(gray_I, I_index, out=index, mode='clip')
+    np.left_shift(index, bits_Q, out=index)
+    np.take(gray_Q, Q_index, out=I_index, mode='clip')
+    np.bitwise_or(index, I_index, out=index)
+    return _indices_para_bits(index, bits_I + bits_Q, out)
+
+def _decidir_psk(I, Q, M, out=None, workspace=None):
+    """Fase mais proxima (setor de largura 2*pi/M) -> bits; independe da amplitude."""
+    phase = rascunho(workspace, "fase", I.shape, np.result_type(I.dtype, np.float64))
+    np.arctan2(Q, I, out=phase)  # np.angle(I + jQ)
+    phase *= M / (2 * np.pi)
+    np.rint(phase, out=phase)
+    sector = rascunho(workspace, "setor", I.shape, np.intp)
+    np.copyto(sector, phase, casting='unsafe')
+    np.remainder(sector, M, out=sector)
+
+    # _gray(sector) = sector ^ (sector >> 1)
+    shifted = rascunho(workspace, "setor_deslocado", I.shape, np.intp)
+    np.right_shift(sector, 1, out=shifted)
+    np.bitwise_xor(sector, shifted, out=sector)
+    return _indices_para_bits(sector, _bits_por_simbolo(M), out)
+
+def _estimar_simbolos(signal, f, samples_per_symbol, workspace=None):
+    """Saida do correlator normalizada por N/2: estimativa complexa I + jQ de cada simbolo."""
+    corr = _correlacionar_iq(signal, f, samples_per_symbol, workspace)
+    corr /= samples_per_symbol / 2
+    return corr.view(np.complex128)[..., 0]  # (I, Q) contiguos = I + jQ, sem copia
+
+def MQAM_modulation(f, bit_stream, M, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Modulador M-QAM generico (M = 4, 8, 16, 32, 64, 128, 256, ...).
+    Bits que nao completam um simbolo sao completados com zeros. Aceita lotes 2-D.
+    """
+    return _modular_constelacao(QAM_constellation(M), f, bit_stream, samples_per_symbol, out, workspace)
 
-    return bit_stream
+def MQAM_demodulation(signal, f, M, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Demodulador M-QAM generico: correlator + decisao do nivel mais proximo em cada eixo
+    (equivalente ao ponto mais proximo, pois a grade e retangular). Retorna uint8.
+    """
+    z = _estimar_simbolos(signal, f, samples_per_symbol, workspace)
+    return _decidir_qam(z.real, z.imag, M, out, workspace)
 
+def MPSK_modulation(A, f, bit_stream, M, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Modulador M-PSK generico (M = 2, 4, 8, 16, ...) com amplitude A.
+    Bits que nao completam um simbolo sao completados com zeros. Aceita lotes 2-D.
+    """
+    return _modular_constelacao(PSK_constellation(M, A), f, bit_stream, samples_per_symbol, out, workspace)
 
-    
-    
-    
-    
\ No newline at end of file
+def MPSK_demodulation(signal, f, M, samples_per_symbol=100, out=None, workspace=None):
+    """
+    Demodulador M-PSK generico: correlator + decisao pela fase mais proxima
+    (setor de largura 2*pi/M). A decisao independe da amplitude. Retorna uint8.
+    """
+    z = _estimar_simbolos(signal, f, samples_per_symbol, workspace)
+    return _decidir_psk(z.real, z.imag, M, out, workspace)
+
+#*************************************Complex baseband (symbol domain)*********************************************
+#Para curvas de BER nao e preciso gerar a portadora: os receptores coerentes acima so dependem da saida do
+#correlator de cada simbolo. Estas funcoes produzem diretamente essa saida sem ruido, UMA amostra complexa por
+#simbolo (o equivalente em banda base), e decidem sobre ela com as mesmas regras dos demoduladores em banda
+#passante. Com o AWGN somado no dominio do simbolo (canal.awgn com samples_per_symbol=1 e sinal complexo:
+#sigma^2 = N0/2 por componente), a estatistica das decisoes e a mesma do caminho com portadora e N amostras.
+#
+#  PSK/QPSK/M-PSK/M-QAM: z = I + jQ, como _estimar_simbolos (correlator / (N/2)).
+#  FSK: os dois tons sao ortogonais; bit 1 (f1) vai para o eixo real e bit 0 (f2) para o imaginario,
+#       e a decisao compara os dois correlatores (Re > Im), como FSK_demodulation_stream.
+#  ASK: z = A (bit 1) ou 0; a decisao usa o envelope |z| > A/2 (nao coerente). NAO equivale ao detector de
+#       energia em banda passante (RMS > A/4), que integra o ruido das N amostras do simbolo e nao tem
+#       equivalente de uma amostra: a BER e bem menor. Por isso o modo banda_base do Simulador mantem a
+#       ASK em banda passante.
+#Aceitam bits 1-D ou lotes 2-D (n_quadros, n_bits) e retornam arrays complex128 (..., num_simbolos).
+
+@lru_cache(maxsize=64)
+def _banco_banda_base(symbol0, symbol1):
+    """Banco (2, 1) complexo somente leitura: o simbolo do bit 0 e o do bit 1."""
+    return _banco(np.array([complex(symbol0)]), np.array([complex(symbol1)]))
+
+def ASK_baseband_modulation(A, bit_stream, out=None, workspace=None):
+    return _modular_com_banco(_banco_banda_base(0, A), bit_stream, out, workspace)
+
+def ASK_baseband_demodulation(A, symbols, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    envelope = np.abs(symbols, out=rascunho(workspace, "envelope", symbols.shape, np.abs(symbols[..., :0]).dtype))
+    return np.greater(envelope, A / 2, out=saida(out, symbols.shape, np.uint8))
+
+def FSK_baseband_modulation(A, bit_stream, out=None, workspace=None):
+    return _modular_com_banco(_banco_banda_base(1j * A, A), bit_stream, out, workspace)
+
+def FSK_baseband_demodulation(symbols, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    return np.greater(symbols.real, symbols.imag, out=saida(out, symbols.shape, np.uint8))
+
+def PSK_baseband_modulation(A, bit_stream, out=None, workspace=None):
+    return _modular_com_banco(_banco_banda_base(-A, A), bit_stream, out, workspace)
+
+def PSK_baseband_demodulation(symbols, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    return np.greater(symbols.real, 0, out=saida(out, symbols.shape, np.uint8))
+
+def QPSK_baseband_modulation(A, bit_stream, out=None, workspace=None):
+    """Simbolos I + jQ da QPSK (mesmo mapeamento de Gray e potencia A^2 de QPSK_modulation)."""
+    return _mapear_constelacao(_constelacao_qpsk(A), bit_stream, out, workspace)
+
+def QPSK_baseband_demodulation(symbols, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    return _decidir_qpsk(symbols.real, symbols.imag, out)
+
+def MQAM_baseband_modulation(bit_stream, M, out=None, workspace=None):
+    return _mapear_constelacao(QAM_constellation(M), bit_stream, out, workspace)
+
+def MQAM_baseband_demodulation(symbols, M, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    return _decidir_qam(symbols.real, symbols.imag, M, out, workspace)
+
+def MPSK_baseband_modulation(A, bit_stream, M, out=None, workspace=None):
+    return _mapear_constelacao(PSK_constellation(M, A), bit_stream, out, workspace)
+
+def MPSK_baseband_demodulation(symbols, M, out=None, workspace=None):
+    symbols = np.asarray(symbols)
+    return _decidir_psk(symbols.real, symbols.imag, M, out, workspace)
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da Camada Fisica (modulacao digital e por portadora).
+Verifica as formas de onda geradas e a recuperacao dos bits sem ruido.
+"""
+import io
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+import numpy as np
+import modulacao_demodulacao_digital as dig
+import modulacao_demodulacao_portadora as port
+import canal
+from area_de_trabalho import Workspace
+
+
+class TestModulacaoDigital(unittest.TestCase):
+
+    def setUp(self):
+        self.BITS = [1, 0, 1, 1, 0, 0, 1]
+        self.LOTE = np.random.default_rng(7).integers(0, 2, (4, 32))
+
+    def test_nrz_polar_niveis(self):
+        s = dig.NRZ_polar_modulation(2, [1, 0])
+        self.assertEqual(s.shape, (200,))
+        self.assertTrue(np.all(s[:100] == 2.0))
+        self.assertTrue(np.all(s[100:] == -2.0))
+
+    def test_manchester_meias_ondas(self):
+        s = dig.manchester_modulation(1.0, [1, 0], samples_per_symbol=4)
+        np.testing.assert_array_equal(s, [1, 1, -1, -1, -1, -1, 1, 1])
+
+    def test_bipolar_alterna_polaridade(self):
+        s = dig.bipolar_modulation(3, self.BITS, samples_per_symbol=1)
+        np.testing.assert_array_equal(s, [3, 0, -3, 3, 0, 0, -3])
+
+    def test_bipolar_aceita_samples_per_bit_obsoleto(self):
+        bits = [1, 0, 1, 1]
+        with self.assertWarns(DeprecationWarning):
+            antigo = dig.bipolar_modulation(1.0, bits, samples_per_bit=8)
+        np.testing.assert_array_equal(antigo, dig.bipolar_modulation(1.0, bits, 8))
+        with self.assertWarns(DeprecationWarning):
+            np.testing.assert_array_equal(dig.bipolar_demodulation(1.0, antigo, samples_per_bit=8), bits)
+        with self.assertRaises(TypeError):
+            dig.bipolar_modulation(1.0, bits, 8, samples_per_bit=8)
+
+    def test_lote_igual_a_quadros_individuais(self):
+        for mod in (dig.NRZ_polar_modulation, dig.manchester_modulation, dig.bipolar_modulation):
+            lote = mod(1.0, self.LOTE)
+            self.assertEqual(lote.shape, (4, 32 * 100))
+            for i in range(len(self.LOTE)):
+                np.testing.assert_array_equal(lote[i], mod(1.0, list(self.LOTE[i])))
+
+
+class TestDemodulacaoDigital(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(11).integers(0, 2, (3, 50))
+
+    def test_ida_e_volta_sem_ruido(self):
+        pares = [
+            (dig.NRZ_polar_modulation, dig.NRZ_polar_demodulation),
+            (dig.manchester_modulation, dig.manchester_demodulation_correlator),
+            (dig.bipolar_modulation, lambda s: dig.bipolar_demodulation(1.0, s)),
+        ]
+        for mod, demod in pares:
+            bits = demod(mod(1.0, self.LOTE))
+            self.assertEqual(bits.dtype, np.uint8)
+            np.testing.assert_array_equal(bits, self.LOTE)
+
+    def test_amostras_incompletas_sao_descartadas(self):
+        s = dig.NRZ_polar_modulation(1.0, [1, 0, 1])
+        np.testing.assert_array_equal(dig.NRZ_polar_demodulation(s[:-1]), [1, 0])
+
+
+class TestModulacaoPortadora(unittest.TestCase):
+
+    def setUp(self):
+        self.BITS = [1, 0, 0, 1]
+        self.t = np.arange(100) / 100
+
+    def test_ask_liga_desliga(self):
+        s = port.ASK_modulation(2, 3, self.BITS).reshape(4, 100)
+        np.testing.assert_allclose(s[0], 2 * np.sin(2 * np.pi * 3 * self.t), atol=1e-12)
+        self.assertTrue(np.all(s[1] == 0))
+
+    def test_fsk_e_psk_formas_por_bit(self):
+        fsk = port.FSK_modulation(1, 2, 5, self.BITS).reshape(4, 100)
+        np.testing.assert_allclose(fsk[1], np.sin(2 * np.pi * 5 * self.t), atol=1e-12)
+        psk = port.PSK_modulation(1, 2, self.BITS).reshape(4, 100)
+        np.testing.assert_allclose(psk[1], -psk[0], atol=1e-12)
+
+    def test_banco_e_reutilizado_e_protegido(self):
+        port.PSK_modulation(1, 4, self.BITS)
+        banco = port._psk_bank(1, 4, 100)
+        self.assertIs(banco, port._psk_bank(1, 4, 100))
+        self.assertFalse(banco.flags.writeable)
+        s = port.PSK_modulation(1, 4, self.BITS)
+        s[:] = 0  # a saida e uma copia: nao pode corromper o banco
+        self.assertTrue(np.any(banco != 0))
+
+
+class TestDemodulacaoPortadora(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(5).integers(0, 2, (2, 40))
+
+    def test_fluxo_ida_e_volta(self):
+        casos = [
+            (port.ASK_modulation(2, 3, self.LOTE), lambda s: port.ASK_demodulation_stream(2, s)),
+            (port.FSK_modulation(1, 2, 5, self.LOTE), lambda s: port.FSK_demodulation_stream(1, 2, 5, s)),
+            (port.PSK_modulation(1, 2, self.LOTE), lambda s: port.PSK_demodulation_stream(1, 2, s)),
+        ]
+        for sinal, demod in casos:
+            bits = demod(sinal)
+            self.assertEqual(bits.dtype, np.uint8)
+            np.testing.assert_array_equal(bits, self.LOTE)
+
+    def test_funcoes_por_simbolo_continuam_retornando_int(self):
+        simbolo = port.PSK_modulation(1, 2, [0])
+        self.assertEqual(port.PSK_demodulation(1, 2, simbolo), 0)
+        self.assertEqual(port.ASK_demodulation(1, port.ASK_modulation(1, 2, [1])), 1)
+        self.assertEqual(port.FSK_demodulation(1, 2, 5, port.FSK_modulation(1, 2, 5, [1])), 1)
+
+
+class TestConstelacoes(unittest.TestCase):
+
+    def setUp(self):
+        self.BITS = np.random.default_rng(9).integers(0, 2, 64)
+
+    def test_tabelas_seguem_o_mapa_de_gray(self):
+        for (I, Q), bits in port.gray_map.items():
+            indice = int(''.join(map(str, bits)), 2)
+            np.testing.assert_array_equal(port.QAM16_IQ[indice], [I, Q])
+
+    def test_qam16_ida_e_volta_sem_impressao(self):
+        sinal = port.QAM16_modulation(2, self.BITS)
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            bits = port.QAM16_demodulation(sinal, 2)
+        self.assertEqual(saida.getvalue(), "")
+        np.testing.assert_array_equal(bits, self.BITS)
+
+    def test_qpsk_completa_bit_impar(self):
+        sinal = port.QPSK_modulation(1, 2, self.BITS[:7])
+        self.assertEqual(sinal.size, 4 * 100)
+        np.testing.assert_array_equal(port.QPSK_demodulation(sinal, 2), list(self.BITS[:7]) + [0])
+
+
+class TestMotorMQAMMPSK(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(13).integers(0, 2, (2, 96))
+
+    def test_16qam_generica_igual_a_tabela_fixa(self):
+        bits = self.LOTE[0]
+        np.testing.assert_array_equal(port.MQAM_modulation(3, bits, 16), port.QAM16_modulation(3, bits))
+
+    def test_ida_e_volta(self):
+        for M in (8, 64, 256):
+            sinal = port.MQAM_modulation(2, self.LOTE, M)
+            np.testing.assert_array_equal(port.MQAM_demodulation(sinal, 2, M), self.LOTE)
+        sinal = port.MPSK_modulation(1, 2, self.LOTE, 8)
+        np.testing.assert_array_equal(port.MPSK_demodulation(sinal, 2, 8), self.LOTE)
+
+    def test_vizinhos_diferem_em_um_bit(self):
+        for M in (8, 64):
+            pontos = port.QAM_constellation(M)
+            for i, p in enumerate(pontos):
+                vizinhos = np.flatnonzero(np.isclose(np.abs(pontos - p), 2))
+                for j in vizinhos:
+                    self.assertEqual(bin(i ^ j).count('1'), 1)
+
+    def test_m_invalido(self):
+        with self.assertRaises(ValueError):
+            port.MQAM_modulation(1, [0, 1, 1], 12)
+
+class TestAmostrasPorSimbolo(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(11).integers(0, 2, (3, 48))
+
+    def test_todas_as_modulacoes_com_poucas_amostras(self):
+        N = 8
+        casos = [
+            (dig.NRZ_polar_modulation(1, self.LOTE, N), lambda s: dig.NRZ_polar_demodulation(s, N)),
+            (dig.manchester_modulation(1, self.LOTE, N), lambda s: dig.manchester_demodulation_correlator(s, N)),
+            (dig.bipolar_modulation(1, self.LOTE, N), lambda s: dig.bipolar_demodulation(1, s, N)),
+            (port.ASK_modulation(1, 2, self.LOTE, N), lambda s: port.ASK_demodulation_stream(1, s, N)),
+            (port.FSK_modulation(1, 1, 3, self.LOTE, N), lambda s: port.FSK_demodulation_stream(1, 1, 3, s, N)),
+            (port.PSK_modulation(1, 2, self.LOTE, N), lambda s: port.PSK_demodulation_stream(1, 2, s, N)),
+            (port.QAM16_modulation(2, self.LOTE, N), lambda s: port.QAM16_demodulation(s, 2, N)),
+        ]
+        for sinal, demod in casos:
+            self.assertEqual(sinal.shape[-1] % N, 0)
+            np.testing.assert_array_equal(demod(sinal), self.LOTE)
+        simbolo = port.FSK_modulation(1, 1, 3, [1], N)
+        self.assertEqual(port.FSK_demodulation(1, 1, 3, simbolo, N), 1)
+
+    def test_uma_amostra_por_simbolo_sem_expansao(self):
+        sinal = dig.NRZ_polar_modulation(2, self.LOTE, 1)
+        np.testing.assert_array_equal(sinal, np.where(self.LOTE == 1, 2.0, -2.0))
+        np.testing.assert_array_equal(dig.NRZ_polar_demodulation(sinal, 1), self.LOTE)
+        np.testing.assert_array_equal(dig.bipolar_demodulation(1, dig.bipolar_modulation(1, self.LOTE, 1), 1), self.LOTE)
+
+    def test_portadora_acima_de_nyquist(self):
+        port.check_nyquist(3.9, 8)
+        for f, N in ((4, 8), (2, 4), (1, 1), (-1, 100), (0, 8), (0, 1)):
+            with self.assertRaises(ValueError):
+                port.check_nyquist(f, N)
+        with self.assertRaises(ValueError):
+            port.PSK_modulation(1, 5, self.LOTE, 8)
+        with self.assertRaises(ValueError):
+            port.QPSK_demodulation(np.zeros(16), 4, 8)
+
+
+class TestBandaBase(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(13).integers(0, 2, (3, 48))
+
+    def test_ida_e_volta_uma_amostra_complexa_por_simbolo(self):
+        casos = [
+            (port.ASK_baseband_modulation(1, self.LOTE), lambda z: port.ASK_baseband_demodulation(1, z), 1),
+            (port.FSK_baseband_modulation(1, self.LOTE), port.FSK_baseband_demodulation, 1),
+            (port.PSK_baseband_modulation(1, self.LOTE), port.PSK_baseband_demodulation, 1),
+            (port.QPSK_baseband_modulation(1, self.LOTE), port.QPSK_baseband_demodulation, 2),
+            (port.MQAM_baseband_modulation(self.LOTE, 16), lambda z: port.MQAM_baseband_demodulation(z, 16), 4),
+            (port.MPSK_baseband_modulation(1, self.LOTE, 8), lambda z: port.MPSK_baseband_demodulation(z, 8), 3),
+        ]
+        for simbolos, demod, k in casos:
+            self.assertEqual(simbolos.dtype, np.complex128)
+            self.assertEqual(simbolos.shape, (3, 48 // k))
+            np.testing.assert_array_equal(demod(simbolos), self.LOTE)
+
+    def test_simbolos_sao_a_saida_do_correlator(self):
+        N = 8
+        np.testing.assert_allclose(port._estimar_simbolos(port.MQAM_modulation(2, self.LOTE, 16, N), 2, N),
+                                   port.MQAM_baseband_modulation(self.LOTE, 16), atol=1e-12)
+        np.testing.assert_allclose(port._estimar_simbolos(port.MPSK_modulation(1, 2, self.LOTE, 8, N), 2, N),
+                                   port.MPSK_baseband_modulation(1, self.LOTE, 8), atol=1e-12)
+        # QPSK transmite I*cos - Q*sin
+        np.testing.assert_allclose(port._estimar_simbolos(port.QPSK_modulation(1, 2, self.LOTE, N), 2, N).conj(),
+                                   port.QPSK_baseband_modulation(1, self.LOTE), atol=1e-12)
+
+    def test_mesmas_decisoes_com_ruido(self):
+        N = 8
+        sinal = canal.awgn(port.MQAM_modulation(2, self.LOTE, 16, N), ebn0_db=2, samples_per_symbol=N,
+                           bits_per_symbol=4, rng=3)
+        z = port._estimar_simbolos(sinal, 2, N)
+        np.testing.assert_array_equal(port.MQAM_baseband_demodulation(z, 16), port.MQAM_demodulation(sinal, 2, 16, N))
+        sinal = canal.awgn(port.QPSK_modulation(1, 2, self.LOTE, N), ebn0_db=0, samples_per_symbol=N,
+                           bits_per_symbol=2, rng=4)
+        z = port._estimar_simbolos(sinal, 2, N).conj()
+        np.testing.assert_array_equal(port.QPSK_baseband_demodulation(z), port.QPSK_demodulation(sinal, 2, N))
+
+    def test_ber_qpsk_segue_a_teoria(self):
+        lote = np.random.default_rng(19).integers(0, 2, (200, 1000))
+        simbolos = port.QPSK_baseband_modulation(1.0, lote)
+        ruidosos = canal.awgn(simbolos, ebn0_db=4, samples_per_symbol=1, bits_per_symbol=2, rng=5)
+        ber = np.mean(port.QPSK_baseband_demodulation(ruidosos) != lote)
+        self.assertAlmostEqual(ber, 0.0125, delta=0.002)  # Q(sqrt(2 Eb/N0)), como a BPSK
+
+
+class TestAreaDeTrabalho(unittest.TestCase):
+    """out= e workspace=: mesmos resultados, sem realocar os arrays do quadro a cada chamada."""
+
+    ESQUEMAS = {
+        "NRZ": (lambda b, **k: dig.NRZ_polar_modulation(1.0, b, 8, **k),
+                lambda s, **k: dig.NRZ_polar_demodulation(s, 8, **k)),
+        "manchester": (lambda b, **k: dig.manchester_modulation(1.0, b, 8, **k),
+                       lambda s, **k: dig.manchester_demodulation_correlator(s, 8, **k)),
+        "bipolar": (lambda b, **k: dig.bipolar_modulation(1.0, b, 8, **k),
+                    lambda s, **k: dig.bipolar_demodulation(1.0, s, 8, **k)),
+        "ASK": (lambda b, **k: port.ASK_modulation(1.0, 2, b, 16, **k),
+                lambda s, **k: port.ASK_demodulation_stream(1.0, s, 16, **k)),
+        "FSK": (lambda b, **k: port.FSK_modulation(1.0, 2, 4, b, 16, **k),
+                lambda s, **k: port.FSK_demodulation_stream(1.0, 2, 4, s, 16, **k)),
+        "PSK": (lambda b, **k: port.PSK_modulation(1.0, 2, b, 16, **k),
+                lambda s, **k: port.PSK_demodulation_stream(1.0, 2, s, 16, **k)),
+        "QPSK": (lambda b, **k: port.QPSK_modulation(1.0, 2, b, 16, **k),
+                 lambda s, **k: port.QPSK_demodulation(s, 2, 16, **k)),
+        "16QAM": (lambda b, **k: port.QAM16_modulation(2, b, 16, **k),
+                  lambda s, **k: port.QAM16_demodulation(s, 2, 16, **k)),
+        "8PSK": (lambda b, **k: port.MPSK_modulation(1.0, 2, b, 8, 16, **k),
+                 lambda s, **k: port.MPSK_demodulation(s, 2, 8, 16, **k)),
+        "64QAM": (lambda b, **k: port.MQAM_modulation(2, b, 64, 16, **k),
+                  lambda s, **k: port.MQAM_demodulation(s, 2, 64, 16, **k)),
+        "QPSK banda base": (lambda b, **k: port.QPSK_baseband_modulation(1.0, b, **k),
+                            lambda z, **k: port.QPSK_baseband_demodulation(z, **k)),
+        "8QAM banda base": (lambda b, **k: port.MQAM_baseband_modulation(b, 8, **k),
+                            lambda z, **k: port.MQAM_baseband_demodulation(z, 8, **k)),
+    }
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(23).integers(0, 2, (4, 240), dtype=np.uint8)
+
+    def test_mesmos_resultados_com_out_e_workspace(self):
+        ws = Workspace()
+        for nome, (modular, demodular) in self.ESQUEMAS.items():
+            with self.subTest(nome):
+                esperado = modular(self.LOTE)
+                ruidoso = canal.awgn(esperado, ebn0_db=3, samples_per_symbol=1, rng=7)
+                decidido = demodular(ruidoso)
+
+                sinal = np.empty_like(esperado)
+                bits = np.empty_like(decidido)
+                for _ in range(2):  # a segunda volta reaproveita os rascunhos do workspace
+                    self.assertIs(modular(self.LOTE, out=sinal, workspace=ws), sinal)
+                    np.testing.assert_array_equal(sinal, esperado)
+                    canal.awgn(sinal, ebn0_db=3, samples_per_symbol=1, rng=7, out=sinal, workspace=ws)
+                    np.testing.assert_array_equal(sinal, ruidoso)
+                    self.assertIs(demodular(sinal, out=bits, workspace=ws), bits)
+                    np.testing.assert_array_equal(bits, decidido)
+
+    def test_laco_permanente_sem_alocar_o_quadro(self):
+        # Sinais de 2-6 MB; sobram só alocações de tamanho fixo (ex.: o buffer interno dos
+        # ufuncs do numpy, 8192 elementos por operando)
+        lote = np.random.default_rng(29).integers(0, 2, (4, 24576), dtype=np.uint8)
+        rng = np.random.default_rng(31)
+        for nome in ("NRZ", "QPSK", "64QAM"):
+            with self.subTest(nome):
+                modular, demodular = self.ESQUEMAS[nome]
+                ws, sinal, bits = Workspace(), None, None
+                for volta in range(3):
+                    if volta == 2:
+                        tracemalloc.start()
+                    sinal = modular(lote, out=sinal, workspace=ws)
+                    canal.awgn(sinal, ebn0_db=6, samples_per_symbol=16, rng=rng, out=sinal, workspace=ws)
+                    bits = demodular(sinal, out=bits, workspace=ws)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.assertLess(pico, 256 * 1024)
+                self.assertGreaterEqual(sinal.nbytes, 2 * 1024 * 1024)
+
+    def test_out_invalido(self):
+        sinal = dig.NRZ_polar_modulation(1.0, self.LOTE, 8)
+        for out in (np.empty((4, 100)), np.empty((4, 2 * sinal.shape[1]))[:, ::2]):
+            with self.assertRaises(ValueError):
+                dig.NRZ_polar_modulation(1.0, self.LOTE, 8, out=out)
+        with self.assertRaises(ValueError):
+            port.QPSK_demodulation(sinal, 2, 16, out=np.empty(3, dtype=np.uint8))
+
+    def test_workspace_reaproveita_buffers(self):
+        ws = Workspace()
+        a = ws.array("x", (10, 10))
+        b = ws.array("x", (5, 4))
+        self.assertTrue(np.shares_memory(a, b))
+        self.assertEqual(b.shape, (5, 4))
+        self.assertFalse(np.shares_memory(a, ws.array("x", (10,), np.int32)))
+        self.assertEqual(ws.nbytes, 100 * 8 + 10 * 4)
+        ws.clear()
+        self.assertEqual(ws.nbytes, 0)
+
+
+class TestCanal(unittest.TestCase):
+
+    def setUp(self):
+        self.LOTE = np.random.default_rng(17).integers(0, 2, (100, 400))
+
+    def test_ber_nrz_segue_a_teoria(self):
+        sinal = dig.NRZ_polar_modulation(1.0, self.LOTE)
+        ruidoso = canal.awgn(sinal, ebn0_db=4, rng=1)
+        ber = np.mean(dig.NRZ_polar_demodulation(ruidoso) != self.LOTE)
+        self.assertAlmostEqual(ber, 0.0125, delta=0.003)  # Q(sqrt(2 Eb/N0))
+
+    def test_semente_float32_e_in_place(self):
+        sinal = dig.NRZ_polar_modulation(1.0, self.LOTE[:2]).astype(np.float32)
+        copia = canal.awgn(sinal, snr_db=5, rng=3)
+        saida = canal.awgn(sinal, snr_db=5, rng=3, out=sinal)
+        self.assertIs(saida, sinal)
+        self.assertEqual(saida.dtype, np.float32)
+        np.testing.assert_array_equal(saida, copia)
+
+    def test_out_invalido(self):
+        sinal = dig.NRZ_polar_modulation(1.0, self.LOTE[:2])
+        complexo = port.QPSK_baseband_modulation(1, self.LOTE[:2])
+        for entrada, out in ((sinal, np.zeros((2, 2 * sinal.shape[1]))[:, ::2]),  # nao contiguo
+                             (sinal, np.zeros(sinal.shape[1])),                     # formato errado
+                             (sinal, np.zeros(sinal.shape, np.int64)),              # inteiro
+                             (complexo, np.zeros(complexo.shape)),                  # real para sinal complexo
+                             (sinal, sinal.tolist())):                              # nao e ndarray
+            with self.assertRaises(ValueError):
+                canal.awgn(entrada, snr_db=5, rng=3, out=out)
+        bits = self.LOTE[:2].astype(np.uint8)
+        for out in (np.zeros((2, 2 * bits.shape[1]), np.uint8)[:, ::2], np.zeros(bits.shape[1], np.uint8),
+                    np.zeros(bits.shape, bool)):
+            with self.assertRaises(ValueError):
+                canal.bsc(bits, 0.1, rng=6, out=out)
+        out = np.zeros(bits.shape, np.uint8)
+        self.assertIs(canal.bsc(bits, 0.1, rng=6, out=out), out)
+        np.testing.assert_array_equal(out, canal.bsc(bits, 0.1, rng=6))
+
+    def test_snr_por_quadro(self):
+        sinal = np.ones((2, 20000))
+        ruido = canal.awgn(sinal, snr_db=np.array([[0], [10]]), rng=4) - sinal
+        np.testing.assert_allclose(ruido.var(axis=-1), [1.0, 0.1], rtol=0.05)
+
+    def test_bsc_empacotado_nao_altera_o_preenchimento(self):
+        bits = self.LOTE.astype(np.uint8)
+        empacotado = np.packbits(bits, axis=-1)
+        for p in (0.001, 0.25):
+            saida = canal.bsc_packed(empacotado, p, n_bits=397, rng=5)
+            erros = np.unpackbits(saida ^ empacotado, axis=-1)
+            self.assertEqual(erros[:, 397:].sum(), 0)
+            self.assertAlmostEqual(erros[:, :397].mean(), p, delta=max(p * 0.2, 0.0005))
+        self.assertAlmostEqual(np.mean(canal.bsc(bits, 0.1, rng=6) != bits), 0.1, delta=0.01)
+
+    def test_bsc_empacotado_out_e_p(self):
+        empacotado = np.zeros((400, 8), np.uint8)
+        for p in (0.01, 0.3):
+            out = np.zeros((400, 8), np.uint8)
+            self.assertIs(canal.bsc_packed(empacotado, p, rng=7, out=out), out)
+            np.testing.assert_array_equal(out, canal.bsc_packed(empacotado, p, rng=7))
+            self.assertGreater(np.unpackbits(out).sum(), 0)
+            with self.assertRaises(ValueError):  # out nao contiguo: as inversoes se perderiam
+                canal.bsc_packed(empacotado, p, rng=7, out=np.zeros((800, 8), np.uint8)[::2])
+        with self.assertRaises(ValueError):
+            canal.bsc_packed(empacotado, np.full((400, 1), 0.1), rng=7)
+
+
+if __name__ == '__main__':
+    unittest.main()
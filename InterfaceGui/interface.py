@@ -2,13 +2,34 @@ import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk, GLib, Gdk
 
-from threading import Thread
+import os
+import sys
+import time
+from threading import Event, Thread
 import numpy as np
 import matplotlib
 matplotlib.use('GTK4Agg')
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_gtk4agg import FigureCanvasGTK4Agg as FigureCanvas
 
+# Simulador/ (e, através de cadeia, as pastas das camadas) no caminho de importação
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Simulador"))
+from cadeia import MODULACOES
+from pipeline import ConfiguracaoPipeline, Pipeline
+from osciloscopio import BufferCircular
+from renderizador import EnvelopeIncremental, PlotDecimado
+
+# Bytes de dados por quadro e intervalo mínimo entre atualizações da barra de progresso
+TAMANHO_QUADRO = 32
+INTERVALO_PROGRESSO = 0.05
+# Osciloscópio: amostras visíveis (janela deslizante) e taxa máxima de redesenho
+JANELA_OSCILOSCOPIO = 20_000
+QUADROS_POR_SEGUNDO = 30
+# Gráfico final (sem osciloscópio): cada sinal inteiro é reduzido ao envelope mínimo/máximo de no
+# máximo BLOCOS_GRAFICO blocos (amostra a amostra até ~500 mil = 5 mil bits com 100 amostras por
+# símbolo; depois, blocos de 2, 4, ... amostras), então a memória não cresce com a mensagem
+BLOCOS_GRAFICO = 1 << 19
+
 
 class NetworkApp(Gtk.Application):
     def __init__(self):
@@ -144,14 +165,30 @@ class NetworkGUI(Gtk.ApplicationWindow):
         box_buttons = Gtk.Box(spacing=10, halign=Gtk.Align.END, margin_top=10)
         box_controls.append(box_buttons)
 
+        self.check_osciloscopio = Gtk.CheckButton(label="Osciloscópio ao vivo")
+        box_buttons.append(self.check_osciloscopio)
+
         self.button_simular = Gtk.Button(label="Simular Transmissão")
         self.button_simular.connect("clicked", self.on_button_clicked)
         box_buttons.append(self.button_simular)
 
+        self.button_cancelar = Gtk.Button(label="Cancelar", sensitive=False)
+        self.button_cancelar.connect("clicked", self.on_cancel_clicked)
+        box_buttons.append(self.button_cancelar)
+
         self.button_toggle = Gtk.Button(label="Mostrar Mensagem")
         self.button_toggle.connect("clicked", self.on_toggle_view)
         box_buttons.append(self.button_toggle)
 
+        # --- Progresso ---
+        self.progress = Gtk.ProgressBar(show_text=True, text="Pronto")
+        box_controls.append(self.progress)
+
+        # Estado da simulação em andamento (acessado só pela thread principal)
+        self.execucao = 0
+        self.cancelar = None
+        self.connect("close-request", self.on_close_request)
+
         # === VIEW FRAME ===
         frame_view = Gtk.Frame()
         main_box.append(frame_view)
@@ -164,9 +201,19 @@ class NetworkGUI(Gtk.ApplicationWindow):
         box_view.append(label_results)
 
         # --- Graph ---
+        # Eixos criados uma vez; as curvas são trocadas pelos PlotDecimado (envelope min/max)
         self.figure = Figure(figsize=(8, 4), dpi=100)
         self.canvas = FigureCanvas(self.figure)
         box_view.append(self.canvas)
+        self.ax_banda = self.figure.add_subplot(211)
+        self.ax_sinal = self.figure.add_subplot(212)
+        for ax, titulo in ((self.ax_banda, "Modulação Digital"), (self.ax_sinal, "Sinal transmitido e recebido")):
+            ax.set_title(titulo, color="white")
+            ax.grid(True, linestyle='--', alpha=0.4)
+            ax.tick_params(colors="lightgray")
+        self.figure.tight_layout()
+        self.plot_banda = PlotDecimado(self.ax_banda)
+        self.plot_sinal = PlotDecimado(self.ax_sinal)
 
         # --- Text view ---
         self.textview = Gtk.TextView(editable=False, wrap_mode=Gtk.WrapMode.WORD_CHAR)
@@ -195,60 +242,176 @@ class NetworkGUI(Gtk.ApplicationWindow):
 
     def on_button_clicked(self, button):
         msg = self.entry.get_text()
-        mod_digital = self.dropdowns[3].get_selected_item().get_string()
-        mod_portadora = self.dropdowns[4].get_selected_item().get_string()
-
-        # --- Gerar sinais simulados ---
-        t = np.linspace(0, 1, 300)
-        if mod_digital == "NRZ":
-            banda = np.sign(np.sin(2 * np.pi * 5 * t))
-        elif mod_digital == "bipolar":
-            banda = np.sin(2 * np.pi * 5 * t)
-        elif mod_digital == "manchester":
-            banda = np.sign(np.sin(2 * np.pi * 10 * t))
-        else:
-            banda = np.random.randn(len(t)) * 0.2
-
-        if mod_portadora == "ASK":
-            portadora = banda * np.cos(2 * np.pi * 20 * t)
-        elif mod_portadora == "FSK":
-            portadora = np.sin(2 * np.pi * (10 + 5 * banda) * t)
+        if not msg:
+            self.exibir_resposta("Digite uma mensagem para simular.")
+            return
+
+        enquadramento, correcao, deteccao, mod_digital, mod_portadora = (
+            dd.get_selected_item().get_string() for dd in self.dropdowns)
+        # A transmissão usa a portadora, se escolhida; senão, a modulação digital
+        config = ConfiguracaoPipeline(
+            enquadramento=enquadramento, deteccao=deteccao, correcao=correcao,
+            modulacao=mod_portadora if mod_portadora != "nenhuma" else mod_digital,
+            taxa_erro_bits=self.noise_spin.get_value(),
+            tamanho_quadro=TAMANHO_QUADRO, guardar_sinais=True)
+
+        # Osciloscópio: a thread escreve nos buffers circulares e um timer redesenha a janela atual
+        osciloscopio = None
+        if self.check_osciloscopio.get_active():
+            osciloscopio = (BufferCircular(JANELA_OSCILOSCOPIO), BufferCircular(JANELA_OSCILOSCOPIO, canais=2))
+            self.limites_osciloscopio = [None, None]
+
+        # Cada execução tem um número: respostas atrasadas de uma execução anterior são ignoradas
+        self.execucao += 1
+        self.cancelar = Event()
+        self.button_simular.set_sensitive(False)
+        self.button_cancelar.set_sensitive(True)
+        self.progress.set_fraction(0.0)
+        self.progress.set_text("Simulando...")
+
+        Thread(target=self._executar_simulacao, daemon=True,
+               args=(self.execucao, config, msg.encode("utf-8"), mod_digital, self.cancelar, osciloscopio)).start()
+        if osciloscopio is not None:
+            GLib.timeout_add(1000 // QUADROS_POR_SEGUNDO, self._atualizar_osciloscopio, self.execucao, osciloscopio)
+
+    def on_cancel_clicked(self, button):
+        if self.cancelar is not None:
+            self.cancelar.set()
+            self.button_cancelar.set_sensitive(False)
+            self.progress.set_text("Cancelando...")
+
+    def on_close_request(self, window):
+        if self.cancelar is not None:
+            self.cancelar.set()
+        return False
+
+    # --- Thread de simulação ---
+    # Roda fora do loop principal: não toca em widgets, só agenda callbacks com GLib.idle_add.
+    # Os sinais não são acumulados (memória constante): vão para os buffers circulares do
+    # osciloscópio, com a janela visível, ou, sem ele, para os envelopes do gráfico final.
+    def _executar_simulacao(self, execucao, config, dados, mod_digital, cancelar, osciloscopio=None):
+        total = -(-len(dados) // config.tamanho_quadro)
+        resumo = {"quadros": 0, "corretos": 0, "rejeitados": 0, "perdidos": 0, "corrigidos": 0,
+                  "bits": 0, "erros_bit": 0, "invertidos_canal": 0}
+        recebidos = []
+        grafico = None
+        if osciloscopio is None:
+            grafico = [EnvelopeIncremental(BLOCOS_GRAFICO) for _ in range(3)]  # banda base, TX, RX
+        ultima_atualizacao = 0.0
+
+        try:
+            for resultado in Pipeline(config).executar(dados):
+                if cancelar.is_set():
+                    GLib.idle_add(self._finalizar_simulacao, execucao, None, None, None, "Simulação cancelada.")
+                    return
+
+                resumo["quadros"] += 1
+                resumo["corretos"] += resultado.correto
+                resumo["rejeitados"] += resultado.valido is False
+                resumo["perdidos"] += resultado.perdido
+                resumo["corrigidos"] += int(np.count_nonzero(resultado.posicoes_corrigidas))
+                resumo["bits"] += len(resultado.dados_enviados)
+                resumo["erros_bit"] += resultado.erros_bit
+                resumo["invertidos_canal"] += resultado.bits_invertidos_no_canal
+                if resultado.dados_recebidos is not None:
+                    recebidos.append(resultado.dados_recebidos.para_bytes())
+
+                sinal_banda = MODULACOES[mod_digital].modular(resultado.quadro_transmitido.bits())
+                if osciloscopio is not None:
+                    osciloscopio[0].escrever(sinal_banda)
+                    osciloscopio[1].escrever(resultado.sinal_transmitido, resultado.sinal_recebido)
+                else:
+                    grafico[0].acrescentar(sinal_banda)
+                    if resultado.sinal_transmitido is not None:
+                        grafico[1].acrescentar(resultado.sinal_transmitido)
+                        grafico[2].acrescentar(resultado.sinal_recebido)
+
+                agora = time.monotonic()
+                if agora - ultima_atualizacao >= INTERVALO_PROGRESSO:
+                    ultima_atualizacao = agora
+                    GLib.idle_add(self._atualizar_progresso, execucao, resumo["quadros"], total)
+        except Exception as erro:
+            GLib.idle_add(self._finalizar_simulacao, execucao, None, None, None, f"Erro na simulação: {erro}")
+            return
+
+        # Os envelopes dos sinais guardados são preparados aqui, fora da thread principal
+        sinais = None
+        if osciloscopio is None:
+            sinais = [envelope.piramide() if envelope.tamanho else None for envelope in grafico]
+        texto_recebido = b"".join(recebidos).decode("utf-8", errors="replace")
+        GLib.idle_add(self._finalizar_simulacao, execucao, resumo, sinais, texto_recebido, None, osciloscopio)
+
+    # --- Callbacks na thread principal (retornam False para rodar uma vez só) ---
+    def _atualizar_progresso(self, execucao, feitos, total):
+        if execucao == self.execucao:
+            self.progress.set_fraction(feitos / total)
+            self.progress.set_text(f"Quadro {feitos} de {total}")
+        return False
+
+    def _atualizar_osciloscopio(self, execucao, osciloscopio):
+        """Tick do timer: redesenha a janela mais recente enquanto a execução estiver ativa."""
+        if execucao != self.execucao or self.cancelar is None:
+            return False
+        self._desenhar_osciloscopio(osciloscopio)
+        return True
+
+    def _desenhar_osciloscopio(self, osciloscopio):
+        (_, banda), (_, sinais) = (buffer.ler() for buffer in osciloscopio)
+        # Limites fixos (o eixo y só cresce): os ticks seguintes redesenham só as linhas
+        limites_x = (0, JANELA_OSCILOSCOPIO - 1)
+        for i, dados in enumerate((banda, sinais)):
+            if dados.size:
+                minimo, maximo = float(dados.min()), float(dados.max())
+                margem = 0.05 * (maximo - minimo or 1.0)
+                atual = self.limites_osciloscopio[i]
+                if atual is None:
+                    self.limites_osciloscopio[i] = (minimo - margem, maximo + margem)
+                elif minimo < atual[0] or maximo > atual[1]:
+                    self.limites_osciloscopio[i] = (min(minimo - margem, atual[0]), max(maximo + margem, atual[1]))
+        self.plot_banda.definir_sinais(list(banda), [dict(color='#2d8bff')],
+                                       limites_x, self.limites_osciloscopio[0])
+        self.plot_sinal.definir_sinais(list(sinais), [dict(color='#ff6666', label="TX"),
+                                                      dict(color='#66ff99', alpha=0.6, label="RX")],
+                                       limites_x, self.limites_osciloscopio[1])
+        if self.ax_sinal.get_legend() is None:
+            self.ax_sinal.legend(loc="upper right")
+
+    def _finalizar_simulacao(self, execucao, resumo, sinais, texto_recebido, aviso, osciloscopio=None):
+        if execucao != self.execucao:
+            return False
+        self.cancelar = None
+        self.button_simular.set_sensitive(True)
+        self.button_cancelar.set_sensitive(False)
+
+        if resumo is None:
+            self.progress.set_text(aviso)
+            self.exibir_resposta(aviso)
+            return False
+
+        self.progress.set_fraction(1.0)
+        self.progress.set_text("Concluído")
+        if osciloscopio is not None:
+            self._desenhar_osciloscopio(osciloscopio)
         else:
-            portadora = None
-
-        # --- Plot ---
-        self.figure.clf()
-        ax1 = self.figure.add_subplot(211)
-        ax1.plot(t, banda, color='#2d8bff')
-        ax1.set_title(f"Modulação Digital - {mod_digital}", color="white")
-        ax1.grid(True, linestyle='--', alpha=0.4)
-        ax1.tick_params(colors="lightgray")
-
-        if portadora is not None:
-            ax2 = self.figure.add_subplot(212)
-            ax2.plot(t, portadora, color='#ff6666')
-            ax2.set_title(f"Modulação por Portadora - {mod_portadora}", color="white")
-            ax2.grid(True, linestyle='--', alpha=0.4)
-            ax2.tick_params(colors="lightgray")
-
-        self.figure.tight_layout()
-        self.canvas.draw()
-
-        # --- Texto de simulação ---
-        def tarefa():
-            texto = f"""
-Mensagem simulada: "{msg}"
-
-Parâmetros escolhidos:
-- Modulação Digital: {mod_digital}
-- Modulação Portadora: {mod_portadora}
-- Ruído: {self.noise_spin.get_value():.2f}
-
-(Resultados detalhados da transmissão aparecerão aqui futuramente)
+            self._plotar(*sinais)
+        ber = resumo["erros_bit"] / resumo["bits"] if resumo["bits"] else 0.0
+        texto = f"""
+Mensagem recebida: "{texto_recebido}"
+
+Quadros: {resumo["quadros"]} ({resumo["corretos"]} corretos, {resumo["rejeitados"]} rejeitados pela detecção, {resumo["perdidos"]} perdidos)
+Bits invertidos no canal: {resumo["invertidos_canal"]}
+Bits corrigidos pelo Hamming: {resumo["corrigidos"]}
+Erros de bit nos dados: {resumo["erros_bit"]} de {resumo["bits"]} (BER = {ber:.2e})
 """
-            GLib.idle_add(self.exibir_resposta, texto.strip())
-
-        Thread(target=tarefa, daemon=True).start()
+        self.exibir_resposta(texto.strip())
+        return False
+
+    def _plotar(self, banda, sinal_tx, sinal_rx):
+        self.plot_banda.definir_sinais([banda], [dict(color='#2d8bff')])
+        self.plot_sinal.definir_sinais([sinal_tx, sinal_rx],
+                                       [dict(color='#ff6666', label="TX"),
+                                        dict(color='#66ff99', alpha=0.6, label="RX")])
+        self.ax_sinal.legend(loc="upper right")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+"""
+Buffer circular do modo osciloscópio da interface.
+
+A thread de simulação escreve as amostras de cada quadro à medida que ele é transmitido e a
+thread principal lê periodicamente a janela mais recente para redesenhar. O buffer tem tamanho
+fixo: só as últimas 'capacidade' amostras são mantidas, então a memória usada não depende da
+duração da transmissão.
+"""
+
+from threading import Lock
+
+import numpy as np
+
+
+class BufferCircular:
+    """
+    Últimas 'capacidade' amostras de 'canais' sinais escritos juntos (ex.: TX e RX).
+    - escrever(*amostras): um array 1-D por canal, todos do mesmo tamanho.
+    - ler(): (total de amostras já escritas, cópia (canais, n) em ordem cronológica).
+    """
+
+    def __init__(self, capacidade: int, canais: int = 1, dtype=np.float32):
+        if capacidade <= 0:
+            raise ValueError("capacidade deve ser positiva.")
+        self.capacidade = capacidade
+        self.canais = canais
+        self.dados = np.zeros((canais, capacidade), dtype=dtype)
+        self.escritas = 0
+        self._trava = Lock()
+
+    def escrever(self, *amostras) -> None:
+        if len(amostras) != self.canais:
+            raise ValueError(f"Esperados {self.canais} canais, recebidos {len(amostras)}.")
+        amostras = [np.asarray(a).reshape(-1) for a in amostras]
+        n = amostras[0].size
+        if any(a.size != n for a in amostras):
+            raise ValueError("Todos os canais devem ter o mesmo número de amostras.")
+
+        # Só as últimas 'capacidade' amostras do bloco sobrevivem
+        guardadas = min(n, self.capacidade)
+        with self._trava:
+            inicio = (self.escritas + n - guardadas) % self.capacidade
+            primeira = min(guardadas, self.capacidade - inicio)
+            for canal, a in zip(self.dados, amostras):
+                a = a[n - guardadas:]
+                canal[inicio:inicio + primeira] = a[:primeira]
+                canal[:guardadas - primeira] = a[primeira:]
+            self.escritas += n
+
+    def ler(self):
+        with self._trava:
+            escritas = self.escritas
+            if escritas < self.capacidade:
+                return escritas, self.dados[:, :escritas].copy()
+            posicao = escritas % self.capacidade
+            return escritas, np.concatenate((self.dados[:, posicao:], self.dados[:, :posicao]), axis=1)
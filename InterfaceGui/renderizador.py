@@ -0,0 +1,223 @@
+"""
+Renderizador de sinais longos para os gráficos da interface.
+
+Um sinal de milhões de amostras é desenhado com no máximo 2 pontos por coluna de pixel:
+o mínimo e o máximo das amostras que caem naquela coluna (envelope), o que preserva a
+aparência do traçado completo. Os mínimos/máximos ficam pré-calculados em uma pirâmide
+(blocos de 2, 4, 8, ... amostras), então cada redesenho custa O(colunas), e não O(amostras),
+mesmo após zoom/pan. Sinais produzidos aos poucos podem ser reduzidos à medida que chegam
+(EnvelopeIncremental), sem guardar todas as amostras.
+
+Os Line2D são criados uma única vez por eixo e reaproveitados (set_data); com dados novos e
+os mesmos limites, o redesenho usa blitting sobre o fundo já renderizado do eixo.
+"""
+
+import numpy as np
+
+# Abaixo deste tamanho não vale a pena criar um novo nível da pirâmide
+_TAMANHO_MINIMO_NIVEL = 1024
+
+
+class PiramideMinMax:
+    """
+    Mínimos e máximos de um sinal 1-D em blocos de 2^k amostras (k = 0, 1, 2, ...).
+    Com de_blocos, a pirâmide parte de blocos já reduzidos (k >= passo): é a forma usada para
+    sinais longos demais para guardar inteiros (ver EnvelopeIncremental).
+    """
+
+    def __init__(self, y):
+        y = np.asarray(y, dtype=float).reshape(-1)
+        self._construir(y, y, 0, y.size)
+
+    @classmethod
+    def de_blocos(cls, minimos, maximos, passo: int, tamanho: int) -> "PiramideMinMax":
+        """Pirâmide de um sinal de 'tamanho' amostras dado por mínimos/máximos de blocos de 'passo' (2^k)."""
+        piramide = cls.__new__(cls)
+        # Mantém o dtype dos blocos (float32 no EnvelopeIncremental): só os extremos são desenhados
+        piramide._construir(np.asarray(minimos), np.asarray(maximos), int(passo).bit_length() - 1, tamanho)
+        return piramide
+
+    def _construir(self, minimos, maximos, base, tamanho):
+        # niveis[i] guarda blocos de 2^(base + i) amostras
+        self.tamanho = tamanho
+        self.base = base
+        self.niveis = [(minimos, maximos)]
+        while minimos.size > _TAMANHO_MINIMO_NIVEL:
+            par = minimos.size - minimos.size % 2
+            novos_min = np.minimum(minimos[0:par:2], minimos[1:par:2])
+            novos_max = np.maximum(maximos[0:par:2], maximos[1:par:2])
+            if par < minimos.size:  # bloco final incompleto
+                novos_min = np.append(novos_min, minimos[-1])
+                novos_max = np.append(novos_max, maximos[-1])
+            minimos, maximos = novos_min, novos_max
+            self.niveis.append((minimos, maximos))
+
+    def envelope(self, inicio: int, fim: int, colunas: int):
+        """
+        Reduz as amostras [inicio, fim) a 'colunas' pares (mínimo, máximo).
+        Retorna (x, y) prontos para Line2D.set_data: x em índices de amostra e y alternando
+        mínimo e máximo de cada coluna; com poucas amostras, devolve as próprias amostras
+        (ou, numa pirâmide de blocos, o mínimo e o máximo de cada bloco).
+        """
+        inicio, fim = max(0, int(inicio)), min(self.tamanho, int(np.ceil(fim)))
+        colunas = max(1, int(colunas))
+        if fim <= inicio:
+            return np.empty(0), np.empty(0)
+        if self.base == 0 and fim - inicio <= 2 * colunas:
+            y = self.niveis[0][0][inicio:fim]
+            return np.arange(inicio, fim, dtype=float), y
+
+        # Nível mais grosso com pelo menos 2 blocos por coluna (nunca abaixo dos blocos guardados)
+        amostras_por_coluna = max(1.0, (fim - inicio) / colunas)
+        nivel = min(len(self.niveis) - 1, max(0, int(np.log2(amostras_por_coluna)) - 1 - self.base))
+        deslocamento = nivel + self.base
+        minimos, maximos = self.niveis[nivel]
+        j0, j1 = inicio >> deslocamento, -(-fim >> deslocamento)
+
+        bordas = np.unique(np.linspace(j0, j1, colunas + 1).astype(np.int64)[:-1])
+        col_min = np.minimum.reduceat(minimos[j0:j1], bordas - j0)
+        col_max = np.maximum.reduceat(maximos[j0:j1], bordas - j0)
+
+        x = np.repeat(bordas.astype(float) * (1 << deslocamento), 2)
+        y = np.empty(2 * bordas.size)
+        y[0::2], y[1::2] = col_min, col_max
+        return x, y
+
+
+class EnvelopeIncremental:
+    """
+    Envelope mínimo/máximo de um sinal recebido em pedaços, com memória limitada.
+    Guarda até 'capacidade' blocos (de início, uma amostra por bloco); quando enche, junta os
+    blocos dois a dois e o bloco dobra de tamanho. Assim o sinal inteiro continua representado,
+    com resolução de 'passo' amostras, e piramide() devolve a PiramideMinMax com x em índices
+    de amostra do sinal completo.
+    """
+
+    def __init__(self, capacidade: int, dtype=np.float32):
+        self.capacidade = max(2, capacidade - capacidade % 2)  # par: os blocos são juntados aos pares
+        self.passo = 1
+        self.tamanho = 0
+        self._minimos = np.empty(self.capacidade, dtype=dtype)
+        self._maximos = np.empty(self.capacidade, dtype=dtype)
+        self._blocos = 0
+        self._resto = 0  # amostras no último bloco, se incompleto
+
+    def acrescentar(self, y):
+        y = np.asarray(y).reshape(-1)
+        self.tamanho += y.size
+        while y.size:
+            if self._resto:
+                # Completa o último bloco
+                k = min(self.passo - self._resto, y.size)
+                ultimo = self._blocos - 1
+                self._minimos[ultimo] = min(self._minimos[ultimo], y[:k].min())
+                self._maximos[ultimo] = max(self._maximos[ultimo], y[:k].max())
+                self._resto = (self._resto + k) % self.passo
+                y = y[k:]
+                continue
+            if self._blocos == self.capacidade:
+                self._juntar_pares()
+                continue
+            k = min(y.size, (self.capacidade - self._blocos) * self.passo)
+            completos = k // self.passo
+            blocos = y[:completos * self.passo].reshape(completos, self.passo)
+            fim = self._blocos + completos
+            np.min(blocos, axis=1, out=self._minimos[self._blocos:fim])
+            np.max(blocos, axis=1, out=self._maximos[self._blocos:fim])
+            self._blocos = fim
+            if k > completos * self.passo:
+                self._minimos[fim] = y[completos * self.passo:k].min()
+                self._maximos[fim] = y[completos * self.passo:k].max()
+                self._blocos += 1
+                self._resto = k - completos * self.passo
+            y = y[k:]
+
+    def _juntar_pares(self):
+        metade = self._blocos // 2
+        self._minimos[:metade] = np.minimum(self._minimos[0:self._blocos:2], self._minimos[1:self._blocos:2])
+        self._maximos[:metade] = np.maximum(self._maximos[0:self._blocos:2], self._maximos[1:self._blocos:2])
+        self._blocos = metade
+        self.passo *= 2
+
+    def piramide(self) -> PiramideMinMax:
+        if self.passo == 1:
+            return PiramideMinMax(self._minimos[:self._blocos])
+        return PiramideMinMax.de_blocos(self._minimos[:self._blocos], self._maximos[:self._blocos],
+                                        self.passo, self.tamanho)
+
+
+class PlotDecimado:
+    """
+    Curvas de um eixo do matplotlib desenhadas pelo envelope mínimo/máximo.
+    - definir_sinais(sinais, estilos): troca os dados (reaproveitando os Line2D).
+    - zoom/pan (xlim_changed) recalcula o envelope para o novo intervalo visível.
+    """
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.piramides = []
+        self.linhas = []
+        self._fundo = None
+        ax.callbacks.connect("xlim_changed", self._ao_mudar_limites)
+        self.canvas.mpl_connect("draw_event", self._ao_desenhar)
+
+    def _colunas(self) -> int:
+        return max(1, int(self.ax.bbox.width))
+
+    def definir_sinais(self, sinais, estilos=None, limites_x=None, limites_y=None):
+        """
+        sinais: lista de arrays 1-D ou de PiramideMinMax já construídas (por exemplo, fora da
+        thread principal); None é ignorado. estilos: kwargs de Line2D por sinal.
+        limites_x/limites_y: limites fixos dos eixos (padrão: ajustados aos sinais); mantidos
+        iguais entre chamadas, o redesenho é só o blitting das linhas.
+        """
+        sinais = [s for s in sinais if s is not None]
+        estilos = estilos or [{}] * len(sinais)
+        self.piramides = [s if isinstance(s, PiramideMinMax) else PiramideMinMax(s) for s in sinais]
+
+        # Reaproveita as linhas existentes; cria ou remove só a diferença
+        while len(self.linhas) < len(sinais):
+            (linha,) = self.ax.plot([], [], animated=True)
+            self.linhas.append(linha)
+        while len(self.linhas) > len(sinais):
+            self.linhas.pop().remove()
+        for linha, estilo in zip(self.linhas, estilos):
+            linha.set(**estilo)
+
+        tamanho = max((p.tamanho for p in self.piramides), default=1)
+        minimo = min((float(p.niveis[-1][0].min()) for p in self.piramides if p.tamanho), default=-1.0)
+        maximo = max((float(p.niveis[-1][1].max()) for p in self.piramides if p.tamanho), default=1.0)
+        margem = 0.05 * (maximo - minimo or 1.0)
+        limites_x = tuple(limites_x) if limites_x is not None else (0, max(tamanho - 1, 1))
+        limites_y = tuple(limites_y) if limites_y is not None else (minimo - margem, maximo + margem)
+
+        if self.ax.get_xlim() == limites_x and self.ax.get_ylim() == limites_y and self._fundo is not None:
+            self._atualizar_linhas()
+            self._blit()
+        else:
+            # Limites novos: o fundo (eixos, grade, rótulos) precisa ser redesenhado
+            self.ax.set_ylim(*limites_y)
+            self.ax.set_xlim(*limites_x)  # dispara _ao_mudar_limites
+            self.canvas.draw_idle()
+
+    def _atualizar_linhas(self):
+        inicio, fim = self.ax.get_xlim()
+        colunas = self._colunas()
+        for piramide, linha in zip(self.piramides, self.linhas):
+            linha.set_data(*piramide.envelope(np.floor(inicio), fim + 1, colunas))
+
+    def _ao_mudar_limites(self, ax):
+        self._atualizar_linhas()
+
+    def _ao_desenhar(self, evento):
+        # Após cada desenho completo, guarda o fundo do eixo e desenha as linhas (animadas) por cima
+        self._fundo = self.canvas.copy_from_bbox(self.ax.bbox)
+        for linha in self.linhas:
+            self.ax.draw_artist(linha)
+
+    def _blit(self):
+        self.canvas.restore_region(self._fundo)
+        for linha in self.linhas:
+            self.ax.draw_artist(linha)
+        self.canvas.blit(self.ax.bbox)
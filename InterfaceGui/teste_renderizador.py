@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Testes dos auxiliares de gráfico da interface: envelope mínimo/máximo e buffer circular do
+osciloscópio (só numpy, sem GTK).
+"""
+import unittest
+import numpy as np
+from osciloscopio import BufferCircular
+from renderizador import EnvelopeIncremental, PiramideMinMax
+
+
+class TestPiramideMinMax(unittest.TestCase):
+
+    def setUp(self):
+        self.y = np.random.default_rng(1).standard_normal(1_000_003)
+        self.piramide = PiramideMinMax(self.y)
+
+    def test_poucas_amostras_sao_devolvidas_sem_reducao(self):
+        x, y = self.piramide.envelope(10, 110, 800)
+        np.testing.assert_array_equal(x, np.arange(10, 110))
+        np.testing.assert_array_equal(y, self.y[10:110])
+
+    def test_envelope_preserva_extremos(self):
+        for inicio, fim in ((0, self.y.size), (12_345, 700_001)):
+            x, y = self.piramide.envelope(inicio, fim, 800)
+            self.assertLessEqual(len(y), 2 * 800)
+            self.assertEqual(y.min(), self.y[inicio:fim].min())
+            self.assertEqual(y.max(), self.y[inicio:fim].max())
+
+    def test_colunas_contem_as_amostras_do_intervalo(self):
+        x, y = self.piramide.envelope(0, self.y.size, 500)
+        bordas = np.append(x[0::2].astype(int), self.y.size)
+        for i in (0, 137, len(bordas) - 2):
+            trecho = self.y[bordas[i]:bordas[i + 1]]
+            self.assertEqual((y[2 * i], y[2 * i + 1]), (trecho.min(), trecho.max()))
+
+
+class TestEnvelopeIncremental(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.y = rng.standard_normal(1_000_003)
+        self.envelope = EnvelopeIncremental(4096)
+        inicio = 0
+        for tamanho in rng.integers(1, 50_000, 200):  # pedaços de tamanhos variados
+            self.envelope.acrescentar(self.y[inicio:inicio + tamanho])
+            inicio += tamanho
+        self.envelope.acrescentar(self.y[inicio:])
+
+    def test_memoria_limitada_e_sinal_inteiro(self):
+        self.assertEqual(self.envelope.tamanho, self.y.size)
+        self.assertEqual(self.envelope.passo, 256)  # 1M amostras em no máximo 4096 blocos
+        self.assertEqual(self.envelope._minimos.size, 4096)
+        piramide = self.envelope.piramide()
+        self.assertEqual(piramide.tamanho, self.y.size)
+        x, y = piramide.envelope(0, self.y.size, 800)
+        self.assertEqual(x[0], 0)  # do início ao fim do sinal, sem deslocamento no eixo x
+        self.assertGreaterEqual(x[-1], self.y.size - self.y.size / 800 - self.envelope.passo)
+        self.assertEqual(y.min(), self.y.min().astype(np.float32))
+        self.assertEqual(y.max(), self.y.max().astype(np.float32))
+
+    def test_blocos_contem_as_amostras(self):
+        passo, blocos = self.envelope.passo, self.envelope._blocos
+        self.assertEqual(blocos, -(-self.y.size // passo))
+        for i in (0, 1234, blocos - 1):
+            trecho = self.y[i * passo:(i + 1) * passo].astype(np.float32)
+            self.assertEqual((self.envelope._minimos[i], self.envelope._maximos[i]), (trecho.min(), trecho.max()))
+        # Zoom abaixo da resolução guardada: cada bloco vira um par (mínimo, máximo) na sua posição
+        x, y = self.envelope.piramide().envelope(300_000, 301_000, 800)
+        np.testing.assert_array_equal(x[0::2], np.arange(300_000 // passo, -(-301_000 // passo)) * passo)
+
+    def test_sinal_curto_fica_com_as_amostras(self):
+        envelope = EnvelopeIncremental(100)
+        envelope.acrescentar(np.arange(30))
+        envelope.acrescentar(np.arange(30, 60))
+        x, y = envelope.piramide().envelope(0, 60, 800)
+        np.testing.assert_array_equal(y, np.arange(60))
+
+
+class TestBufferCircular(unittest.TestCase):
+
+    def test_guarda_as_ultimas_amostras_em_ordem(self):
+        buffer = BufferCircular(10, canais=2)
+        sinal = np.arange(37, dtype=float)
+        for inicio in range(0, 37, 7):
+            bloco = sinal[inicio:inicio + 7]
+            buffer.escrever(bloco, -bloco)
+        escritas, dados = buffer.ler()
+        self.assertEqual(escritas, 37)
+        np.testing.assert_array_equal(dados, [sinal[-10:], -sinal[-10:]])
+        self.assertEqual(buffer.dados.shape, (2, 10))
+
+    def test_bloco_maior_que_a_capacidade(self):
+        buffer = BufferCircular(8)
+        buffer.escrever(np.arange(3))
+        buffer.escrever(np.arange(100, 125))
+        np.testing.assert_array_equal(buffer.ler()[1][0], np.arange(117, 125))
+
+    def test_antes_de_encher(self):
+        buffer = BufferCircular(8)
+        buffer.escrever(np.arange(5))
+        np.testing.assert_array_equal(buffer.ler()[1], [np.arange(5)])
+
+    def test_canais_com_tamanhos_diferentes(self):
+        with self.assertRaises(ValueError):
+            BufferCircular(8, canais=2).escrever(np.zeros(3), np.zeros(4))
+
+
+if __name__ == "__main__":
+    unittest.main()
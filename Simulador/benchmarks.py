@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: benchmarks.py
+
+Benchmarks de vazão das funções das camadas: todos os moduladores e demoduladores da
+CamadaFisica e as funções de enquadramento, detecção (EDC) e correção (ECC) da Camada de enlace.
+
+Cada caso é medido para cargas úteis de 64 B a 16 MB (x4 a cada passo), com:
+- tempo (melhor e mediana de várias repetições), bits/s e, na Camada Física, amostras/s;
+- pico de memória alocada pela função (tracemalloc, em uma execução separada);
+- expoente de escala: inclinação de log(tempo) x log(tamanho) (1 = linear).
+Um caso para de crescer quando o próximo tamanho passaria de tempo_max segundos ou, na
+Camada Física, de max_amostras amostras no sinal.
+
+Os resultados são gravados em JSON; comparar() aponta as regressões em relação a uma
+execução anterior.
+
+Uso:
+    python Simulador/benchmarks.py --saida atual.json --comparar base.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import numpy as np
+
+from cadeia import PARAMETROS_PADRAO, ParametrosFisica, criar_modulacoes, portadoras_padrao
+import enlace_receptor as rx
+import enlace_transmissor as tx
+import modulacao_demodulacao_portadora as port
+from buffer_bits import BufferBits
+from correcao_erros import CODIGOS_HAMMING
+
+log = logging.getLogger("simulador.benchmarks")
+log.addHandler(logging.NullHandler())
+
+# 64 B, 256 B, 1 KB, ..., 16 MB
+TAMANHOS = tuple(64 * 4**i for i in range(10))
+# Abaixo deste tempo a medida é dominada por custos fixos e não entra no expoente de escala
+_TEMPO_MINIMO_ESCALA = 1e-3
+
+
+@dataclass(frozen=True)
+class Caso:
+    """
+    Uma função medida.
+    - preparar(dados: bytes) -> argumento de executar (fora da medição).
+    - amostras(argumento, saida) -> amostras do sinal processado (Camada Física).
+    - amostras_por_byte: estimativa do tamanho do sinal, para respeitar max_amostras.
+    - limite_bytes: maior carga útil aceita pela função (ex.: Contagem de Caracteres).
+    """
+    nome: str
+    camada: str
+    preparar: Callable
+    executar: Callable
+    amostras: Callable | None = None
+    amostras_por_byte: float = 0.0
+    limite_bytes: int | None = None
+
+
+def _bits(dados: bytes) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(dados, dtype=np.uint8))
+
+
+def _buffer(dados: bytes) -> BufferBits:
+    return BufferBits.de_bytes(np.frombuffer(dados, dtype=np.uint8))
+
+
+def _amostras_saida(argumento, saida) -> int:
+    return np.asarray(saida).size
+
+
+def _amostras_entrada(argumento, saida) -> int:
+    return argumento.size
+
+
+# -------------------------------------------------------------------
+# Casos
+# -------------------------------------------------------------------
+
+def _casos_fisica(p: ParametrosFisica) -> list[Caso]:
+    if p.frequencia is None or p.frequencias_fsk is None:
+        portadoras_padrao(p.amostras_por_simbolo)  # N < 3 sem portadoras informadas: ValueError explicativo
+    A, f, (f1, f2), N = p.amplitude, p.frequencia, p.frequencias_fsk, p.amostras_por_simbolo
+    modulacoes = criar_modulacoes(p)
+    casos = []
+    for m in modulacoes.values():
+        por_byte = 8 * m.amostras_por_simbolo / m.bits_por_simbolo
+        casos.append(Caso(f"{m.nome}.modular", "fisica", _bits, m.modular, _amostras_saida, por_byte))
+        casos.append(Caso(f"{m.nome}.demodular", "fisica", lambda d, m=m: m.gerar_sinal(_bits(d)),
+                          m.demodular, _amostras_entrada, por_byte))
+
+    # Modo banda base (uma amostra complexa por símbolo)
+    if not p.banda_base:
+        for m in criar_modulacoes(replace(p, banda_base=True)).values():
+            if m.nome in ("NRZ", "manchester", "bipolar", "ASK"):
+                continue  # as mesmas funções de banda passante (a ASK com as mesmas amostras)
+            por_byte = 8 / m.bits_por_simbolo
+            casos.append(Caso(f"{m.nome}.banda_base.modular", "fisica", _bits, m.modular, _amostras_saida, por_byte))
+            casos.append(Caso(f"{m.nome}.banda_base.demodular", "fisica", lambda d, m=m: m.gerar_sinal(_bits(d)),
+                              m.demodular, _amostras_entrada, por_byte))
+
+    # Versões que não passam pelo registro do Simulador
+    modular_16qam = lambda d: port.QAM16_modulation(f, _bits(d), N)
+    casos.append(Caso("16QAM.QAM16_modulation", "fisica", _bits, lambda b: port.QAM16_modulation(f, b, N),
+                      _amostras_saida, 2 * N))
+    casos.append(Caso("16QAM.QAM16_demodulation", "fisica", modular_16qam,
+                      lambda s: port.QAM16_demodulation(s, f, N), _amostras_entrada, 2 * N))
+
+    # Demoduladores "online" (um símbolo por chamada), aplicados símbolo a símbolo
+    simbolos = lambda s: s.reshape(-1, N)
+    for nome, modular, demodular in (
+            ("ASK.ASK_demodulation", modulacoes["ASK"].modular,
+             lambda s: [port.ASK_demodulation(A, b) for b in simbolos(s)]),
+            ("FSK.FSK_demodulation", modulacoes["FSK"].modular,
+             lambda s: [port.FSK_demodulation(A, f1, f2, b, N) for b in simbolos(s)]),
+            ("PSK.PSK_demodulation", modulacoes["PSK"].modular,
+             lambda s: [port.PSK_demodulation(A, f, b) for b in simbolos(s)])):
+        casos.append(Caso(nome, "fisica", lambda d, modular=modular: np.asarray(modular(_bits(d)), dtype=float),
+                          demodular, _amostras_entrada, 8 * N))
+    return casos
+
+
+def _par_enlace(nome_tx, nome_rx, codificar, decodificar, entrada=_buffer, limite_bytes=None) -> list[Caso]:
+    """Caso do transmissor e caso do receptor (que recebe a saída do transmissor)."""
+    return [Caso(nome_tx, "enlace", entrada, codificar, limite_bytes=limite_bytes),
+            Caso(nome_rx, "enlace", lambda d: codificar(entrada(d)), decodificar, limite_bytes=limite_bytes)]
+
+
+def _casos_enlace() -> list[Caso]:
+    casos = [
+        *_par_enlace("enquadrar_contagem_caracteres", "desenquadrar_contagem_caracteres",
+                     tx.enquadrar_contagem_caracteres, rx.desenquadrar_contagem_caracteres, limite_bytes=255),
+        *_par_enlace("enquadrar_byte_stuffing", "desenquadrar_byte_stuffing",
+                     tx.enquadrar_byte_stuffing, rx.desenquadrar_byte_stuffing, entrada=bytes),
+        *_par_enlace("enquadrar_bit_stuffing", "desenquadrar_bit_stuffing",
+                     tx.enquadrar_bit_stuffing, rx.desenquadrar_bit_stuffing),
+        *_par_enlace("adicionar_paridade_par", "verificar_paridade_par",
+                     tx.adicionar_paridade_par, rx.verificar_paridade_par),
+        *_par_enlace("adicionar_checksum", "verificar_checksum", tx.adicionar_checksum, rx.verificar_checksum),
+        *_par_enlace("crc32", "verificar_crc32", lambda b: tx.crc32(b)[0], rx.verificar_crc32),
+        *_par_enlace("transmissor_hamming", "receptor_hamming", tx.transmissor_hamming, rx.receptor_hamming),
+    ]
+    for n in CODIGOS_HAMMING:
+        casos += _par_enlace(f"transmissor_hamming(n={n})", f"receptor_hamming(n={n})",
+                             lambda b, n=n: tx.transmissor_hamming(b, n), lambda b, n=n: rx.receptor_hamming(b, n))
+    return casos
+
+
+def obter_casos(padrao: str | None = None, parametros: ParametrosFisica = PARAMETROS_PADRAO) -> list[Caso]:
+    """
+    Todos os casos, ou só aqueles cujo nome (ou camada) casa com a expressão regular.
+    parametros: amostras por símbolo e portadoras dos casos da Camada Física.
+    """
+    casos = _casos_fisica(parametros) + _casos_enlace()
+    if padrao is None:
+        return casos
+    return [c for c in casos if re.search(padrao, c.nome) or re.fullmatch(padrao, c.camada)]
+
+
+# -------------------------------------------------------------------
+# Medição
+# -------------------------------------------------------------------
+
+def medir(caso: Caso, dados: bytes, tempo_alvo: float = 0.2, max_repeticoes: int = 50) -> dict:
+    """Mede um caso para uma carga útil: repete até tempo_alvo segundos (ao menos uma vez)."""
+    argumento = caso.preparar(dados)
+
+    tempos = []
+    while True:
+        inicio = time.perf_counter()
+        saida = caso.executar(argumento)
+        tempos.append(time.perf_counter() - inicio)
+        if sum(tempos) >= tempo_alvo or len(tempos) >= max_repeticoes:
+            break
+    amostras = caso.amostras(argumento, saida) if caso.amostras else None
+    del saida
+
+    # Memória em uma execução separada: o tracemalloc deixa as alocações mais lentas
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        caso.executar(argumento)
+        pico = tracemalloc.get_traced_memory()[1] - antes
+    finally:
+        tracemalloc.stop()
+
+    melhor = min(tempos)
+    bits = len(dados) * 8
+    return {
+        "caso": caso.nome,
+        "camada": caso.camada,
+        "tamanho_bytes": len(dados),
+        "repeticoes": len(tempos),
+        "tempo_s": melhor,
+        "tempo_mediano_s": float(np.median(tempos)),
+        "bits_por_s": bits / melhor if melhor else math.inf,
+        "amostras": amostras,
+        "amostras_por_s": amostras / melhor if amostras is not None and melhor else None,
+        "pico_memoria_bytes": pico,
+    }
+
+
+def expoente_escala(pontos: list[dict]) -> float | None:
+    """
+    Inclinação de log(tempo) x log(tamanho) (1 = linear, 2 = quadrático), usando os pontos
+    com tempo acima de _TEMPO_MINIMO_ESCALA (ou os dois maiores, se não houver dois).
+    """
+    pontos = sorted(pontos, key=lambda p: p["tamanho_bytes"])
+    usados = [p for p in pontos if p["tempo_s"] >= _TEMPO_MINIMO_ESCALA]
+    if len(usados) < 2:
+        usados = pontos[-2:]
+    if len(usados) < 2:
+        return None
+    x = np.log([p["tamanho_bytes"] for p in usados])
+    y = np.log([p["tempo_s"] for p in usados])
+    return round(float(np.polyfit(x, y, 1)[0]), 3)
+
+
+def _tamanhos_do_caso(caso: Caso, tamanhos, max_amostras: int) -> list[int]:
+    limite = caso.limite_bytes if caso.limite_bytes is not None else math.inf
+    if caso.amostras_por_byte:
+        limite = min(limite, max_amostras / caso.amostras_por_byte)
+    validos = [t for t in tamanhos if t <= limite]
+    # Inclui o próprio limite quando ele corta a escala (ex.: 255 B da Contagem de Caracteres)
+    if caso.limite_bytes is not None and caso.limite_bytes < max(tamanhos) and caso.limite_bytes not in validos:
+        validos.append(caso.limite_bytes)
+    return sorted(validos)
+
+
+def executar_benchmarks(casos=None, tamanhos=TAMANHOS, tempo_max: float = 5.0,
+                        max_amostras: int = 2**24, semente: int = 0, tempo_alvo: float = 0.2) -> dict:
+    """
+    Mede cada caso em tamanhos crescentes. Um caso para quando a estimativa (linear) do
+    próximo tamanho passa de tempo_max segundos.
+    Retorna {"meta": ..., "resultados": [...], "expoentes": {caso: expoente}}.
+    """
+    casos = obter_casos() if casos is None else casos
+    dados = np.random.default_rng(semente).bytes(max(tamanhos))
+    resultados, expoentes = [], {}
+
+    for caso in casos:
+        pontos = []
+        tamanhos_caso = _tamanhos_do_caso(caso, tamanhos, max_amostras)
+        for i, tamanho in enumerate(tamanhos_caso):
+            ponto = medir(caso, dados[:tamanho], tempo_alvo)
+            pontos.append(ponto)
+            log.info("%s, %d B: %.3e bits/s", caso.nome, tamanho, ponto["bits_por_s"], extra=ponto)
+            proximo = tamanhos_caso[i + 1] if i + 1 < len(tamanhos_caso) else None
+            if proximo is not None and ponto["tempo_s"] * proximo / tamanho > tempo_max:
+                log.info("%s: tamanhos acima de %d B ignorados (tempo_max)", caso.nome, tamanho)
+                break
+        resultados += pontos
+        expoentes[caso.nome] = expoente_escala(pontos)
+
+    meta = {"data": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "plataforma": platform.platform(), "processador": platform.processor(),
+            "tamanhos": list(tamanhos), "tempo_max": tempo_max, "max_amostras": max_amostras, "semente": semente}
+    return {"meta": meta, "resultados": resultados, "expoentes": expoentes}
+
+
+# -------------------------------------------------------------------
+# Comparação entre execuções
+# -------------------------------------------------------------------
+
+def comparar(base: dict, atual: dict, tolerancia: float = 0.25, tolerancia_expoente: float = 0.2,
+             memoria_minima: int = 1 << 20) -> list[dict]:
+    """
+    Regressões de 'atual' em relação a 'base' (resultados de executar_benchmarks):
+    - vazão (bits/s) menor que base * (1 - tolerancia);
+    - pico de memória maior que base * (1 + tolerancia), se o aumento passar de memoria_minima;
+    - expoente de escala maior que o da base + tolerancia_expoente.
+    Só entram pontos presentes nas duas execuções.
+    """
+    regressoes = []
+    pontos_base = {(p["caso"], p["tamanho_bytes"]): p for p in base["resultados"]}
+    for ponto in atual["resultados"]:
+        anterior = pontos_base.get((ponto["caso"], ponto["tamanho_bytes"]))
+        if anterior is None:
+            continue
+        chave = {"caso": ponto["caso"], "tamanho_bytes": ponto["tamanho_bytes"]}
+        if ponto["bits_por_s"] < anterior["bits_por_s"] * (1 - tolerancia):
+            regressoes.append({**chave, "metrica": "bits_por_s",
+                               "base": anterior["bits_por_s"], "atual": ponto["bits_por_s"]})
+        aumento = ponto["pico_memoria_bytes"] - anterior["pico_memoria_bytes"]
+        if aumento > memoria_minima and ponto["pico_memoria_bytes"] > anterior["pico_memoria_bytes"] * (1 + tolerancia):
+            regressoes.append({**chave, "metrica": "pico_memoria_bytes",
+                               "base": anterior["pico_memoria_bytes"], "atual": ponto["pico_memoria_bytes"]})
+
+    for nome, expoente in atual["expoentes"].items():
+        anterior = base["expoentes"].get(nome)
+        if expoente is not None and anterior is not None and expoente > anterior + tolerancia_expoente:
+            regressoes.append({"caso": nome, "tamanho_bytes": None, "metrica": "expoente",
+                               "base": anterior, "atual": expoente})
+    return regressoes
+
+
+def _tamanho(texto: str) -> int:
+    """'64' -> 64, '16K' -> 16384, '16M' -> 16777216."""
+    multiplicadores = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    texto = texto.strip().upper().removesuffix("B")
+    if texto and texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+def _imprimir_tabela(relatorio: dict) -> None:
+    print(f"{'caso':<36} {'tamanho':>10} {'Mbit/s':>10} {'Mamostras/s':>12} {'pico MiB':>9}")
+    for p in relatorio["resultados"]:
+        amostras = f"{p['amostras_por_s'] / 1e6:12.2f}" if p["amostras_por_s"] is not None else f"{'-':>12}"
+        print(f"{p['caso']:<36} {p['tamanho_bytes']:>10} {p['bits_por_s'] / 1e6:10.2f} {amostras} "
+              f"{p['pico_memoria_bytes'] / 2**20:9.2f}")
+    print("\nExpoentes de escala (tempo ~ tamanho^k):")
+    for nome, expoente in relatorio["expoentes"].items():
+        print(f"  {nome:<36} {'-' if expoente is None else expoente}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de vazão das funções das camadas.")
+    parser.add_argument("--casos", default=None, help="Expressão regular sobre o nome do caso, ou 'fisica'/'enlace'")
+    parser.add_argument("--tamanho-max", default="16M", help="Maior carga útil (ex.: 1M)")
+    parser.add_argument("--tempo-max", type=float, default=5.0, help="Tempo máximo estimado por medida (s)")
+    parser.add_argument("--max-amostras", type=int, default=2**24, help="Maior sinal na Camada Física")
+    parser.add_argument("--amostras-por-simbolo", type=int, default=100, help="Amostras por símbolo na Camada Física")
+    parser.add_argument("--frequencias-fsk", default=None,
+                        help="Portadoras f1,f2 da FSK (padrão: cadeia.portadoras_padrao)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior (base)")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Queda relativa aceita na vazão")
+    args = parser.parse_args(argv)
+
+    tamanhos = [t for t in TAMANHOS if t <= _tamanho(args.tamanho_max)]
+    frequencias_fsk = None if args.frequencias_fsk is None else tuple(float(f) for f in args.frequencias_fsk.split(","))
+    parametros = ParametrosFisica(amostras_por_simbolo=args.amostras_por_simbolo, frequencias_fsk=frequencias_fsk)
+    relatorio = executar_benchmarks(obter_casos(args.casos, parametros), tamanhos, args.tempo_max,
+                                    args.max_amostras, args.semente)
+    _imprimir_tabela(relatorio)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(json.load(arquivo), relatorio, args.tolerancia)
+        for r in regressoes:
+            tamanho = "" if r["tamanho_bytes"] is None else f" ({r['tamanho_bytes']} B)"
+            print(f"REGRESSÃO {r['caso']}{tamanho}: {r['metrica']} {r['base']:.4g} -> {r['atual']:.4g}")
+        if regressoes:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
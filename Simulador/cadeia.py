@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: cadeia.py
+
+Registro dos esquemas de modulação (CamadaFisica) e de controle de erros (Camada de enlace)
+usados pelo Simulador, com uma interface em lote comum: cada esquema processa um lote 2-D
+(n_quadros, n_bits) de bits uint8 de uma só vez.
+
+Funções incluídas:
+- adicionar_camadas_ao_path: torna os módulos das camadas importáveis (eles vivem em pastas
+  separadas, sem pacote).
+- ParametrosFisica: amplitude, portadoras e amostras por símbolo, compartilhados pela cadeia
+  (modulador, canal e demodulador); criar_modulacoes monta os esquemas para um conjunto deles,
+  em banda passante ou em banda base complexa (uma amostra por símbolo, para curvas de BER).
+- MODULACOES / CONTROLES_ERRO: esquemas por nome (os mesmos nomes usados pela interface).
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIOS_CAMADAS = (os.path.join(RAIZ, "CamadaFisica"), os.path.join(RAIZ, "Camada de enlace"))
+
+
+def adicionar_camadas_ao_path() -> None:
+    """Inclui as pastas das camadas no sys.path (idempotente)."""
+    for diretorio in DIRETORIOS_CAMADAS:
+        if diretorio not in sys.path:
+            sys.path.insert(0, diretorio)
+
+
+adicionar_camadas_ao_path()
+
+import modulacao_demodulacao_digital as dig  # noqa: E402
+import modulacao_demodulacao_portadora as port  # noqa: E402
+import enlace_receptor as rx  # noqa: E402
+import enlace_transmissor as tx  # noqa: E402
+from buffer_bits import BufferBits  # noqa: E402
+from correcao_erros import CODIGOS_HAMMING  # noqa: E402
+
+# As funções das camadas são chamadas através dos módulos (dig.*, port.*, tx.*, rx.*) no momento
+# do uso, para que a instrumentação (instrumentacao.py) as alcance quando estiver ativa.
+
+# Parâmetros padrão das formas de onda usadas nas simulações
+AMPLITUDE = 1.0
+FREQUENCIA = 2
+FREQUENCIAS_FSK = (2, 5)
+AMOSTRAS_POR_SIMBOLO = 100
+
+
+def portadoras_padrao(amostras_por_simbolo: int) -> tuple[float, tuple]:
+    """
+    (frequencia, frequencias_fsk) padrão para N amostras por símbolo: FREQUENCIA e FREQUENCIAS_FSK
+    quando cabem abaixo de N/2 (Nyquist); senão, a maior frequência permitida em múltiplos de
+    meio ciclo, (N - 1) / 2. Senoides de 2f inteiro e 0 < f < N/2 são ortogonais nas N amostras e
+    têm energia N/2, então os demoduladores continuam corretos (ex.: N=4 -> 1.5 e (1, 1.5)).
+    Levanta ValueError para N < 3, que não comporta dois tons positivos distintos (a FSK teria f1 = 0).
+    """
+    if amostras_por_simbolo < 3:
+        raise ValueError(f"Com {amostras_por_simbolo} amostra(s) por símbolo não há portadora positiva abaixo de "
+                         f"Nyquist para a FSK (dois tons distintos exigem pelo menos 3 amostras); informe "
+                         f"frequencia/frequencias_fsk ou aumente amostras_por_simbolo.")
+    maxima = (amostras_por_simbolo - 1) / 2
+    f2 = min(FREQUENCIAS_FSK[1], maxima)
+    return min(FREQUENCIA, maxima), (min(FREQUENCIAS_FSK[0], f2 - 0.5), f2)
+
+
+@dataclass(frozen=True)
+class ParametrosFisica:
+    """
+    Parâmetros da Camada Física compartilhados por toda a cadeia: o modulador, a calibração
+    do AWGN (energia por bit) e o demodulador usam as mesmas amostras por símbolo.
+    - frequencia / frequencias_fsk: portadoras em ciclos por símbolo; precisam ficar abaixo de
+      amostras_por_simbolo / 2 (Nyquist), verificado no primeiro uso de cada modulação.
+      Omitidas, vêm de portadoras_padrao(amostras_por_simbolo), válidas para qualquer N >= 3; com
+      N < 3 ficam None e só os códigos de linha (e o modo banda_base) podem ser usados.
+    - amostras_por_simbolo: 100 reproduz os gráficos da interface; 4-8 bastam para curvas de
+      BER (as decisões só dependem da correlação), com uma fração da memória e do tempo.
+    - banda_base: simula no domínio do símbolo (uma amostra complexa por símbolo, sem portadora;
+      ver modulacao_demodulacao_portadora.py). Estatisticamente equivalente para as modulações
+      coerentes; as frequências e amostras_por_simbolo só valem para a ASK, que fica em banda
+      passante (o detector de energia não tem equivalente de uma amostra).
+    """
+    amplitude: float = AMPLITUDE
+    frequencia: float | None = None
+    frequencias_fsk: tuple | None = None
+    amostras_por_simbolo: int = AMOSTRAS_POR_SIMBOLO
+    banda_base: bool = False
+
+    def __post_init__(self):
+        if self.amostras_por_simbolo < 1 or self.amostras_por_simbolo != int(self.amostras_por_simbolo):
+            raise ValueError("amostras_por_simbolo deve ser um inteiro positivo.")
+        if self.amostras_por_simbolo < 3:
+            return  # sem portadoras padrão: obter_modulacao recusa as modulações que precisam delas
+        frequencia, frequencias_fsk = portadoras_padrao(self.amostras_por_simbolo)
+        # frozen: os padrões são gravados no próprio objeto (igualdade e cache usam os valores finais)
+        if self.frequencia is None:
+            object.__setattr__(self, "frequencia", frequencia)
+        if self.frequencias_fsk is None:
+            object.__setattr__(self, "frequencias_fsk", frequencias_fsk)
+
+
+PARAMETROS_PADRAO = ParametrosFisica()
+
+
+# -------------------------------------------------------------------
+# Modulações
+# -------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Modulacao:
+    """
+    Esquema da Camada Física.
+    - modular(bits (n_quadros, n_bits)) -> sinal (n_quadros, n_amostras)
+    - demodular(sinal) -> bits (n_quadros, >= n_bits); bits de preenchimento ficam no final.
+    Ambos aceitam out= e workspace= (area_de_trabalho.Workspace), repassados à CamadaFisica.
+    - portadoras: frequências usadas (ciclos por símbolo), verificadas contra Nyquist.
+    Em banda base o sinal é complexo, com amostras_por_simbolo = 1 (uma amostra por símbolo).
+    """
+    nome: str
+    modular: Callable
+    demodular: Callable
+    bits_por_simbolo: int = 1
+    amostras_por_simbolo: int = AMOSTRAS_POR_SIMBOLO
+    portadoras: tuple = ()
+
+    def gerar_sinal(self, bits, out=None, workspace=None) -> np.ndarray:
+        """
+        modular(bits) como array float64 (complex128 em banda base), pronto para o AWGN in-place.
+        Com out (o sinal do lote anterior, de mesmo formato) e workspace, não aloca o sinal de novo.
+        """
+        sinal = self.modular(bits, out=out, workspace=workspace)
+        return np.asarray(sinal, dtype=np.result_type(sinal, float))
+
+
+def _modulacao_m_aria(nome, M, psk, p: ParametrosFisica):
+    A, f, N = p.amplitude, p.frequencia, p.amostras_por_simbolo
+    if p.banda_base:
+        if psk:
+            return Modulacao(nome, lambda b, **k: port.MPSK_baseband_modulation(A, b, M, **k),
+                             lambda z, **k: port.MPSK_baseband_demodulation(z, M, **k),
+                             port._bits_por_simbolo(M), 1)
+        return Modulacao(nome, lambda b, **k: port.MQAM_baseband_modulation(b, M, **k),
+                         lambda z, **k: port.MQAM_baseband_demodulation(z, M, **k), port._bits_por_simbolo(M), 1)
+    if psk:
+        return Modulacao(nome,
+                         lambda b, **k: port.MPSK_modulation(A, f, b, M, N, **k),
+                         lambda s, **k: port.MPSK_demodulation(s, f, M, N, **k),
+                         port._bits_por_simbolo(M), N, (f,))
+    return Modulacao(nome,
+                     lambda b, **k: port.MQAM_modulation(f, b, M, N, **k),
+                     lambda s, **k: port.MQAM_demodulation(s, f, M, N, **k),
+                     port._bits_por_simbolo(M), N, (f,))
+
+
+def _modulacao_ask(p: ParametrosFisica) -> Modulacao:
+    """
+    ASK em banda passante, também no modo banda_base: o detector de energia (RMS > A/4) soma o
+    ruído de todas as amostras do símbolo e não tem equivalente estatístico com uma amostra.
+    """
+    A, f, N = p.amplitude, p.frequencia, p.amostras_por_simbolo
+    return Modulacao("ASK", lambda b, **k: port.ASK_modulation(A, f, b, N, **k),
+                     lambda s, **k: port.ASK_demodulation_stream(A, s, N, **k), amostras_por_simbolo=N,
+                     portadoras=(f,))
+
+
+@lru_cache(maxsize=16)
+def criar_modulacoes(p: ParametrosFisica = PARAMETROS_PADRAO) -> dict[str, Modulacao]:
+    """Esquemas de modulação por nome, todos com os parâmetros p (em cache por conjunto de parâmetros)."""
+    if p.banda_base:
+        return _modulacoes_banda_base(p)
+    A, f, (f1, f2), N = p.amplitude, p.frequencia, p.frequencias_fsk or (None, None), p.amostras_por_simbolo
+    return {m.nome: m for m in (
+        Modulacao("NRZ", lambda b, **k: dig.NRZ_polar_modulation(A, b, N, **k),
+                  lambda s, **k: dig.NRZ_polar_demodulation(s, N, **k),
+                  amostras_por_simbolo=N),
+        Modulacao("manchester", lambda b, **k: dig.manchester_modulation(A, b, N, **k),
+                  lambda s, **k: dig.manchester_demodulation_correlator(s, N, **k), amostras_por_simbolo=N),
+        Modulacao("bipolar", lambda b, **k: dig.bipolar_modulation(A, b, N, **k),
+                  lambda s, **k: dig.bipolar_demodulation(A, s, N, **k), amostras_por_simbolo=N),
+        _modulacao_ask(p),
+        Modulacao("FSK", lambda b, **k: port.FSK_modulation(A, f1, f2, b, N, **k),
+                  lambda s, **k: port.FSK_demodulation_stream(A, f1, f2, s, N, **k), amostras_por_simbolo=N,
+                  portadoras=(f1, f2)),
+        Modulacao("PSK", lambda b, **k: port.PSK_modulation(A, f, b, N, **k),
+                  lambda s, **k: port.PSK_demodulation_stream(A, f, s, N, **k), amostras_por_simbolo=N,
+                  portadoras=(f,)),
+        Modulacao("QPSK", lambda b, **k: port.QPSK_modulation(A, f, b, N, **k),
+                  lambda s, **k: port.QPSK_demodulation(s, f, N, **k), 2, N, (f,)),
+        _modulacao_m_aria("8PSK", 8, True, p),
+        _modulacao_m_aria("8QAM", 8, False, p),
+        _modulacao_m_aria("16QAM", 16, False, p),
+        _modulacao_m_aria("64QAM", 64, False, p),
+    )}
+
+
+def _modulacoes_banda_base(p: ParametrosFisica) -> dict[str, Modulacao]:
+    """
+    Mesmos nomes de criar_modulacoes, no domínio do símbolo: as modulações por portadora geram
+    uma amostra complexa por símbolo e os códigos de linha usam o mínimo de amostras (NRZ e
+    bipolar: 1; Manchester: 2, uma por meio símbolo). A ASK continua em banda passante (ver
+    _modulacao_ask), com as portadoras e amostras_por_simbolo de p.
+    """
+    A = p.amplitude
+    return {m.nome: m for m in (
+        Modulacao("NRZ", lambda b, **k: dig.NRZ_polar_modulation(A, b, 1, **k),
+                  lambda s, **k: dig.NRZ_polar_demodulation(s, 1, **k),
+                  amostras_por_simbolo=1),
+        Modulacao("manchester", lambda b, **k: dig.manchester_modulation(A, b, 2, **k),
+                  lambda s, **k: dig.manchester_demodulation_correlator(s, 2, **k), amostras_por_simbolo=2),
+        Modulacao("bipolar", lambda b, **k: dig.bipolar_modulation(A, b, 1, **k),
+                  lambda s, **k: dig.bipolar_demodulation(A, s, 1, **k), amostras_por_simbolo=1),
+        _modulacao_ask(p),
+        Modulacao("FSK", lambda b, **k: port.FSK_baseband_modulation(A, b, **k),
+                  lambda z, **k: port.FSK_baseband_demodulation(z, **k),
+                  amostras_por_simbolo=1),
+        Modulacao("PSK", lambda b, **k: port.PSK_baseband_modulation(A, b, **k),
+                  lambda z, **k: port.PSK_baseband_demodulation(z, **k), amostras_por_simbolo=1),
+        Modulacao("QPSK", lambda b, **k: port.QPSK_baseband_modulation(A, b, **k),
+                  lambda z, **k: port.QPSK_baseband_demodulation(z, **k), 2, 1),
+        _modulacao_m_aria("8PSK", 8, True, p),
+        _modulacao_m_aria("8QAM", 8, False, p),
+        _modulacao_m_aria("16QAM", 16, False, p),
+        _modulacao_m_aria("64QAM", 64, False, p),
+    )}
+
+
+MODULACOES = criar_modulacoes(PARAMETROS_PADRAO)
+
+
+# -------------------------------------------------------------------
+# Controle de erros
+# -------------------------------------------------------------------
+# Os códigos de detecção são sistemáticos: com n_bits múltiplo de 8 (sem padding à esquerda)
+# os dados são os primeiros n_bits do quadro recebido. 'rejeitados' marca os quadros que o
+# receptor sinalizou como inválidos.
+
+@dataclass(frozen=True)
+class ControleErro:
+    """
+    Esquema de detecção/correção da Camada de Enlace.
+    - codificar(bits (n_quadros, n_bits)) -> quadros (n_quadros, n_codificados)
+    - decodificar(quadros, n_bits) -> (bits (n_quadros, n_bits), rejeitados (n_quadros,) bool)
+    """
+    nome: str
+    codificar: Callable
+    decodificar: Callable
+
+
+def _por_quadro(funcao, lote: np.ndarray) -> list:
+    """Aplica uma função da camada (que recebe BufferBits) a cada quadro do lote."""
+    return [funcao(BufferBits.de_bits(quadro)) for quadro in lote]
+
+
+def _codificar_por_quadro(funcao):
+    return lambda lote: np.stack([q.bits() for q in _por_quadro(funcao, lote)])
+
+
+def _decodificar_deteccao(verificar):
+    def decodificar(lote, n_bits):
+        validos = np.array(_por_quadro(verificar, lote), dtype=bool)
+        return lote[:, :n_bits], ~validos
+    return decodificar
+
+
+def _sem_rejeicao(lote, n_bits):
+    return lote[:, :n_bits], np.zeros(len(lote), dtype=bool)
+
+
+def _controle_hamming(nome, n=None):
+    """Hamming pelo transmissor/receptor da camada: n=None palavra única, n em CODIGOS_HAMMING em blocos."""
+    def decodificar(lote, n_bits):
+        corrigidos = _por_quadro(lambda q: rx.receptor_hamming(q, n)[0], lote)
+        return _sem_rejeicao(np.stack([q.bits() for q in corrigidos]), n_bits)
+    return ControleErro(nome, _codificar_por_quadro(lambda q: tx.transmissor_hamming(q, n)), decodificar)
+
+
+CONTROLES_ERRO = {c.nome: c for c in (
+    ControleErro("nenhum", lambda lote: lote, _sem_rejeicao),
+    ControleErro("paridade", _codificar_por_quadro(lambda q: tx.adicionar_paridade_par(q)),
+                 _decodificar_deteccao(lambda q: rx.verificar_paridade_par(q)[0])),
+    ControleErro("checksum", _codificar_por_quadro(lambda q: tx.adicionar_checksum(q)),
+                 _decodificar_deteccao(lambda q: rx.verificar_checksum(q)[0])),
+    ControleErro("crc32", _codificar_por_quadro(lambda q: tx.crc32(q)[0]),
+                 _decodificar_deteccao(lambda q: rx.verificar_crc32(q))),
+    _controle_hamming("hamming"),
+    *(_controle_hamming(f"hamming({n},{k})", n) for n, k in CODIGOS_HAMMING.items()),
+)}
+
+
+def obter_modulacao(nome: str, parametros: ParametrosFisica | None = None) -> Modulacao:
+    """
+    Busca a modulação pelo nome e valida os parâmetros (portadoras abaixo de Nyquist e
+    Manchester com amostras pares) antes de qualquer sinal ser gerado.
+    """
+    modulacoes = criar_modulacoes(parametros or PARAMETROS_PADRAO)
+    if nome not in modulacoes:
+        raise ValueError(f"Modulação desconhecida: {nome!r}. Opções: {', '.join(modulacoes)}")
+    modulacao = modulacoes[nome]
+    if None in modulacao.portadoras:
+        portadoras_padrao(modulacao.amostras_por_simbolo)  # N < 3: levanta o ValueError explicativo
+    for f in modulacao.portadoras:
+        port.check_nyquist(f, modulacao.amostras_por_simbolo)
+    if nome == "manchester" and modulacao.amostras_por_simbolo % 2:
+        raise ValueError("Manchester exige um número par de amostras por símbolo.")
+    return modulacao
+
+
+def obter_esquemas(modulacao: str, controle: str,
+                   parametros: ParametrosFisica | None = None) -> tuple[Modulacao, ControleErro]:
+    """Busca os esquemas pelo nome, com uma mensagem clara para nomes desconhecidos."""
+    if controle not in CONTROLES_ERRO:
+        raise ValueError(f"Controle de erros desconhecido: {controle!r}. Opções: {', '.join(CONTROLES_ERRO)}")
+    return obter_modulacao(modulacao, parametros), CONTROLES_ERRO[controle]
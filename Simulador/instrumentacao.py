@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: instrumentacao.py
+
+Métricas por etapa das camadas: quantas vezes cada função pública foi chamada, quanto tempo
+levou (acumulado e percentis), quantos bytes/amostras processou e contadores de eventos
+(falhas de CRC/paridade/checksum, correções do Hamming).
+
+Como o registro (registro.py), a instrumentação é escolhida por quem executa a simulação:
+ativar() substitui as funções públicas dos módulos das camadas por versões medidas e
+desativar() devolve as originais, então desligada ela não custa nada. Só é medido quem chama
+as funções através do módulo (tx.crc32(...)), como o Pipeline e o cadeia.
+
+Funções incluídas:
+- ativar / desativar / zerar / ativa.
+- instantaneo: métricas atuais em um dict (serializável em JSON).
+- formatar_prometheus: o mesmo instantâneo no formato de texto do Prometheus.
+- exportar: grava o instantâneo em arquivo (.json ou formato Prometheus).
+"""
+
+import functools
+import importlib
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from cadeia import adicionar_camadas_ao_path
+from buffer_bits import BufferBits
+
+# Módulos instrumentados por padrão e a camada de cada um
+MODULOS = {
+    "enlace_transmissor": "enlace",
+    "enlace_receptor": "enlace",
+    "modulacao_demodulacao_digital": "fisica",
+    "modulacao_demodulacao_portadora": "fisica",
+}
+
+# Latências guardadas por função para os percentis (amostragem de reservatório)
+_TAMANHO_RESERVATORIO = 2048
+_QUANTIS = (0.5, 0.9, 0.99)
+
+
+# Eventos extraídos do retorno de algumas funções: nome -> (contador, função do resultado)
+_EVENTOS = {
+    "verificar_crc32": ("falhas_crc", lambda r: int(not r)),
+    "verificar_crc32_incremental": ("falhas_crc", lambda r: int(not r)),
+    "verificar_paridade_par": ("falhas_paridade", lambda r: int(not r[0])),
+    "verificar_checksum": ("falhas_checksum", lambda r: int(not r[0])),
+    "verificar_checksum_incremental": ("falhas_checksum", lambda r: int(not r)),
+    "receptor_hamming": ("correcoes_hamming", lambda r: int(np.count_nonzero(r[1]))),
+}
+
+
+class _Estatisticas:
+    """Acumuladores de uma função (protegidos pela trava global)."""
+    __slots__ = ("chamadas", "erros", "tempo_total", "tempo_max", "bytes", "amostras", "latencias")
+
+    def __init__(self):
+        self.chamadas = self.erros = self.bytes = self.amostras = 0
+        self.tempo_total = self.tempo_max = 0.0
+        self.latencias = []
+
+    def registrar(self, duracao: float) -> None:
+        self.chamadas += 1
+        self.tempo_total += duracao
+        self.tempo_max = max(self.tempo_max, duracao)
+        if len(self.latencias) < _TAMANHO_RESERVATORIO:
+            self.latencias.append(duracao)
+        else:
+            j = random.randrange(self.chamadas)
+            if j < _TAMANHO_RESERVATORIO:
+                self.latencias[j] = duracao
+
+    def como_dict(self) -> dict:
+        quantis = np.quantile(self.latencias, _QUANTIS) if self.latencias else [0.0] * len(_QUANTIS)
+        return {"chamadas": self.chamadas, "erros": self.erros, "tempo_total_s": self.tempo_total,
+                "tempo_max_s": self.tempo_max,
+                **{f"latencia_p{round(q * 100)}_s": float(v) for q, v in zip(_QUANTIS, quantis)},
+                "bytes": self.bytes, "amostras": self.amostras}
+
+
+_trava = threading.Lock()
+_estatisticas: dict[str, _Estatisticas] = {}
+_contadores: dict[str, int] = {}
+_originais: dict[tuple[str, str], object] = {}
+
+
+# -------------------------------------------------------------------
+# Tamanhos processados
+# -------------------------------------------------------------------
+
+def _bits_em(objeto) -> int:
+    """Bits representados por um argumento/retorno (BufferBits, str de bits, bytes ou array de bits)."""
+    if isinstance(objeto, (BufferBits, str)):
+        return len(objeto)
+    if isinstance(objeto, (bytes, bytearray, memoryview)):
+        return len(objeto) * 8
+    return int(np.size(objeto))
+
+
+def _primeiro_vetor(args):
+    return next((a for a in args if np.ndim(a) > 0 or isinstance(a, (str, bytes, BufferBits))), None)
+
+
+def _tamanhos_enlace(args, resultado) -> tuple[int, int]:
+    return (_bits_em(args[0]) // 8 if args else 0), 0
+
+
+def _tamanhos_modulacao(args, resultado) -> tuple[int, int]:
+    """Moduladores: bits de entrada e amostras geradas."""
+    return _bits_em(_primeiro_vetor(args)) // 8, int(np.size(resultado))
+
+
+def _tamanhos_demodulacao(args, resultado) -> tuple[int, int]:
+    """Demoduladores: bits decididos e amostras recebidas."""
+    return int(np.size(resultado)) // 8, int(np.size(_primeiro_vetor(args)))
+
+
+def _sem_tamanhos(args, resultado) -> tuple[int, int]:
+    return 0, 0
+
+
+def _medidor_de_tamanhos(camada: str, nome: str):
+    if camada == "enlace":
+        return _tamanhos_enlace
+    if "demodulation" in nome:
+        return _tamanhos_demodulacao
+    if "modulation" in nome:
+        return _tamanhos_modulacao
+    return _sem_tamanhos
+
+
+# -------------------------------------------------------------------
+# Ativação
+# -------------------------------------------------------------------
+
+def _acumuladores(chave: str) -> _Estatisticas:
+    estatisticas = _estatisticas.get(chave)
+    if estatisticas is None:
+        estatisticas = _estatisticas[chave] = _Estatisticas()
+    return estatisticas
+
+
+def _instrumentar(chave: str, funcao, medir_tamanhos, evento):
+    @functools.wraps(funcao)
+    def instrumentada(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except Exception:
+            duracao = time.perf_counter() - inicio
+            with _trava:
+                estatisticas = _acumuladores(chave)
+                estatisticas.registrar(duracao)
+                estatisticas.erros += 1
+            raise
+        duracao = time.perf_counter() - inicio
+
+        n_bytes, n_amostras = medir_tamanhos(args, resultado)
+        with _trava:
+            estatisticas = _acumuladores(chave)
+            estatisticas.registrar(duracao)
+            estatisticas.bytes += n_bytes
+            estatisticas.amostras += n_amostras
+            if evento is not None:
+                contador, extrair = evento
+                _contadores[contador] = _contadores.get(contador, 0) + extrair(resultado)
+        return resultado
+
+    instrumentada.__instrumentada__ = True
+    return instrumentada
+
+
+def ativar(modulos=None) -> None:
+    """
+    Substitui as funções públicas (definidas no próprio módulo, sem '_') dos módulos das
+    camadas por versões medidas. Idempotente; as métricas acumuladas são mantidas.
+    """
+    adicionar_camadas_ao_path()
+    for nome_modulo in (MODULOS if modulos is None else modulos):
+        modulo = importlib.import_module(nome_modulo)
+        camada = MODULOS.get(nome_modulo, "enlace")
+        for nome, funcao in inspect.getmembers(modulo, inspect.isfunction):
+            if (nome.startswith("_") or funcao.__module__ != modulo.__name__
+                    or getattr(funcao, "__instrumentada__", False)):
+                continue
+            _originais[(nome_modulo, nome)] = funcao
+            setattr(modulo, nome, _instrumentar(f"{nome_modulo}.{nome}", funcao,
+                                                _medidor_de_tamanhos(camada, nome), _EVENTOS.get(nome)))
+
+
+def desativar() -> None:
+    """Devolve as funções originais aos módulos (as métricas acumuladas são mantidas)."""
+    for (nome_modulo, nome), funcao in _originais.items():
+        setattr(importlib.import_module(nome_modulo), nome, funcao)
+    _originais.clear()
+
+
+def ativa() -> bool:
+    return bool(_originais)
+
+
+def zerar() -> None:
+    """Descarta as métricas acumuladas."""
+    with _trava:
+        _estatisticas.clear()
+        _contadores.clear()
+
+
+# -------------------------------------------------------------------
+# Exportação
+# -------------------------------------------------------------------
+
+def instantaneo() -> dict:
+    """{"ts": ..., "funcoes": {"modulo.funcao": {...}}, "contadores": {...}} das funções já chamadas."""
+    with _trava:
+        funcoes = {chave: e.como_dict() for chave, e in _estatisticas.items()}
+        contadores = dict(_contadores)
+    return {"ts": time.time(), "funcoes": funcoes, "contadores": contadores}
+
+
+def formatar_prometheus(dados: dict | None = None, prefixo: str = "tr1") -> str:
+    """Instantâneo no formato de texto do Prometheus (exposition format 0.0.4)."""
+    dados = instantaneo() if dados is None else dados
+    linhas = []
+
+    def metrica(nome, tipo, ajuda, valores):
+        linhas.append(f"# HELP {prefixo}_{nome} {ajuda}")
+        linhas.append(f"# TYPE {prefixo}_{nome} {tipo}")
+        linhas.extend(valores)
+
+    def rotulos(chave, **extra):
+        modulo, funcao = chave.rsplit(".", 1)
+        pares = {"modulo": modulo, "funcao": funcao, **extra}
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pares.items()) + "}"
+
+    funcoes = dados["funcoes"]
+    metrica("chamadas_total", "counter", "Chamadas por função.",
+            [f"{prefixo}_chamadas_total{rotulos(c)} {f['chamadas']}" for c, f in funcoes.items()])
+    metrica("erros_total", "counter", "Chamadas que terminaram em exceção.",
+            [f"{prefixo}_erros_total{rotulos(c)} {f['erros']}" for c, f in funcoes.items()])
+    latencias = []
+    for c, f in funcoes.items():
+        latencias += [f"{prefixo}_latencia_segundos{rotulos(c, quantile=q)} {f[f'latencia_p{round(q * 100)}_s']!r}"
+                      for q in _QUANTIS]
+        latencias.append(f"{prefixo}_latencia_segundos_sum{rotulos(c)} {f['tempo_total_s']!r}")
+        latencias.append(f"{prefixo}_latencia_segundos_count{rotulos(c)} {f['chamadas']}")
+    metrica("latencia_segundos", "summary", "Latência por chamada.", latencias)
+    metrica("bytes_processados_total", "counter", "Bytes de dados processados.",
+            [f"{prefixo}_bytes_processados_total{rotulos(c)} {f['bytes']}" for c, f in funcoes.items()])
+    metrica("amostras_processadas_total", "counter", "Amostras de sinal geradas ou recebidas.",
+            [f"{prefixo}_amostras_processadas_total{rotulos(c)} {f['amostras']}"
+             for c, f in funcoes.items() if f["amostras"]])
+    for nome, valor in dados["contadores"].items():
+        metrica(f"{nome}_total", "counter", nome.replace("_", " ").capitalize() + ".",
+                [f"{prefixo}_{nome}_total {valor}"])
+    return "\n".join(linhas) + "\n"
+
+
+def exportar(caminho: str, formato: str | None = None) -> dict:
+    """
+    Grava o instantâneo em 'caminho': formato "json" ou "prometheus" (padrão: pela extensão,
+    .json ou texto do Prometheus). A gravação é atômica (arquivo temporário + rename), como
+    espera o coletor de arquivos de texto do node_exporter. Retorna o instantâneo gravado.
+    """
+    dados = instantaneo()
+    formato = formato or ("json" if caminho.endswith(".json") else "prometheus")
+    if formato == "json":
+        texto = json.dumps(dados, ensure_ascii=False, indent=2)
+    elif formato == "prometheus":
+        texto = formatar_prometheus(dados)
+    else:
+        raise ValueError(f"Formato desconhecido: {formato!r}. Opções: json, prometheus")
+
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(texto)
+    os.replace(temporario, caminho)
+    return dados
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: monte_carlo.py
+
+Varredura Monte Carlo de BER/FER em função de Eb/N0 para combinações de modulação
+(CamadaFisica) e controle de erros (Camada de enlace), em paralelo.
+
+Cada ponto (modulação, controle, Eb/N0) é uma tarefa independente executada em um
+ProcessPoolExecutor, com o seu próprio fluxo aleatório gerado por SeedSequence.spawn:
+o resultado depende apenas da semente, e não do número de processos nem da ordem de execução.
+Um ponto para assim que atinge o número alvo de erros de bit, a precisão pedida para o
+intervalo de confiança da BER ou o limite de bits simulados.
+
+Uso:
+    python Simulador/monte_carlo.py --modulacoes NRZ,QPSK --controles "nenhum,hamming(7,4)" \\
+        --ebn0 0:10:2 --saida curvas.csv
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import math
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from cadeia import CONTROLES_ERRO, MODULACOES, ParametrosFisica, obter_esquemas
+from area_de_trabalho import Workspace
+import canal
+
+log = logging.getLogger("simulador.monte_carlo")
+log.addHandler(logging.NullHandler())
+
+# Quantil da normal para o intervalo de confiança de 95%
+_Z_95 = 1.959963984540054
+
+
+@dataclass
+class ResultadoPonto:
+    """Contagens de um ponto da curva; as taxas e o intervalo de confiança são derivados delas."""
+    modulacao: str
+    controle: str
+    ebn0_db: float
+    bits: int = 0
+    erros_bit: int = 0
+    quadros: int = 0
+    erros_quadro: int = 0
+    quadros_rejeitados: int = 0
+    parada: str = ""
+
+    @property
+    def ber(self) -> float:
+        return self.erros_bit / self.bits if self.bits else math.nan
+
+    @property
+    def fer(self) -> float:
+        return self.erros_quadro / self.quadros if self.quadros else math.nan
+
+    def intervalo_ber(self) -> tuple[float, float]:
+        """Intervalo de Wilson (95%) para a BER."""
+        return intervalo_wilson(self.erros_bit, self.bits)
+
+    def como_dict(self) -> dict:
+        inferior, superior = self.intervalo_ber()
+        return {**asdict(self), "ber": self.ber, "fer": self.fer,
+                "ber_ic95_inferior": inferior, "ber_ic95_superior": superior}
+
+
+def intervalo_wilson(erros: int, total: int, z: float = _Z_95) -> tuple[float, float]:
+    """Intervalo de confiança de Wilson para uma proporção erros/total."""
+    if total == 0:
+        return 0.0, 1.0
+    p = erros / total
+    denominador = 1 + z * z / total
+    centro = (p + z * z / (2 * total)) / denominador
+    meia_largura = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominador
+    return max(0.0, centro - meia_largura), min(1.0, centro + meia_largura)
+
+
+def simular_ponto(modulacao: str, controle: str, ebn0_db: float, semente=None,
+                  bits_por_quadro: int = 256, quadros_por_lote: int = 200,
+                  alvo_erros: int = 100, precisao_relativa: float | None = None,
+                  max_bits: int = 10**7, parametros: ParametrosFisica | None = None) -> ResultadoPonto:
+    """
+    Simula um ponto da curva em lotes de quadros até um critério de parada:
+    - alvo_erros: erros de bit acumulados;
+    - precisao_relativa: meia largura do IC 95% da BER dividida pela BER (ex.: 0.1);
+    - max_bits: limite de bits de informação simulados.
+    Eb é a energia por bit de INFORMAÇÃO: a taxa do código entra na calibração do ruído.
+    parametros: amostras por símbolo e portadoras (padrão: cadeia.PARAMETROS_PADRAO); poucas
+    amostras por símbolo (4-8) reduzem proporcionalmente a memória e o tempo de cada lote, e
+    banda_base=True simula uma amostra complexa por símbolo, sem portadora.
+    """
+    if bits_por_quadro % 8:
+        raise ValueError("bits_por_quadro deve ser múltiplo de 8 (códigos de detecção sem padding)")
+    esquema_mod, esquema_ctrl = obter_esquemas(modulacao, controle, parametros)
+    rng = np.random.default_rng(semente)
+    resultado = ResultadoPonto(modulacao, controle, float(ebn0_db))
+    # Todos os lotes têm o mesmo formato: o sinal, os bits demodulados e os rascunhos da
+    # Camada Física são alocados no primeiro lote e reescritos nos seguintes
+    area = Workspace()
+    sinal = demodulados = None
+
+    while True:
+        bits = rng.integers(0, 2, (quadros_por_lote, bits_por_quadro), dtype=np.uint8)
+        codificados = esquema_ctrl.codificar(bits)
+        taxa = bits_por_quadro / codificados.shape[1]
+
+        sinal = esquema_mod.gerar_sinal(codificados, out=sinal, workspace=area)
+        canal.awgn(sinal, ebn0_db=ebn0_db, samples_per_symbol=esquema_mod.amostras_por_simbolo,
+                   bits_per_symbol=esquema_mod.bits_por_simbolo * taxa, rng=rng, out=sinal, workspace=area)
+        demodulados = esquema_mod.demodular(sinal, out=demodulados, workspace=area)
+        recebidos = demodulados[:, :codificados.shape[1]]
+        decodificados, rejeitados = esquema_ctrl.decodificar(recebidos, bits_por_quadro)
+
+        erros = np.count_nonzero(decodificados != bits, axis=1)
+        resultado.bits += bits.size
+        resultado.erros_bit += int(erros.sum())
+        resultado.quadros += len(bits)
+        resultado.erros_quadro += int(np.count_nonzero(erros))
+        resultado.quadros_rejeitados += int(np.count_nonzero(rejeitados))
+
+        if resultado.erros_bit >= alvo_erros:
+            resultado.parada = "alvo_erros"
+        elif precisao_relativa is not None and resultado.erros_bit:
+            inferior, superior = resultado.intervalo_ber()
+            if (superior - inferior) / 2 <= precisao_relativa * resultado.ber:
+                resultado.parada = "precisao"
+        if not resultado.parada and resultado.bits >= max_bits:
+            resultado.parada = "max_bits"
+        if resultado.parada:
+            return resultado
+
+
+def varrer(modulacoes, controles, ebn0s_db, semente: int = 0, processos: int | None = None,
+           **opcoes) -> list[ResultadoPonto]:
+    """
+    Executa simular_ponto para todas as combinações (modulação x controle x Eb/N0).
+    - processos: número de processos (None = número de CPUs; 1 = no processo atual).
+    - opcoes: repassadas a simular_ponto (bits_por_quadro, alvo_erros, ...).
+    Retorna os resultados na ordem das combinações.
+    """
+    tarefas = list(itertools.product(modulacoes, controles, ebn0s_db))
+    for modulacao, controle, _ in tarefas:
+        obter_esquemas(modulacao, controle, opcoes.get("parametros"))  # valida antes de lançar os processos
+    sementes = np.random.SeedSequence(semente).spawn(len(tarefas))
+
+    if processos == 1:
+        return [simular_ponto(*tarefa, semente=s, **opcoes) for tarefa, s in zip(tarefas, sementes)]
+
+    resultados = [None] * len(tarefas)
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {executor.submit(simular_ponto, *tarefa, semente=s, **opcoes): i
+                   for i, (tarefa, s) in enumerate(zip(tarefas, sementes))}
+        for concluidos, futuro in enumerate(as_completed(futuros), 1):
+            resultado = futuro.result()
+            resultados[futuros[futuro]] = resultado
+            log.info("Ponto %d/%d: %s + %s, Eb/N0 = %.1f dB, BER = %.3e (%s)", concluidos, len(tarefas),
+                     resultado.modulacao, resultado.controle, resultado.ebn0_db, resultado.ber,
+                     resultado.parada, extra=resultado.como_dict())
+    return resultados
+
+
+def salvar_csv(resultados, caminho: str) -> None:
+    """Grava uma linha por ponto, com as contagens, as taxas e o IC 95% da BER."""
+    linhas = [r.como_dict() for r in resultados]
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0]) if linhas else [])
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+def salvar_json(resultados, caminho: str) -> None:
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump([r.como_dict() for r in resultados], arquivo, ensure_ascii=False, indent=2)
+
+
+def _nomes(texto: str) -> list[str]:
+    """'nenhum,hamming(7,4)' -> ['nenhum', 'hamming(7,4)'] (vírgulas entre parênteses não separam)."""
+    return re.split(r",(?![^(]*\))", texto)
+
+
+def _faixa(texto: str) -> list[float]:
+    """'0:10:2' -> [0, 2, ..., 10]; '0,3,6' -> [0, 3, 6]."""
+    if ":" in texto:
+        inicio, fim, passo = (float(x) for x in texto.split(":"))
+        return [float(v) for v in np.arange(inicio, fim + passo / 2, passo)]
+    return [float(v) for v in texto.split(",")]
+
+
+def _frequencias(texto: str | None) -> tuple | None:
+    """'2,5' -> (2.0, 5.0); None mantém as portadoras padrão."""
+    return None if texto is None else tuple(float(f) for f in texto.split(","))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Varredura Monte Carlo de BER/FER vs Eb/N0.")
+    parser.add_argument("--modulacoes", default="NRZ", help=f"Separadas por vírgula: {', '.join(MODULACOES)}")
+    parser.add_argument("--controles", default="nenhum", help=f"Separados por vírgula: {', '.join(CONTROLES_ERRO)}")
+    parser.add_argument("--ebn0", default="0:10:1", help="Faixa inicio:fim:passo ou lista (dB)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--bits-por-quadro", type=int, default=256)
+    parser.add_argument("--alvo-erros", type=int, default=100)
+    parser.add_argument("--precisao", type=float, default=None, help="Meia largura relativa do IC 95%%")
+    parser.add_argument("--max-bits", type=int, default=10**7)
+    parser.add_argument("--amostras-por-simbolo", type=int, default=100,
+                        help="Amostras por símbolo (4-8 bastam para BER; as portadoras devem respeitar Nyquist)")
+    parser.add_argument("--frequencia", type=float, default=None,
+                        help="Portadora em ciclos por símbolo (padrão: cadeia.portadoras_padrao)")
+    parser.add_argument("--frequencias-fsk", default=None, help="Portadoras f1,f2 da FSK (padrão: idem)")
+    parser.add_argument("--banda-base", action="store_true",
+                        help="Uma amostra complexa por símbolo, com o ruído no domínio do símbolo")
+    parser.add_argument("--saida", default=None, help="Arquivo .csv ou .json (padrão: CSV na saída padrão)")
+    args = parser.parse_args(argv)
+    parametros = ParametrosFisica(frequencia=args.frequencia, amostras_por_simbolo=args.amostras_por_simbolo,
+                                  frequencias_fsk=_frequencias(args.frequencias_fsk), banda_base=args.banda_base)
+
+    resultados = varrer(_nomes(args.modulacoes), _nomes(args.controles), _faixa(args.ebn0),
+                        semente=args.semente, processos=args.processos,
+                        bits_por_quadro=args.bits_por_quadro, alvo_erros=args.alvo_erros,
+                        precisao_relativa=args.precisao, max_bits=args.max_bits, parametros=parametros)
+
+    if args.saida is None:
+        escritor = csv.DictWriter(sys.stdout, fieldnames=list(resultados[0].como_dict()))
+        escritor.writeheader()
+        escritor.writerows(r.como_dict() for r in resultados)
+    elif args.saida.endswith(".json"):
+        salvar_json(resultados, args.saida)
+    else:
+        salvar_csv(resultados, args.saida)
+
+
+if __name__ == "__main__":
+    main()
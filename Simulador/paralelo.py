@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: paralelo.py
+
+Execução do Pipeline em vários processos: a mensagem é dividida em quadros (dividir_em_quadros),
+os quadros são agrupados em lotes e cada lote passa por TX -> canal -> RX em um processo de um
+ProcessPoolExecutor. Os resultados são devolvidos na ordem dos quadros.
+
+- Cada processo cria o seu Pipeline uma única vez (mesmas funções de enlace_transmissor,
+  enlace_receptor e CamadaFisica).
+- O canal de cada quadro usa um fluxo aleatório próprio (SeedSequence(semente, spawn_key=(i,))):
+  o resultado depende apenas da semente, e não do número de processos nem do tamanho dos lotes.
+  (Os fluxos são outros que os do Pipeline sequencial, que usa um único gerador.)
+- Com guardar_sinais, as amostras dos sinais voltam por multiprocessing.shared_memory, e não
+  por pickle: o processo grava os sinais do lote em um bloco compartilhado e envia só o nome e
+  o layout; o processo principal copia o bloco uma vez e libera-o.
+- Só um número limitado de lotes fica em andamento, então a memória não depende do tamanho
+  da mensagem.
+
+Funções incluídas:
+- ExecutorParalelo: executar(fonte) gera um ResultadoQuadro por quadro, como Pipeline.executar.
+"""
+
+import itertools
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from pipeline import ConfiguracaoPipeline, Pipeline, dividir_em_quadros
+from buffer_bits import BufferBits
+
+log = logging.getLogger("simulador.paralelo")
+log.addHandler(logging.NullHandler())
+
+# Alinhamento (bytes) de cada sinal dentro do bloco compartilhado
+_ALINHAMENTO = 64
+
+# Pipeline de cada processo do pool (criado pelo inicializador)
+_pipeline_do_processo = None
+
+
+def _iniciar_processo(config: ConfiguracaoPipeline) -> None:
+    global _pipeline_do_processo
+    _pipeline_do_processo = Pipeline(config)
+
+
+def _simular_lote(simulador: Pipeline, entropia: int, inicio: int, quadros) -> list:
+    """TX -> canal -> RX de cada quadro do lote; quadros: (bytes empacotados, número de bits)."""
+    resultados = []
+    for indice, (dados, n_bits) in enumerate(quadros, inicio):
+        rng = np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(indice,)))
+        transmitido = simulador.transmitir(indice, BufferBits.de_bytes(dados, n_bits))
+        resultados.append(simulador.receber(*simulador.aplicar_canal(transmitido, rng)))
+    return resultados
+
+
+# Blocos criados fora do resource_tracker do processo (Python 3.13+): quem os libera é o
+# processo principal, depois de copiá-los (o tracker do processo do pool os apagaria ao sair)
+_SEM_RASTREIO = {"track": False} if sys.version_info >= (3, 13) else {}
+
+
+def _entregar_bloco(bloco: shared_memory.SharedMemory) -> None:
+    """Tira o bloco do resource_tracker deste processo (antes do 3.13, que não tem track=False)."""
+    if not _SEM_RASTREIO and os.name == "posix":
+        # O tracker registra o nome POSIX, com a "/" inicial (como SharedMemory.__init__)
+        resource_tracker.unregister("/" + bloco.name, "shared_memory")
+
+
+def _exportar_sinais(resultados):
+    """
+    Move os sinais dos resultados para um bloco de memória compartilhada.
+    Retorna (nome do bloco, layout) com layout[i] = (offset, dtype, shape) do sinal transmitido
+    e do recebido do resultado i (None quando ausente), ou (None, None) sem sinais.
+    """
+    sinais, posicoes, layout, tamanho = [], {}, [], 0
+    for resultado in resultados:
+        entradas = []
+        for sinal in (resultado.sinal_transmitido, resultado.sinal_recebido):
+            if sinal is None:
+                entradas.append(None)
+                continue
+            if id(sinal) not in posicoes:  # sem ruído o sinal recebido é o próprio transmitido
+                posicoes[id(sinal)] = tamanho
+                sinais.append((tamanho, sinal))
+                tamanho += -(-sinal.nbytes // _ALINHAMENTO) * _ALINHAMENTO
+            entradas.append((posicoes[id(sinal)], sinal.dtype.str, sinal.shape))
+        resultado.sinal_transmitido = resultado.sinal_recebido = None
+        layout.append(entradas)
+    if not sinais:
+        return None, None
+
+    bloco = shared_memory.SharedMemory(create=True, size=tamanho, **_SEM_RASTREIO)
+    try:
+        destino = np.ndarray((tamanho,), dtype=np.uint8, buffer=bloco.buf)
+        for offset, sinal in sinais:
+            destino[offset:offset + sinal.nbytes] = np.ascontiguousarray(sinal).reshape(-1).view(np.uint8)
+        del destino
+    except BaseException:
+        destino = None  # solta a visão do buffer antes de fechar o bloco
+        bloco.close()
+        bloco.unlink()
+        raise
+    # O processo principal passa a ser o dono do bloco (é ele quem o libera)
+    _entregar_bloco(bloco)
+    bloco.close()
+    return bloco.name, layout
+
+
+def _importar_sinais(resultados, nome: str, layout) -> None:
+    """Copia o bloco compartilhado para a memória do processo, libera-o e religa os sinais."""
+    bloco = shared_memory.SharedMemory(name=nome)
+    try:
+        dados = np.ndarray((bloco.size,), dtype=np.uint8, buffer=bloco.buf).copy()
+    finally:
+        bloco.close()
+        bloco.unlink()
+    for resultado, entradas in zip(resultados, layout):
+        sinais = [None if e is None else
+                  dados[e[0]:e[0] + np.dtype(e[1]).itemsize * int(np.prod(e[2]))].view(e[1]).reshape(e[2])
+                  for e in entradas]
+        resultado.sinal_transmitido, resultado.sinal_recebido = sinais
+
+
+def _processar_lote(entropia: int, inicio: int, quadros):
+    """Tarefa executada no pool: (resultados sem os sinais, nome do bloco, layout)."""
+    resultados = _simular_lote(_pipeline_do_processo, entropia, inicio, quadros)
+    return (resultados, *_exportar_sinais(resultados))
+
+
+def _lotes(quadros, quadros_por_lote: int):
+    """Agrupa os quadros em lotes de (bytes, n_bits): só os bytes de cada quadro são enviados."""
+    while lote := list(itertools.islice(quadros, quadros_por_lote)):
+        yield [(quadro.para_bytes(), len(quadro)) for quadro in lote]
+
+
+class ExecutorParalelo:
+    """
+    Pipeline de ponta a ponta distribuído em processos.
+    - processos: número de processos (None = número de CPUs; 1 = no processo atual, sem pool).
+    - quadros_por_lote: quadros por tarefa; lotes maiores diluem o custo de comunicação.
+    - lotes_em_andamento: lotes enviados ao pool e ainda não devolvidos (padrão: 2 por processo).
+    Use como gerenciador de contexto (ou chame fechar()) para encerrar os processos.
+    """
+
+    def __init__(self, config: ConfiguracaoPipeline | None = None, processos: int | None = None,
+                 quadros_por_lote: int = 64, lotes_em_andamento: int | None = None, **opcoes):
+        self.config = config if config is not None else ConfiguracaoPipeline(**opcoes)
+        if quadros_por_lote <= 0:
+            raise ValueError("quadros_por_lote deve ser positivo.")
+        self.processos = processos or os.cpu_count() or 1
+        self.quadros_por_lote = quadros_por_lote
+        self.lotes_em_andamento = lotes_em_andamento or 2 * self.processos
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def executar(self, fonte):
+        """Gera um ResultadoQuadro para cada quadro da fonte, em ordem (ver dividir_em_quadros)."""
+        entropia = np.random.SeedSequence(self.config.semente).entropy
+        lotes = _lotes(dividir_em_quadros(fonte, self.config.tamanho_quadro), self.quadros_por_lote)
+
+        if self.processos == 1:
+            simulador, inicio = Pipeline(self.config), 0
+            for lote in lotes:
+                yield from _simular_lote(simulador, entropia, inicio, lote)
+                inicio += len(lote)
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.processos, initializer=_iniciar_processo,
+                                             initargs=(self.config,))
+        pendentes = deque()
+        inicio = 0
+        try:
+            for lote in lotes:
+                pendentes.append(self._pool.submit(_processar_lote, entropia, inicio, lote))
+                inicio += len(lote)
+                if len(pendentes) >= self.lotes_em_andamento:
+                    yield from self._coletar(pendentes.popleft())
+            while pendentes:
+                yield from self._coletar(pendentes.popleft())
+        finally:
+            # Interrompido (exceção ou gerador fechado): libera os blocos dos lotes já iniciados
+            for futuro in pendentes:
+                if not futuro.cancel() and futuro.exception() is None:
+                    self._coletar(futuro)
+            if pendentes:
+                log.debug("Execução interrompida com %d lote(s) em andamento", len(pendentes))
+
+    @staticmethod
+    def _coletar(futuro) -> list:
+        resultados, nome, layout = futuro.result()
+        if nome is not None:
+            _importar_sinais(resultados, nome, layout)
+        return resultados
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: pipeline.py
+
+Controle principal da simulação: encadeia Camada de Enlace, Camada Física e canal, de ponta a ponta.
+
+TX: detecção -> correção -> enquadramento -> modulação; canal (BSC nos bits e/ou AWGN no sinal);
+RX: demodulação -> desenquadramento -> correção -> verificação -- a mesma ordem dos cenários
+de teste_de_integracao.py.
+
+A mensagem é processada quadro a quadro por geradores encadeados (quadros -> transmitir ->
+canal -> receber), então a memória usada não depende do tamanho da entrada.
+
+Funções incluídas:
+- ConfiguracaoPipeline: escolha dos protocolos (mesmos nomes da interface) e do canal.
+- Pipeline: executar(fonte) gera um ResultadoQuadro por quadro.
+- dividir_em_quadros: fonte (bytes, str de bits, BufferBits, arquivo ou iterável de pedaços) -> quadros.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from cadeia import MODULACOES, PARAMETROS_PADRAO, ParametrosFisica, obter_modulacao
+from area_de_trabalho import Workspace
+import canal
+import enlace_receptor as rx
+import enlace_transmissor as tx
+from buffer_bits import BufferBits, para_buffer
+from correcao_erros import CODIGOS_HAMMING
+
+log = logging.getLogger("simulador.pipeline")
+log.addHandler(logging.NullHandler())
+
+# Funções (TX, RX) pelo nome: são buscadas nos módulos ao criar o Pipeline, então ele usa as
+# versões instrumentadas quando a instrumentação está ativa (ver instrumentacao.py)
+ENQUADRAMENTOS = {
+    "nenhum": (None, None),
+    "contagem": ("enquadrar_contagem_caracteres", "desenquadrar_contagem_caracteres"),
+    "byte-stuffing": ("enquadrar_byte_stuffing", "desenquadrar_byte_stuffing"),
+    "bit-stuffing": ("enquadrar_bit_stuffing", "desenquadrar_bit_stuffing"),
+}
+DETECCOES = ("nenhuma", "paridade", "checksum", "crc")
+# None = Hamming legado (palavra única); n = Hamming (n, k) em blocos
+CORRECOES = {"nenhuma": False, "hamming": None,
+             **{f"hamming({n},{k})": n for n, k in CODIGOS_HAMMING.items()}}
+
+_TAMANHO_PEDACO_ARQUIVO = 1 << 16
+# Maior quadro (em bytes, após a detecção e a correção) da Contagem de Caracteres: cabeçalho de 1 byte
+LIMITE_CONTAGEM = 255
+
+
+def _bits_codificados(n_bits: int, deteccao: str, correcao: str) -> int:
+    """Bits entregues ao enquadramento para n_bits de dados (mesmas regras de enlace_transmissor)."""
+    if deteccao == "paridade":
+        n_bits += 1
+    elif deteccao == "checksum":
+        n_bits = -(-n_bits // 8) * 8 + 8  # alinhado em bytes + 1 byte de checksum
+    elif deteccao == "crc":
+        n_bits = max(n_bits, 64) + 32  # padding até 64 bits + CRC-32
+    n_hamming = CORRECOES[correcao]
+    if n_hamming is None:
+        r = 0
+        while 2 ** r < r + n_bits + 1:
+            r += 1
+        n_bits += r
+    elif n_hamming:
+        n_bits = -(-n_bits // CODIGOS_HAMMING[n_hamming]) * n_hamming
+    return n_bits
+
+
+@dataclass
+class ConfiguracaoPipeline:
+    """
+    - tamanho_quadro: bytes de dados por quadro (a Contagem de Caracteres limita o quadro
+      codificado a 255 bytes, verificado aqui com o acréscimo da detecção e da correção).
+    - ebn0_db: AWGN no sinal modulado (None = sem ruído); exige modulacao.
+    - taxa_erro_bits: probabilidade de inversão de cada bit do quadro (BSC), antes da modulação.
+    - guardar_sinais: mantém o sinal transmitido e o recebido em cada resultado (para gráficos).
+    - parametros_fisica: amostras por símbolo e portadoras, usados pelo modulador, pelo AWGN e
+      pelo demodulador; com banda_base=True os sinais são os símbolos complexos.
+    """
+    enquadramento: str = "contagem"
+    deteccao: str = "nenhuma"
+    correcao: str = "nenhuma"
+    modulacao: str = "nenhuma"
+    ebn0_db: float | None = None
+    taxa_erro_bits: float = 0.0
+    tamanho_quadro: int = 32
+    semente: int | None = None
+    guardar_sinais: bool = False
+    parametros_fisica: ParametrosFisica = PARAMETROS_PADRAO
+
+    def __post_init__(self):
+        opcoes = (("enquadramento", self.enquadramento, ENQUADRAMENTOS),
+                  ("deteccao", self.deteccao, DETECCOES),
+                  ("correcao", self.correcao, CORRECOES),
+                  ("modulacao", self.modulacao, ("nenhuma", *MODULACOES)))
+        for nome, valor, validos in opcoes:
+            if valor not in validos:
+                raise ValueError(f"{nome} desconhecido(a): {valor!r}. Opções: {', '.join(validos)}")
+        if self.ebn0_db is not None and self.modulacao == "nenhuma":
+            raise ValueError("ebn0_db exige uma modulação (o AWGN é aplicado ao sinal).")
+        if not 0.0 <= self.taxa_erro_bits <= 1.0:
+            raise ValueError("taxa_erro_bits deve estar entre 0 e 1.")
+        if self.tamanho_quadro <= 0:
+            raise ValueError("tamanho_quadro deve ser positivo.")
+        if self.enquadramento == "contagem":
+            # O último quadro pode ser menor, mas o tamanho codificado só cresce com os dados
+            bytes_quadro = lambda t: -(-_bits_codificados(8 * t, self.deteccao, self.correcao) // 8)
+            if bytes_quadro(self.tamanho_quadro) > LIMITE_CONTAGEM:
+                maximo = max((t for t in range(1, LIMITE_CONTAGEM + 1) if bytes_quadro(t) <= LIMITE_CONTAGEM),
+                             default=0)
+                raise ValueError(
+                    f"tamanho_quadro={self.tamanho_quadro} gera quadros de {bytes_quadro(self.tamanho_quadro)} "
+                    f"bytes com deteccao={self.deteccao!r} e correcao={self.correcao!r}; a Contagem de "
+                    f"Caracteres aceita até {LIMITE_CONTAGEM} (tamanho_quadro <= {maximo}).")
+        if self.modulacao != "nenhuma":
+            obter_modulacao(self.modulacao, self.parametros_fisica)  # Nyquist, Manchester par, ...
+
+
+@dataclass
+class QuadroTransmitido:
+    """Quadro na saída do TX, com os tamanhos de cada etapa (informação lateral do simulador)."""
+    indice: int
+    dados: BufferBits
+    quadro: BufferBits
+    tamanho_detectado: int
+    tamanho_codificado: int
+    pad_crc: int = 0
+    sinal: np.ndarray | None = None
+
+
+@dataclass
+class ResultadoQuadro:
+    """
+    Resultado de um quadro.
+    - valido: veredito da detecção (None sem detecção ou se o quadro se perdeu).
+    - perdido: o desenquadramento não recuperou um quadro do tamanho esperado.
+    - posicoes_corrigidas: posição(ões) corrigida(s) pelo Hamming (0 = nenhuma).
+    - erros_bit: bits diferentes entre enviado e recebido (tudo, se perdido).
+    """
+    indice: int
+    dados_enviados: BufferBits
+    dados_recebidos: BufferBits | None
+    valido: bool | None = None
+    perdido: bool = False
+    posicoes_corrigidas: object = 0
+    erros_bit: int = 0
+    bits_invertidos_no_canal: int = 0
+    quadro_transmitido: BufferBits | None = None
+    sinal_transmitido: np.ndarray | None = field(default=None, repr=False)
+    sinal_recebido: np.ndarray | None = field(default=None, repr=False)
+
+    @property
+    def correto(self) -> bool:
+        return not self.perdido and self.erros_bit == 0
+
+
+def dividir_em_quadros(fonte, tamanho_quadro: int):
+    """
+    Gera os quadros (BufferBits de tamanho_quadro bytes; o último pode ser menor).
+    Aceita bytes-like, str de '0'/'1', BufferBits, arquivo binário (com read) ou um iterável
+    desses pedaços; só o que ainda não completou um quadro fica em memória.
+    """
+    bits_por_quadro = tamanho_quadro * 8
+    if hasattr(fonte, "read"):
+        pedacos = iter(lambda: fonte.read(_TAMANHO_PEDACO_ARQUIVO), b"")
+    elif isinstance(fonte, (bytes, bytearray, memoryview, str, BufferBits)):
+        pedacos = (fonte,)
+    else:
+        pedacos = fonte
+
+    pendente = BufferBits()
+    for pedaco in pedacos:
+        pendente = pendente + para_buffer(pedaco) if len(pendente) else para_buffer(pedaco)
+        completos = len(pendente) // bits_por_quadro * bits_por_quadro
+        for inicio in range(0, completos, bits_por_quadro):
+            yield pendente[inicio:inicio + bits_por_quadro]
+        pendente = pendente[completos:]
+    if len(pendente):
+        yield pendente
+
+
+class Pipeline:
+    """
+    Simulação de ponta a ponta configurada por ConfiguracaoPipeline.
+    As etapas também podem ser chamadas isoladamente: transmitir -> aplicar_canal -> receber.
+    """
+
+    def __init__(self, config: ConfiguracaoPipeline | None = None, **opcoes):
+        self.config = config if config is not None else ConfiguracaoPipeline(**opcoes)
+        self.rng = np.random.default_rng(self.config.semente)
+        nome_tx, nome_rx = ENQUADRAMENTOS[self.config.enquadramento]
+        self._enquadrar = getattr(tx, nome_tx) if nome_tx else None
+        self._desenquadrar = getattr(rx, nome_rx) if nome_rx else None
+        self._modulacao = (obter_modulacao(self.config.modulacao, self.config.parametros_fisica)
+                           if self.config.modulacao != "nenhuma" else None)
+        # Rascunhos da Camada Física reaproveitados entre quadros (os sinais em si são novos a
+        # cada quadro, porque ficam nos resultados)
+        self._area = Workspace()
+
+    def executar(self, fonte):
+        """Gera um ResultadoQuadro para cada quadro da fonte (ver dividir_em_quadros)."""
+        quadros = dividir_em_quadros(fonte, self.config.tamanho_quadro)
+        transmitidos = (self.transmitir(i, quadro) for i, quadro in enumerate(quadros))
+        recebidos = (self.aplicar_canal(t) for t in transmitidos)
+        for transmitido, quadro_recebido, sinal_recebido in recebidos:
+            yield self.receber(transmitido, quadro_recebido, sinal_recebido)
+
+    # ---------------------------------------------------------------
+    # TX
+    # ---------------------------------------------------------------
+
+    def transmitir(self, indice: int, dados: BufferBits) -> QuadroTransmitido:
+        config = self.config
+        bits, pad_crc = dados, 0
+
+        if config.deteccao == "paridade":
+            bits = tx.adicionar_paridade_par(bits)
+        elif config.deteccao == "checksum":
+            bits = tx.adicionar_checksum(bits)
+        elif config.deteccao == "crc":
+            bits, pad_crc = tx.crc32(bits)
+        tamanho_detectado = len(bits)
+
+        n_hamming = CORRECOES[config.correcao]
+        if n_hamming is not False:
+            bits = tx.transmissor_hamming(bits, n_hamming)
+        tamanho_codificado = len(bits)
+
+        quadro = self._enquadrar(bits) if self._enquadrar else bits
+
+        sinal = None
+        if self._modulacao is not None:
+            sinal = self._modulacao.gerar_sinal(quadro.bits(), workspace=self._area)
+        log.debug("Quadro %d transmitido: %d bits de dados, %d bits no quadro", indice, len(dados), len(quadro))
+        return QuadroTransmitido(indice, dados, quadro, tamanho_detectado, tamanho_codificado, pad_crc, sinal)
+
+    # ---------------------------------------------------------------
+    # Canal
+    # ---------------------------------------------------------------
+
+    def aplicar_canal(self, transmitido: QuadroTransmitido, rng: np.random.Generator | None = None):
+        """
+        Retorna (transmitido, quadro_recebido, sinal_recebido).
+        O BSC age sobre os bits do quadro; com modulação, o sinal recebido é gerado a partir
+        desses bits (o transmitido continua o do quadro sem erros) e recebe o AWGN, e o quadro
+        recebido é o resultado da demodulação.
+        rng: gerador do ruído deste quadro (padrão: o do Pipeline, compartilhado entre quadros).
+        """
+        config = self.config
+        rng = self.rng if rng is None else rng
+        bits = transmitido.quadro.bits()
+        if config.taxa_erro_bits > 0:
+            bits = canal.bsc(bits, config.taxa_erro_bits, rng=rng)
+
+        sinal_recebido = None
+        if self._modulacao is not None:
+            sinal_recebido = transmitido.sinal
+            if config.taxa_erro_bits > 0:
+                sinal_recebido = self._modulacao.gerar_sinal(bits, workspace=self._area)
+            if config.ebn0_db is not None:
+                sinal_recebido = canal.awgn(sinal_recebido, ebn0_db=config.ebn0_db,
+                                            samples_per_symbol=self._modulacao.amostras_por_simbolo,
+                                            bits_per_symbol=self._modulacao.bits_por_simbolo, rng=rng,
+                                            workspace=self._area)
+            bits = self._modulacao.demodular(sinal_recebido, workspace=self._area)[:len(bits)]
+        return transmitido, BufferBits.de_bits(bits), sinal_recebido
+
+    # ---------------------------------------------------------------
+    # RX
+    # ---------------------------------------------------------------
+
+    def receber(self, transmitido: QuadroTransmitido, quadro_recebido: BufferBits,
+                sinal_recebido: np.ndarray | None = None) -> ResultadoQuadro:
+        config = self.config
+        dados = transmitido.dados
+        resultado = ResultadoQuadro(transmitido.indice, dados, None,
+                                    quadro_transmitido=transmitido.quadro,
+                                    bits_invertidos_no_canal=_diferencas(transmitido.quadro, quadro_recebido))
+        if config.guardar_sinais:
+            resultado.sinal_transmitido, resultado.sinal_recebido = transmitido.sinal, sinal_recebido
+
+        try:
+            bits = self._desenquadrar(quadro_recebido) if self._desenquadrar else quadro_recebido
+        except ValueError as erro:
+            log.warning("Quadro %d perdido no desenquadramento: %s", transmitido.indice, erro)
+            bits = BufferBits()
+        # Remove o padding de alinhamento em bytes (à esquerda) do enquadramento
+        if len(bits) < transmitido.tamanho_codificado:
+            resultado.perdido, resultado.erros_bit = True, len(dados)
+            return resultado
+        bits = bits[len(bits) - transmitido.tamanho_codificado:]
+
+        n_hamming = CORRECOES[config.correcao]
+        if n_hamming is not False:
+            bits, resultado.posicoes_corrigidas = rx.receptor_hamming(bits, n_hamming)
+            bits = bits[:transmitido.tamanho_detectado]
+
+        if config.deteccao == "paridade":
+            resultado.valido, _ = rx.verificar_paridade_par(bits)
+            bits = bits[:-1]
+        elif config.deteccao == "checksum":
+            resultado.valido, bits = rx.verificar_checksum(bits)
+        elif config.deteccao == "crc":
+            resultado.valido = rx.verificar_crc32(bits)
+            bits = rx.remover_crc_e_padding(bits, transmitido.pad_crc)
+        # Dados alinhados à direita (o checksum completa com zeros à esquerda)
+        bits = bits[len(bits) - len(dados):]
+
+        resultado.dados_recebidos = bits
+        resultado.erros_bit = _diferencas(dados, bits)
+        return resultado
+
+
+def _diferencas(a: BufferBits, b: BufferBits) -> int:
+    """Bits diferentes entre dois buffers; bits sobrando no maior também contam como erro."""
+    n = min(len(a), len(b))
+    erros = int(np.count_nonzero(a[:n].bits() != b[:n].bits()))
+    return erros + abs(len(a) - len(b))
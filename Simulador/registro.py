@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo: registro.py
+
+Configuração do registro (logging) das camadas do simulador.
+
+As camadas não imprimem nada: cada módulo usa um logger da sua camada ("enlace.transmissor",
+"enlace.receptor", ...) com um NullHandler, e as mensagens são formatadas sob demanda
+(estilo %), de modo que com o registro desligado cada chamada custa só a verificação do nível.
+Quem executa a simulação (GUI, scripts, Monte Carlo) escolhe aqui o nível e o formato.
+
+Funções incluídas:
+- FormatadorJSON: uma linha JSON por mensagem (JSON lines), com os campos passados em 'extra'.
+- configurar_registro / desligar_registro.
+"""
+
+import json
+import logging
+import sys
+
+# Loggers raiz de cada camada (e do controle da simulação)
+CAMADAS = ("fisica", "enlace", "simulador")
+
+# Atributos padrão de um LogRecord: o que não estiver aqui veio de 'extra'
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_handler_ativo: logging.Handler | None = None
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Formata cada registro como um objeto JSON em uma linha:
+    {"ts": ..., "nivel": ..., "logger": ..., "msg": ..., <campos de extra>}
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        saida = {
+            "ts": record.created,
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO:
+                saida[chave] = valor
+        if record.exc_info:
+            saida["excecao"] = self.formatException(record.exc_info)
+        # default=str cobre valores numpy e outros tipos não serializáveis
+        return json.dumps(saida, ensure_ascii=False, default=str)
+
+
+def configurar_registro(nivel: int | str = logging.INFO, formato: str = "json",
+                        destino=None, camadas=CAMADAS) -> logging.Handler:
+    """
+    Liga o registro das camadas.
+    - nivel: nível mínimo (logging.DEBUG mostra cada etapa de TX/RX).
+    - formato: "json" (JSON lines) ou "texto".
+    - destino: stream (padrão sys.stderr) ou caminho de arquivo.
+    Chamar de novo substitui a configuração anterior. Retorna o handler instalado.
+    """
+    global _handler_ativo
+    desligar_registro(camadas)
+
+    if isinstance(destino, str):
+        handler = logging.FileHandler(destino, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(destino or sys.stderr)
+
+    if formato == "json":
+        handler.setFormatter(FormatadorJSON())
+    elif formato == "texto":
+        handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    else:
+        raise ValueError(f"Formato de registro desconhecido: {formato!r} (use 'json' ou 'texto').")
+
+    for camada in camadas:
+        logger = logging.getLogger(camada)
+        logger.setLevel(nivel)
+        logger.addHandler(handler)
+    _handler_ativo = handler
+    return handler
+
+
+def desligar_registro(camadas=CAMADAS) -> None:
+    """Remove o handler instalado por configurar_registro (as camadas voltam a ficar silenciosas)."""
+    global _handler_ativo
+    if _handler_ativo is None:
+        return
+    for camada in camadas:
+        logger = logging.getLogger(camada)
+        logger.removeHandler(_handler_ativo)
+        logger.setLevel(logging.NOTSET)
+    _handler_ativo.close()
+    _handler_ativo = None
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do Simulador (registro das camadas, varredura Monte Carlo, pipeline de ponta a ponta,
+benchmarks e instrumentação).
+"""
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+import numpy as np
+import benchmarks
+import cadeia
+import instrumentacao
+import monte_carlo
+import paralelo
+import pipeline
+import registro
+
+
+class TestRegistro(unittest.TestCase):
+
+    def setUp(self):
+        self.CAMADAS = ("teste_registro",)
+        self.log = logging.getLogger("teste_registro.modulo")
+        self.saida = io.StringIO()
+
+    def tearDown(self):
+        registro.desligar_registro(self.CAMADAS)
+
+    def test_linhas_json_com_campos_extra(self):
+        registro.configurar_registro(logging.DEBUG, destino=self.saida, camadas=self.CAMADAS)
+        self.log.info("Erro na posição %d", 6, extra={"posicao_erro": 6})
+        linha = json.loads(self.saida.getvalue())
+        self.assertEqual(linha["msg"], "Erro na posição 6")
+        self.assertEqual(linha["nivel"], "INFO")
+        self.assertEqual(linha["logger"], "teste_registro.modulo")
+        self.assertEqual(linha["posicao_erro"], 6)
+
+    def test_abaixo_do_nivel_nao_formata(self):
+        class Contador:
+            chamadas = 0
+
+            def __str__(self):
+                Contador.chamadas += 1
+                return "x"
+
+        registro.configurar_registro(logging.WARNING, destino=self.saida, camadas=self.CAMADAS)
+        self.log.debug("%s", Contador())
+        self.assertEqual(Contador.chamadas, 0)
+        self.assertEqual(self.saida.getvalue(), "")
+
+    def test_formato_invalido(self):
+        with self.assertRaises(ValueError):
+            registro.configurar_registro(formato="xml", camadas=self.CAMADAS)
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def setUp(self):
+        self.OPCOES = dict(bits_por_quadro=64, quadros_por_lote=50, alvo_erros=50, max_bits=20000)
+
+    def test_resultado_independe_do_numero_de_processos(self):
+        argumentos = (["NRZ", "QPSK"], ["nenhum", "hamming(7,4)"], [2.0])
+        serial = monte_carlo.varrer(*argumentos, semente=7, processos=1, **self.OPCOES)
+        paralelo = monte_carlo.varrer(*argumentos, semente=7, processos=2, **self.OPCOES)
+        self.assertEqual([r.como_dict() for r in serial], [r.como_dict() for r in paralelo])
+
+    def test_ber_nrz_e_parada_antecipada(self):
+        resultado = monte_carlo.simular_ponto("NRZ", "nenhum", 0.0, semente=1, alvo_erros=500)
+        self.assertEqual(resultado.parada, "alvo_erros")
+        inferior, superior = resultado.intervalo_ber()
+        self.assertTrue(inferior < 0.0786 < superior)  # Q(sqrt(2)) para Eb/N0 = 0 dB
+
+        resultado = monte_carlo.simular_ponto("NRZ", "crc32", 20.0, semente=1, **self.OPCOES)
+        self.assertEqual((resultado.parada, resultado.erros_bit, resultado.quadros_rejeitados), ("max_bits", 0, 0))
+
+    def test_saida_csv_e_json(self):
+        resultados = monte_carlo.varrer(["PSK"], ["paridade"], [0.0, 4.0], processos=1, **self.OPCOES)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_csv, caminho_json = os.path.join(pasta, "c.csv"), os.path.join(pasta, "c.json")
+            monte_carlo.salvar_csv(resultados, caminho_csv)
+            monte_carlo.salvar_json(resultados, caminho_json)
+            with open(caminho_csv, encoding="utf-8") as arquivo:
+                linhas = list(csv.DictReader(arquivo))
+            with open(caminho_json, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        self.assertEqual([float(l["ebn0_db"]) for l in linhas], [0.0, 4.0])
+        self.assertEqual(dados[1]["erros_bit"], resultados[1].erros_bit)
+
+    def test_esquema_desconhecido(self):
+        with self.assertRaises(ValueError):
+            monte_carlo.varrer(["NRZ"], ["turbo"], [0.0])
+
+    def test_banda_base_equivale_a_banda_passante(self):
+        banda_base = cadeia.ParametrosFisica(banda_base=True)
+        passante = cadeia.ParametrosFisica(amostras_por_simbolo=8, frequencias_fsk=(1, 3))
+        for modulacao in ("PSK", "FSK", "QPSK", "16QAM"):
+            pontos = [monte_carlo.simular_ponto(modulacao, "nenhum", 4.0, semente=3, alvo_erros=1000,
+                                                parametros=p) for p in (banda_base, passante)]
+            intervalos = [r.intervalo_ber() for r in pontos]
+            # os intervalos de confiança se sobrepõem
+            self.assertLess(max(i[0] for i in intervalos), min(i[1] for i in intervalos), modulacao)
+
+    def test_ask_fica_em_banda_passante_no_modo_banda_base(self):
+        parametros = cadeia.ParametrosFisica(amostras_por_simbolo=8, frequencia=1, banda_base=True)
+        ask = cadeia.obter_modulacao("ASK", parametros)
+        self.assertEqual((ask.amostras_por_simbolo, ask.portadoras), (8, (1,)))
+        self.assertFalse(np.iscomplexobj(ask.gerar_sinal(np.ones((2, 16), np.uint8))))
+        pontos = [monte_carlo.simular_ponto("ASK", "nenhum", 4.0, semente=3, alvo_erros=200,
+                                            parametros=replace(parametros, banda_base=b)) for b in (True, False)]
+        self.assertEqual(pontos[0].erros_bit, pontos[1].erros_bit)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.MENSAGEM = "Trabalho de Redes: \x7e \x7d fim".encode("utf-8") * 5
+
+    def test_cenarios_de_integracao_sem_erro(self):
+        cenarios = [("contagem", "paridade", "nenhuma"), ("bit-stuffing", "nenhuma", "hamming"),
+                    ("byte-stuffing", "crc", "nenhuma"), ("contagem", "checksum", "nenhuma"),
+                    ("bit-stuffing", "checksum", "hamming(15,11)")]
+        for enquadramento, deteccao, correcao in cenarios:
+            simulador = pipeline.Pipeline(enquadramento=enquadramento, deteccao=deteccao,
+                                          correcao=correcao, tamanho_quadro=16)
+            resultados = list(simulador.executar(self.MENSAGEM))
+            self.assertEqual(len(resultados), -(-len(self.MENSAGEM) // 16))
+            self.assertTrue(all(r.correto and r.valido is not False for r in resultados))
+            recebida = b"".join(r.dados_recebidos.para_bytes() for r in resultados)
+            self.assertEqual(recebida, self.MENSAGEM)
+
+    def test_contagem_limita_o_tamanho_do_quadro_na_configuracao(self):
+        with self.assertRaisesRegex(ValueError, "Contagem de Caracteres"):
+            pipeline.Pipeline(enquadramento="contagem", tamanho_quadro=1024)
+        pipeline.ConfiguracaoPipeline(enquadramento="bit-stuffing", tamanho_quadro=1024)
+
+        def aceito(deteccao, correcao, tamanho):
+            try:
+                pipeline.ConfiguracaoPipeline(deteccao=deteccao, correcao=correcao, tamanho_quadro=tamanho)
+            except ValueError:
+                return False
+            return True
+
+        for deteccao in pipeline.DETECCOES:
+            for correcao in pipeline.CORRECOES:
+                with self.subTest(deteccao=deteccao, correcao=correcao):
+                    # O maior tamanho aceito passa pelo TX; com um byte a mais o próprio TX recusaria o quadro
+                    maximo = max(t for t in range(1, 256) if aceito(deteccao, correcao, t))
+                    simulador = pipeline.Pipeline(deteccao=deteccao, correcao=correcao, tamanho_quadro=maximo)
+                    simulador.transmitir(0, pipeline.para_buffer(bytes(maximo)))
+                    config = pipeline.ConfiguracaoPipeline(enquadramento="nenhum", deteccao=deteccao,
+                                                           correcao=correcao, tamanho_quadro=maximo + 1)
+                    config.enquadramento = "contagem"  # contorna a validação para chegar ao TX
+                    with self.assertRaisesRegex(ValueError, "255 bytes"):
+                        pipeline.Pipeline(config).transmitir(0, pipeline.para_buffer(bytes(maximo + 1)))
+
+    def test_erro_no_canal_corrigido_ou_detectado(self):
+        for correcao, deteccao in (("hamming", "nenhuma"), ("nenhuma", "checksum")):
+            simulador = pipeline.Pipeline(enquadramento="bit-stuffing", deteccao=deteccao, correcao=correcao)
+            transmitido = simulador.transmitir(0, pipeline.para_buffer(self.MENSAGEM[:4]))
+            bits = transmitido.quadro.bits().copy()
+            bits[8 + 5] ^= 1  # 6º bit após a FLAG inicial
+            resultado = simulador.receber(transmitido, pipeline.BufferBits.de_bits(bits))
+            self.assertEqual(resultado.bits_invertidos_no_canal, 1)
+            if correcao == "hamming":
+                self.assertEqual((resultado.posicoes_corrigidas, resultado.correto), (6, True))
+            else:
+                self.assertEqual((resultado.valido, resultado.correto), (False, False))
+
+    def test_fonte_em_pedacos_e_arquivo(self):
+        simulador = pipeline.Pipeline(tamanho_quadro=7)
+        inteiro = [r.dados_recebidos for r in simulador.executar(self.MENSAGEM)]
+        pedacos = [self.MENSAGEM[i:i + 5] for i in range(0, len(self.MENSAGEM), 5)]
+        self.assertEqual([r.dados_recebidos for r in simulador.executar(iter(pedacos))], inteiro)
+        self.assertEqual([r.dados_recebidos for r in simulador.executar(io.BytesIO(self.MENSAGEM))], inteiro)
+
+    def test_modulacao_e_awgn_reprodutiveis(self):
+        config = pipeline.ConfiguracaoPipeline(enquadramento="byte-stuffing", deteccao="crc", modulacao="QPSK",
+                                               ebn0_db=3.0, semente=5, tamanho_quadro=8, guardar_sinais=True)
+        primeira = list(pipeline.Pipeline(config).executar(self.MENSAGEM))
+        segunda = list(pipeline.Pipeline(config).executar(self.MENSAGEM))
+        self.assertEqual([r.erros_bit for r in primeira], [r.erros_bit for r in segunda])
+        self.assertTrue(any(r.bits_invertidos_no_canal for r in primeira))
+        # Quadros com erro que chegam inteiros são apontados pelo CRC
+        self.assertTrue(all(r.valido is False for r in primeira if not r.correto and not r.perdido))
+        self.assertEqual(primeira[0].sinal_recebido.shape, primeira[0].sinal_transmitido.shape)
+
+    def test_bsc_nao_altera_o_sinal_transmitido(self):
+        config = pipeline.ConfiguracaoPipeline(modulacao="NRZ", taxa_erro_bits=0.05, semente=7, tamanho_quadro=16,
+                                               guardar_sinais=True,
+                                               parametros_fisica=cadeia.ParametrosFisica(amostras_por_simbolo=4))
+        resultados = list(pipeline.Pipeline(config).executar(self.MENSAGEM))
+        modulacao = cadeia.obter_modulacao("NRZ", config.parametros_fisica)
+        for r in resultados:
+            np.testing.assert_array_equal(r.sinal_transmitido, modulacao.gerar_sinal(r.quadro_transmitido.bits()))
+        com_erros = [r for r in resultados if r.bits_invertidos_no_canal]
+        self.assertTrue(com_erros)
+        self.assertTrue(all(np.any(r.sinal_recebido != r.sinal_transmitido) for r in com_erros))
+
+    def test_configuracao_invalida(self):
+        with self.assertRaises(ValueError):
+            pipeline.ConfiguracaoPipeline(enquadramento="hdlc")
+        with self.assertRaises(ValueError):
+            pipeline.ConfiguracaoPipeline(ebn0_db=3.0)
+
+    def test_amostras_por_simbolo_compartilhadas(self):
+        poucas = cadeia.ParametrosFisica(amostras_por_simbolo=8, frequencias_fsk=(1, 3))
+        for modulacao in ("NRZ", "FSK", "16QAM"):
+            config = pipeline.ConfiguracaoPipeline(modulacao=modulacao, ebn0_db=30.0, semente=2, tamanho_quadro=8,
+                                                   guardar_sinais=True, parametros_fisica=poucas)
+            resultados = list(pipeline.Pipeline(config).executar(self.MENSAGEM))
+            self.assertTrue(all(r.correto for r in resultados))
+            quadro = resultados[0]
+            bits_por_simbolo = cadeia.MODULACOES[modulacao].bits_por_simbolo
+            self.assertEqual(quadro.sinal_transmitido.size,
+                             -(-len(quadro.quadro_transmitido) // bits_por_simbolo) * 8)
+        # FSK em (2, 5) ciclos/símbolo não cabe em 8 amostras (Nyquist)
+        with self.assertRaises(ValueError):
+            pipeline.ConfiguracaoPipeline(modulacao="FSK", parametros_fisica=cadeia.ParametrosFisica(
+                amostras_por_simbolo=8, frequencias_fsk=(2, 5)))
+        with self.assertRaises(ValueError):
+            pipeline.ConfiguracaoPipeline(modulacao="manchester", parametros_fisica=cadeia.ParametrosFisica(amostras_por_simbolo=5))
+
+    def test_portadoras_padrao_respeitam_nyquist(self):
+        self.assertEqual(cadeia.ParametrosFisica().frequencias_fsk, (2, 5))
+        bits = np.random.default_rng(6).integers(0, 2, (3, 48), dtype=np.uint8)
+        for n in (3, 4, 8):
+            parametros = cadeia.ParametrosFisica(amostras_por_simbolo=n)
+            for nome in cadeia.criar_modulacoes(parametros):
+                if nome == "manchester" and n % 2:
+                    continue
+                with self.subTest(n=n, modulacao=nome):
+                    modulacao = cadeia.obter_modulacao(nome, parametros)
+                    recebidos = modulacao.demodular(modulacao.gerar_sinal(bits))[:, :bits.shape[1]]
+                    np.testing.assert_array_equal(recebidos, bits)
+
+    def test_poucas_amostras_sem_portadoras_padrao(self):
+        bits = np.random.default_rng(7).integers(0, 2, (2, 32), dtype=np.uint8)
+        for n in (1, 2):
+            with self.assertRaises(ValueError):
+                cadeia.portadoras_padrao(n)
+            parametros = cadeia.ParametrosFisica(amostras_por_simbolo=n)
+            for nome in ("ASK", "FSK", "PSK", "QPSK", "16QAM"):
+                with self.subTest(n=n, modulacao=nome), self.assertRaises(ValueError):
+                    cadeia.obter_modulacao(nome, parametros)
+            for nome in ("NRZ", "bipolar") + (("manchester",) if n == 2 else ()):
+                with self.subTest(n=n, modulacao=nome):
+                    modulacao = cadeia.obter_modulacao(nome, parametros)
+                    np.testing.assert_array_equal(modulacao.demodular(modulacao.gerar_sinal(bits)), bits)
+        # N=2 com portadoras informadas abaixo de Nyquist continua valendo
+        psk = cadeia.obter_modulacao("PSK", cadeia.ParametrosFisica(amostras_por_simbolo=2, frequencia=0.5))
+        np.testing.assert_array_equal(psk.demodular(psk.gerar_sinal(bits)), bits)
+
+    def test_banda_base_gera_simbolos_complexos(self):
+        config = pipeline.ConfiguracaoPipeline(modulacao="16QAM", ebn0_db=30.0, semente=4, guardar_sinais=True,
+                                               parametros_fisica=cadeia.ParametrosFisica(banda_base=True))
+        resultados = list(pipeline.Pipeline(config).executar(self.MENSAGEM))
+        self.assertTrue(all(r.correto for r in resultados))
+        quadro = resultados[0]
+        self.assertTrue(np.iscomplexobj(quadro.sinal_recebido))
+        self.assertEqual(quadro.sinal_transmitido.size, -(-len(quadro.quadro_transmitido) // 4))
+
+
+class TestParalelo(unittest.TestCase):
+
+    def setUp(self):
+        self.MENSAGEM = bytes(range(256)) * 12
+        self.CONFIG = pipeline.ConfiguracaoPipeline(enquadramento="bit-stuffing", deteccao="crc", modulacao="QPSK",
+                                                    ebn0_db=2.0, semente=5, tamanho_quadro=40, guardar_sinais=True,
+                                                    parametros_fisica=cadeia.ParametrosFisica(amostras_por_simbolo=8))
+
+    def _executar(self, processos, quadros_por_lote):
+        with paralelo.ExecutorParalelo(self.CONFIG, processos=processos, quadros_por_lote=quadros_por_lote) as executor:
+            return list(executor.executar(self.MENSAGEM))
+
+    def test_resultado_independe_dos_processos_e_dos_lotes(self):
+        serial = self._executar(1, 64)
+        distribuido = self._executar(2, 3)
+        self.assertEqual([r.indice for r in distribuido], list(range(-(-len(self.MENSAGEM) // 40))))
+        self.assertGreater(sum(r.erros_bit for r in serial), 0)
+        for a, b in zip(serial, distribuido):
+            self.assertEqual((a.erros_bit, a.valido, a.perdido), (b.erros_bit, b.valido, b.perdido))
+            self.assertEqual(a.dados_recebidos, b.dados_recebidos)
+            # sinais devolvidos pela memória compartilhada
+            np.testing.assert_array_equal(a.sinal_transmitido, b.sinal_transmitido)
+            np.testing.assert_array_equal(a.sinal_recebido, b.sinal_recebido)
+
+    def test_mensagem_reconstruida_em_ordem(self):
+        with paralelo.ExecutorParalelo(processos=2, quadros_por_lote=5, correcao="hamming(7,4)",
+                                       modulacao="16QAM", tamanho_quadro=16) as executor:
+            resultados = list(executor.executar(io.BytesIO(self.MENSAGEM)))
+        self.assertTrue(all(r.correto for r in resultados))
+        self.assertEqual(b"".join(r.dados_recebidos.para_bytes() for r in resultados), self.MENSAGEM)
+        self.assertIsNone(resultados[0].sinal_transmitido)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        casos = benchmarks.obter_casos(r"^(NRZ\.demodular|crc32|enquadrar_contagem_caracteres)$")
+        self.relatorio = benchmarks.executar_benchmarks(casos, tamanhos=(64, 256, 1024), tempo_alvo=0.01)
+
+    def test_todas_as_funcoes_das_camadas_tem_caso(self):
+        nomes = {c.nome for c in benchmarks.obter_casos()}
+        for esperado in ("64QAM.demodular", "16QAM.QAM16_modulation", "desenquadrar_byte_stuffing",
+                         "verificar_checksum", "receptor_hamming", "transmissor_hamming(n=63)"):
+            self.assertIn(esperado, nomes)
+        self.assertEqual({c.camada for c in benchmarks.obter_casos("fisica")}, {"fisica"})
+
+    def test_pontos_e_expoentes(self):
+        pontos = {(p["caso"], p["tamanho_bytes"]): p for p in self.relatorio["resultados"]}
+        # A Contagem de Caracteres só aceita até 255 bytes: o próprio limite entra na escala
+        self.assertEqual(sorted(t for c, t in pontos if c == "enquadrar_contagem_caracteres"), [64, 255])
+        nrz = pontos[("NRZ.demodular", 1024)]
+        self.assertEqual(nrz["amostras"], 1024 * 8 * 100)
+        self.assertGreater(nrz["amostras_por_s"], 0)
+        self.assertIsNone(pontos[("crc32", 1024)]["amostras_por_s"])
+        self.assertGreaterEqual(pontos[("crc32", 1024)]["pico_memoria_bytes"], 0)
+        self.assertIsNotNone(self.relatorio["expoentes"]["crc32"])
+        json.dumps(self.relatorio)
+
+    def test_comparar_aponta_regressoes(self):
+        self.assertEqual(benchmarks.comparar(self.relatorio, self.relatorio), [])
+        base = json.loads(json.dumps(self.relatorio))
+        for ponto in base["resultados"]:
+            if ponto["caso"] == "crc32":
+                ponto["bits_por_s"] *= 2
+        regressoes = benchmarks.comparar(base, self.relatorio)
+        self.assertEqual({(r["caso"], r["metrica"]) for r in regressoes}, {("crc32", "bits_por_s")})
+        self.assertEqual(len(regressoes), 3)
+
+
+class TestInstrumentacao(unittest.TestCase):
+
+    def setUp(self):
+        instrumentacao.zerar()
+
+    def tearDown(self):
+        instrumentacao.desativar()
+        instrumentacao.zerar()
+
+    def test_desligada_mantem_as_funcoes_originais(self):
+        original = pipeline.tx.crc32
+        instrumentacao.ativar()
+        instrumentacao.ativar()
+        self.assertIsNot(pipeline.tx.crc32, original)
+        self.assertIs(pipeline.tx.crc32.__wrapped__, original)
+        instrumentacao.desativar()
+        self.assertIs(pipeline.tx.crc32, original)
+        self.assertFalse(instrumentacao.ativa())
+
+    def test_contadores_do_pipeline(self):
+        instrumentacao.ativar()
+        config = pipeline.ConfiguracaoPipeline(enquadramento="byte-stuffing", deteccao="crc", correcao="hamming(7,4)",
+                                               modulacao="NRZ", taxa_erro_bits=0.01, semente=5)
+        resultados = list(pipeline.Pipeline(config).executar(bytes(range(256)) * 4))
+        metricas = instrumentacao.instantaneo()
+        funcoes, contadores = metricas["funcoes"], metricas["contadores"]
+
+        self.assertEqual(funcoes["enlace_transmissor.crc32"]["chamadas"], len(resultados))
+        self.assertEqual(funcoes["enlace_transmissor.crc32"]["bytes"], 1024)
+        modulacao = funcoes["modulacao_demodulacao_digital.NRZ_polar_modulation"]
+        self.assertEqual(modulacao["amostras"], modulacao["bytes"] * 8 * 100)
+        self.assertLessEqual(modulacao["latencia_p50_s"], modulacao["latencia_p99_s"])
+        verificados = [r for r in resultados if r.valido is not None]
+        self.assertEqual(contadores["falhas_crc"], sum(not r.valido for r in verificados))
+        self.assertEqual(contadores["correcoes_hamming"],
+                         sum(int(np.count_nonzero(r.posicoes_corrigidas)) for r in resultados))
+
+    def test_contadores_do_monte_carlo(self):
+        instrumentacao.ativar()
+        for controle in ("paridade", "checksum", "hamming", "hamming(7,4)"):
+            monte_carlo.simular_ponto("NRZ", controle, 2.0, semente=4, alvo_erros=50,
+                                      parametros=cadeia.ParametrosFisica(banda_base=True))
+        metricas = instrumentacao.instantaneo()
+        for funcao in ("enlace_transmissor.adicionar_paridade_par", "enlace_receptor.verificar_paridade_par",
+                       "enlace_transmissor.adicionar_checksum", "enlace_receptor.verificar_checksum",
+                       "enlace_transmissor.transmissor_hamming", "enlace_receptor.receptor_hamming"):
+            self.assertGreater(metricas["funcoes"][funcao]["chamadas"], 0, funcao)
+        for contador in ("falhas_paridade", "falhas_checksum", "correcoes_hamming"):
+            self.assertGreater(metricas["contadores"].get(contador, 0), 0, contador)
+
+    def test_exportar_json_e_prometheus(self):
+        instrumentacao.ativar()
+        pipeline.tx.crc32("10110011")
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_json, caminho_prom = os.path.join(pasta, "m.json"), os.path.join(pasta, "m.prom")
+            instrumentacao.exportar(caminho_json)
+            instrumentacao.exportar(caminho_prom)
+            with open(caminho_json, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+            with open(caminho_prom, encoding="utf-8") as arquivo:
+                texto = arquivo.read()
+            self.assertEqual(sorted(os.listdir(pasta)), ["m.json", "m.prom"])
+        self.assertEqual(dados["funcoes"]["enlace_transmissor.crc32"]["chamadas"], 1)
+        self.assertIn('tr1_chamadas_total{modulo="enlace_transmissor",funcao="crc32"} 1\n', texto)
+        self.assertIn("# TYPE tr1_latencia_segundos summary", texto)
+
+
+
+if __name__ == '__main__':
+    unittest.main()